@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Microbenchmark GitHub App JWT generation.
+
+Compares signing with the PEM string on every call (the old behaviour),
+signing with a pre-parsed RSA key, and ``GitHubAppService.generate_jwt``
+with the cached JWT.
+
+Usage:
+    python scripts/bench_app_jwt.py [--iterations N] [--key-size BITS]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from patchpanda.gateway.services.github_app import GitHubAppService, load_signing_key
+from patchpanda.gateway.settings import Settings
+
+
+def _payload() -> dict:
+    now = int(time.time())
+    return {"iat": now, "exp": now + 600, "iss": "12345"}
+
+
+def _time(func, iterations: int) -> float:
+    """Mean time per call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def _time_async(func, iterations: int) -> float:
+    await func()  # first call fetches, parses and signs
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--key-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=args.key_size)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode()
+    signing_key = load_signing_key(pem)
+
+    settings = Settings(github_app_id="12345")
+    with patch("patchpanda.gateway.services.github_app.get_settings", return_value=settings):
+        service = GitHubAppService(AsyncMock(get_github_private_key=AsyncMock(return_value=pem)))
+
+    print(f"🔏 App JWT benchmark (RSA-{args.key_size}, µs per JWT, lower is better)\n")
+    results = {
+        "PEM string per call": _time(lambda: jwt.encode(_payload(), pem, algorithm="RS256"), args.iterations),
+        "pre-parsed key": _time(lambda: jwt.encode(_payload(), signing_key, algorithm="RS256"), args.iterations),
+        "cached JWT (generate_jwt)": asyncio.run(_time_async(service.generate_jwt, args.iterations)),
+    }
+    baseline = results["PEM string per call"]
+    for name, micros in results.items():
+        print(f"  {name:<28}{micros:>12.1f} µs{baseline / micros:>10.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark per-event memory and decode time of webhook events.
+
+For each payload, compares the full decoded ``dict`` the handlers used to
+receive with the compact event struct from ``decode_event``: bytes retained
+while the object is alive (tracemalloc) and decode time.
+
+Usage:
+    python scripts/bench_event_memory.py [--corpus DIR] [--body-kb N] [--iterations N]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from patchpanda.gateway import codec
+from patchpanda.gateway.models.events import decode_event
+from patchpanda.gateway.settings import get_settings
+from webhook_corpus import load_corpus
+
+
+def retained_bytes(build) -> int:
+    """Bytes still allocated while the object returned by build() is alive."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def decode_time(build, iterations: int) -> float:
+    """Mean decode time in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="Directory of recorded <event>.<action>.json payloads")
+    parser.add_argument("--body-kb", type=int, default=16, help="PR body size for the synthetic corpus")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print("🧠 Webhook event memory benchmark\n")
+    print(f"  {'payload':<28}{'dict':>10}{'event':>10}{'ratio':>8}{'dict µs':>10}{'event µs':>10}")
+
+    for name, event, body in load_corpus(args.corpus, body_kb=args.body_kb):
+        if decode_event(event, body) is None:
+            continue
+
+        def as_dict(body=body):
+            return codec.loads(body)
+
+        def as_event(event=event, body=body):
+            return decode_event(event, body)
+
+        dict_bytes = retained_bytes(as_dict)
+        event_bytes = retained_bytes(as_event)
+        print(
+            f"  {name:<28}{dict_bytes / 1024:>8.1f}KB{event_bytes / 1024:>8.1f}KB"
+            f"{dict_bytes / max(event_bytes, 1):>7.0f}x"
+            f"{decode_time(as_dict, args.iterations):>10.1f}"
+            f"{decode_time(as_event, args.iterations):>10.1f}"
+        )
+
+    print(f"\n  dict decoder: {codec.get_decoder(get_settings().json_decoder)[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
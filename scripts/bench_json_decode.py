@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Microbenchmark webhook payload decoding.
+
+Compares the old two-pass path (``request.body()`` for the HMAC followed by
+a ``str`` decode and stdlib ``json.loads``, as Starlette's ``request.json()``
+does) with single-pass decoding of the same buffer by each installed decoder.
+
+Usage:
+    python scripts/bench_json_decode.py [--corpus DIR] [--body-kb N] [--iterations N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from patchpanda.gateway.codec import DECODERS, get_decoder
+from webhook_corpus import load_corpus
+
+
+def _time(func, body: bytes, iterations: int) -> float:
+    """Best-of-five mean time per call in microseconds."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(body)
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="Directory of recorded <event>.<action>.json payloads")
+    parser.add_argument("--body-kb", type=int, default=64, help="PR body size for the synthetic corpus")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    decoders = {}
+    for name in DECODERS:
+        resolved, loads = get_decoder(name)
+        if resolved == name:
+            decoders[name] = loads
+
+    def two_pass(body: bytes):
+        # Starlette: body.decode() then json.loads(str)
+        return json.loads(body.decode("utf-8"))
+
+    print("⏱️  Webhook payload decode benchmark (µs per payload, lower is better)\n")
+    header = f"  {'payload':<28}{'size':>9}{'two-pass':>11}" + "".join(f"{name:>11}" for name in decoders)
+    print(header)
+
+    for name, _, body in load_corpus(args.corpus, body_kb=args.body_kb):
+        baseline = _time(two_pass, body, args.iterations)
+        row = f"  {name:<28}{len(body) // 1024:>7}KB{baseline:>11.1f}"
+        for loads in decoders.values():
+            row += f"{_time(loads, body, args.iterations):>11.1f}"
+        print(row)
+
+    missing = sorted(set(DECODERS) - set(decoders))
+    if missing:
+        print(f"\n  Not installed: {', '.join(missing)} (poetry install -E fast-json)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
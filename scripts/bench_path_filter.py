@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Microbenchmark include/exclude path matching.
+
+Matches a synthetic monorepo file list against a synthetic pattern set,
+once with ``fnmatch`` per pattern (the straightforward implementation) and
+once with the compiled ``PathMatcher``, and checks both agree.
+
+Usage:
+    python scripts/bench_path_filter.py [--paths N] [--patterns N] [--seed N]
+"""
+
+import argparse
+import fnmatch
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from patchpanda.gateway.services.path_filter import PathMatcher
+
+EXTENSIONS = ["py", "pyi", "md", "txt", "json", "yml", "ts", "tsx", "js", "go", "rs", "lock", "cfg", "toml"]
+TOP_LEVEL = ["src", "tests", "docs", "services", "packages", "libs", "tools", "scripts", "vendor", "examples"]
+
+
+def _paths(rng: random.Random, count: int) -> List[str]:
+    paths = []
+    for _ in range(count):
+        parts = [rng.choice(TOP_LEVEL)] + [f"mod{rng.randrange(60)}" for _ in range(rng.randrange(1, 5))]
+        paths.append("/".join(parts) + f"/file_{rng.randrange(1000)}.{rng.choice(EXTENSIONS)}")
+    return paths
+
+
+def _patterns(rng: random.Random, count: int, paths: List[str]) -> List[str]:
+    makers = [
+        lambda: f"*.{rng.choice(EXTENSIONS)}",
+        lambda: f"{rng.choice(TOP_LEVEL)}/mod{rng.randrange(60)}/*",
+        lambda: f"{rng.choice(TOP_LEVEL)}/**/*.{rng.choice(EXTENSIONS)}",
+        lambda: f"{rng.choice(TOP_LEVEL)}/mod{rng.randrange(60)}/**/file_{rng.randrange(100)}?.py",
+        lambda: f"**/mod{rng.randrange(60)}/*.{rng.choice(EXTENSIONS)}",
+        lambda: f"*/mod{rng.randrange(60)}/[a-f]*",
+        lambda: rng.choice(paths),
+    ]
+    return [rng.choice(makers)() for _ in range(count)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=20000)
+    parser.add_argument("--patterns", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    paths = _paths(rng, args.paths)
+    patterns = _patterns(rng, args.patterns, paths)
+
+    start = time.perf_counter()
+    expected = [any(fnmatch.fnmatchcase(path, pattern) for pattern in patterns) for path in paths]
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = PathMatcher(patterns)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [matcher(path) for path in paths]
+    compiled = time.perf_counter() - start
+
+    if actual != expected:
+        print("❌ Compiled matcher disagrees with fnmatch")
+        return 1
+
+    print(f"🗂️  Path filter benchmark ({args.paths} paths x {args.patterns} patterns, {sum(actual)} matched)\n")
+    print(f"  {'fnmatch per pattern':<24}{naive * 1e3:>10.1f} ms")
+    print(f"  {'PathMatcher':<24}{compiled * 1e3:>10.1f} ms{naive / compiled:>10.1f}x")
+    print(f"  {'  (compile once)':<24}{compile_time * 1e3:>10.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""Load benchmark for the webhook endpoint.
+
+Replays a corpus of signed webhook deliveries against the gateway, either
+in-process through an ASGI transport (default) or against a running server
+(``--url``, e.g. ``uvicorn patchpanda.gateway.main:app``). Reports p50/p95/p99
+latency, requests/s and, in-process, memory allocated per request for each
+payload type. Results are written as JSON so runs can be compared between
+commits with ``--compare``.
+
+The in-process app is started with its lifespan, so dedup, admission
+control and the inbox are configured from the environment as in production.
+Dedup expects Redis (``docker compose up redis``); set
+``WEBHOOK_DEDUP_ENABLED=false`` to benchmark without it. Deliveries are
+spread over ``--installations`` installation ids so the per-installation
+rate limit reflects org-wide traffic rather than a single noisy installation.
+
+In-process runs need neither a database nor GitHub. Unless ``DATABASE_URL``
+is set, the gateway gets a throwaway SQLite database with the tables
+created (no repository bindings, so every repository resolves to the
+defaults and its ``.testbot.yml``). GitHub calls are answered by the
+offline stand-in (``scripts/fake_github.py``) through an ASGI transport;
+with ``--fake-github`` it is served on a loopback port instead, with
+``--github-latency`` seconds added to each GitHub response, so the pipeline
+down to check runs goes through real HTTP connections.
+
+Usage:
+    python scripts/bench_webhooks.py [--url URL] [--corpus DIR] [--requests N]
+        [--concurrency N] [--fake-github [--github-latency S]]
+        [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from patchpanda.gateway.security.signature import generate_webhook_signature
+from fake_github import FakeGitHub, FakeGitHubConfig
+from webhook_corpus import load_corpus
+
+WEBHOOK_PATH = "/webhooks/github"
+IN_PROCESS_GITHUB = "http://fake-github"
+INSTALLATION_ID = re.compile(rb'("installation"\s*:\s*\{\s*"id"\s*:\s*)\d+')
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted sample list."""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def signed_headers(event: str, body: bytes, secret: str) -> Dict[str, str]:
+    """Headers GitHub sends with a delivery, with a unique delivery id."""
+    return {
+        "content-type": "application/json",
+        "x-github-event": event,
+        "x-github-delivery": str(uuid.uuid4()),
+        "x-hub-signature-256": generate_webhook_signature(body, secret),
+    }
+
+
+def installation_variants(body: bytes, installations: int) -> List[bytes]:
+    """Copies of ``body`` addressed to distinct installation ids."""
+    if not INSTALLATION_ID.search(body):
+        return [body]
+    return [
+        INSTALLATION_ID.sub(lambda m: m.group(1) + str(40000000 + i).encode(), body, count=1)
+        for i in range(installations)
+    ]
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    event: str,
+    bodies: List[bytes],
+    secret: str,
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Send ``requests`` deliveries with ``concurrency`` in flight."""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = zip(range(requests), itertools.cycle(bodies))
+
+    async def worker():
+        for _, body in remaining:
+            headers = signed_headers(event, body, secret)
+            start = time.perf_counter()
+            response = await client.post(WEBHOOK_PATH, content=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+async def allocated_per_request(
+    client: httpx.AsyncClient,
+    event: str,
+    body: bytes,
+    secret: str,
+    requests: int,
+) -> Dict[str, float]:
+    """Mean peak and retained bytes allocated per sequential request."""
+    peaks = []
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(requests):
+        headers = signed_headers(event, body, secret)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await client.post(WEBHOOK_PATH, content=body, headers=headers)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_alloc_kb": round(sum(peaks) / len(peaks) / 1024, 1),
+        "retained_kb_per_request": round((retained - baseline) / requests / 1024, 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results: Dict[str, Any], baseline_path: str) -> None:
+    """Print relative change against a previous results file."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\n  vs {baseline['meta'].get('commit') or baseline_path}")
+    print(f"  {'payload':<28}{'p50':>10}{'p99':>10}{'req/s':>10}")
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if not previous:
+            continue
+
+        def delta(key):
+            if not previous[key]:
+                return "     n/a"
+            return f"{(current[key] - previous[key]) / previous[key] * 100:>+9.1f}%"
+
+        print(f"  {name:<28}{delta('p50_ms')}{delta('p99_ms')}{delta('requests_per_second')}")
+
+
+def use_fake_github(api_url: str) -> None:
+    """Point the gateway at the GitHub stand-in with a throwaway app key."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    os.environ["GITHUB_API_URL"] = api_url
+    os.environ.setdefault("GITHUB_APP_ID", "12345")
+    os.environ["GITHUB_APP_PRIVATE_KEY"] = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def start_fake_github(latency: float) -> Tuple[FakeGitHub, Any]:
+    """Serve the GitHub stand-in on a free loopback port and point the gateway at it."""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    fake = FakeGitHub(FakeGitHubConfig(latency=latency))
+    server = uvicorn.Server(uvicorn.Config(fake.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    use_fake_github(f"http://127.0.0.1:{port}")
+    return fake, server
+
+
+def create_tables() -> None:
+    """Create the gateway's tables in the configured database."""
+    from patchpanda.gateway.db import tables  # noqa: F401 - registers the tables
+    from patchpanda.gateway.db.base import init_db
+
+    init_db()
+
+
+async def serve_github_in_process(services: Any, fake: FakeGitHub) -> None:
+    """Send the gateway's GitHub calls to the stand-in without a server."""
+    from patchpanda.gateway.services.http_client import GitHubHTTPClient
+
+    await services.http.aclose()
+    services.http = GitHubHTTPClient(base_url=IN_PROCESS_GITHUB, transport=httpx.ASGITransport(app=fake.app))
+    services.github_app._http_client = services.http
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus = load_corpus(args.corpus, body_kb=args.body_kb)
+
+    fake = fake_server = database_dir = None
+    if args.url:
+        from patchpanda.gateway.settings import get_settings
+        secret = args.secret or get_settings().github_webhook_secret
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        lifespan = None
+    else:
+        if args.fake_github:
+            fake, fake_server = start_fake_github(args.github_latency)
+        else:
+            fake = FakeGitHub()
+            use_fake_github(IN_PROCESS_GITHUB)
+        if "DATABASE_URL" not in os.environ:
+            database_dir = tempfile.TemporaryDirectory(prefix="bench-webhooks-")
+            os.environ["DATABASE_URL"] = f"sqlite:///{Path(database_dir.name) / 'gateway.db'}"
+        # The in-process app must verify with the same secret we sign with
+        secret = args.secret or os.environ.get("GITHUB_WEBHOOK_SECRET") or "bench-webhook-secret"
+        os.environ["GITHUB_WEBHOOK_SECRET"] = secret
+        from patchpanda.gateway.main import create_app
+        app = create_app()
+        if database_dir is not None:
+            create_tables()
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        if fake_server is None:
+            await serve_github_in_process(app.state.services, fake)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway", timeout=30)
+
+    results: Dict[str, Any] = {}
+    try:
+        async with client:
+            for name, event, body in corpus:
+                bodies = installation_variants(body, args.installations)
+                # Warm up connections, caches and lazily built services
+                await run_load(client, event, bodies, secret, args.warmup, 1)
+                result = await run_load(client, event, bodies, secret, args.requests, args.concurrency)
+                result["event"] = event
+                result["body_bytes"] = len(body)
+                if lifespan is not None:
+                    result.update(await allocated_per_request(client, event, body, secret, args.memory_requests))
+                results[name] = result
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if fake_server is not None:
+            fake_server.should_exit = True
+        if database_dir is not None:
+            database_dir.cleanup()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": args.url or "asgi",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "installations": args.installations,
+            "fake_github": "loopback" if fake_server else ("asgi" if fake else None),
+        },
+        "results": results,
+        **({"github_requests": dict(fake.requests)} if fake else {}),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running gateway (default: in-process ASGI)")
+    parser.add_argument("--corpus", help="Directory of recorded <event>.<action>.json payloads")
+    parser.add_argument("--body-kb", type=int, default=4, help="PR body size for the synthetic corpus")
+    parser.add_argument("--secret", help="Webhook secret to sign with (default: GITHUB_WEBHOOK_SECRET)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per payload type")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--installations", type=int, default=100, help="Distinct installation ids to spread deliveries over")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--memory-requests", type=int, default=100, help="Sequential requests traced for memory")
+    parser.add_argument("--fake-github", action="store_true", help="Serve GitHub calls from the offline stand-in")
+    parser.add_argument("--github-latency", type=float, default=0.05, help="Stand-in response latency in seconds")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    print(f"🚀 Webhook load benchmark ({args.url or 'in-process ASGI'}, "
+          f"{args.requests} requests x {args.concurrency} concurrent per payload)\n")
+
+    report = asyncio.run(main_async(args))
+
+    print(f"  {'payload':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'alloc KB':>10}  status")
+    for name, result in report["results"].items():
+        alloc = result.get("peak_alloc_kb")
+        print(
+            f"  {name:<28}{result['requests_per_second']:>10.1f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+            f"{alloc if alloc is not None else '-':>10}  {result['status_codes']}"
+        )
+
+    if "github_requests" in report:
+        print(f"\n  🐙 GitHub stand-in requests: {report['github_requests'] or 'none'}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n  📄 Results written to {output}")
+
+    if args.compare:
+        print_comparison(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
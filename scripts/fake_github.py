@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Offline stand-in for the GitHub API.
+
+An ASGI app implementing the endpoints the gateway calls: installation
+tokens, installation repositories, repositories, pull requests and their
+files, contents, check runs, issue comments and the GraphQL pull request
+queries. Responses carry ``X-RateLimit-*`` headers from per-installation
+budgets, GET responses carry ETags and answer ``If-None-Match`` with 304,
+and latency, errors and secondary rate limits can be injected.
+
+Use it in-process through ``httpx.ASGITransport(app=FakeGitHub().app)`` or
+run it as a server and point the gateway at it:
+
+    python scripts/fake_github.py --port 9100 --latency 0.05
+    GITHUB_API_URL=http://127.0.0.1:9100 make run
+
+``GET /_fake/stats`` returns request counts per route.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+DEFAULT_CONFIG = "enabled: true\ntest_generation: true\nmax_tests: 50\n"
+_TOKEN = re.compile(r"^(?:token|Bearer) ghs_fake_(\d+)_\d+$")
+_OPERATION = re.compile(r"^\s*query\s+(\w+)")
+
+
+@dataclass
+class FakeGitHubConfig:
+    """Behaviour of the stand-in."""
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # extra random latency, up to this many seconds
+    rate_limit: int = 5000  # requests per installation (and for the app) per window
+    rate_limit_window: int = 3600
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 502
+    error_paths: Optional[str] = None  # regex; only matching paths get errors injected
+    secondary_limit_rate: float = 0.0  # share of requests answered 403 with Retry-After
+    retry_after: int = 1
+    token_ttl: int = 3600
+    files_per_pr: int = 30
+    repositories_per_installation: int = 30
+    config_text: Optional[str] = DEFAULT_CONFIG  # .testbot.yml content, None for absent
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Budget:
+    limit: int
+    remaining: int
+    reset_at: int
+
+
+def git_blob_sha(text: str) -> str:
+    """SHA git gives a blob with this content."""
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def head_sha(owner: str, repo: str, number: int) -> str:
+    return hashlib.sha1(f"{owner}/{repo}#{number}:head".encode()).hexdigest()
+
+
+def base_sha(owner: str, repo: str) -> str:
+    return hashlib.sha1(f"{owner}/{repo}:main".encode()).hexdigest()
+
+
+@dataclass
+class FakeGitHub:
+    """State and ASGI app of the stand-in."""
+    config: FakeGitHubConfig = field(default_factory=FakeGitHubConfig)
+
+    def __post_init__(self):
+        self.random = random.Random(self.config.seed)
+        self.budgets: Dict[Tuple[str, str], _Budget] = {}
+        self.check_runs: Dict[int, Dict[str, Any]] = {}
+        self.comments: Dict[int, Dict[str, Any]] = {}
+        self.requests: Counter = Counter()
+        self.counters: Counter = Counter()
+        self._ids = iter(range(1, 1 << 62))
+        self.app = self._build_app()
+
+    # Request plumbing
+
+    def _budget(self, scope: str, resource: str) -> _Budget:
+        now = int(time.time())
+        budget = self.budgets.get((scope, resource))
+        if budget is None or budget.reset_at <= now:
+            budget = self.budgets[(scope, resource)] = _Budget(
+                self.config.rate_limit, self.config.rate_limit, now + self.config.rate_limit_window
+            )
+        return budget
+
+    @staticmethod
+    def _rate_headers(budget: _Budget, resource: str) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(budget.limit),
+            "X-RateLimit-Remaining": str(max(0, budget.remaining)),
+            "X-RateLimit-Reset": str(budget.reset_at),
+            "X-RateLimit-Used": str(budget.limit - max(0, budget.remaining)),
+            "X-RateLimit-Resource": resource,
+        }
+
+    async def _middleware(self, request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/_fake/"):
+            return await call_next(request)
+        delay = self.config.latency + (self.random.uniform(0, self.config.jitter) if self.config.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        match = _TOKEN.match(request.headers.get("authorization", ""))
+        if match is None and not request.headers.get("authorization", "").startswith("Bearer "):
+            self.counters["unauthorized"] += 1
+            return JSONResponse({"message": "Bad credentials"}, status_code=401)
+        scope = f"installation:{match.group(1)}" if match else "app"
+        resource = "graphql" if path.endswith("/graphql") else "core"
+        budget = self._budget(scope, resource)
+
+        if budget.remaining <= 0:
+            self.counters["rate_limited"] += 1
+            return JSONResponse(
+                {"message": "API rate limit exceeded"}, status_code=403, headers=self._rate_headers(budget, resource)
+            )
+        if self.config.secondary_limit_rate and self.random.random() < self.config.secondary_limit_rate:
+            self.counters["secondary_limited"] += 1
+            return JSONResponse(
+                {"message": "You have exceeded a secondary rate limit."},
+                status_code=403,
+                headers={**self._rate_headers(budget, resource), "Retry-After": str(self.config.retry_after)},
+            )
+        if (
+            self.config.error_rate
+            and (self.config.error_paths is None or re.search(self.config.error_paths, path))
+            and self.random.random() < self.config.error_rate
+        ):
+            self.counters["injected_errors"] += 1
+            return JSONResponse({"message": "Injected error"}, status_code=self.config.error_status)
+
+        response = await call_next(request)
+        route = request.scope.get("route")
+        # Counted by route template so stats stay small
+        self.requests[f"{request.method} {route.path if route else path}"] += 1
+        if response.status_code == 304:
+            # Conditional hits are free on GitHub
+            self.counters["not_modified"] += 1
+        else:
+            budget.remaining -= 1
+        for name, value in self._rate_headers(budget, resource).items():
+            response.headers[name] = value
+        return response
+
+    @staticmethod
+    def _conditional(request: Request, payload: Any, status_code: int = 200) -> Response:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, status_code=status_code, media_type="application/json", headers={"ETag": etag})
+
+    @staticmethod
+    def _paginate(request: Request, items: List[Any], wrap: Optional[str] = None) -> Response:
+        per_page = min(100, int(request.query_params.get("per_page", "30")))
+        page = max(1, int(request.query_params.get("page", "1")))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        payload: Any = {"total_count": len(items), wrap: chunk} if wrap else chunk
+        response = FakeGitHub._conditional(request, payload)
+        if page * per_page < len(items):
+            next_url = request.url.include_query_params(page=page + 1, per_page=per_page)
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return response
+
+    # Data
+
+    def _files(self, owner: str, repo: str, number: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "sha": hashlib.sha1(f"{owner}/{repo}#{number}:{i}".encode()).hexdigest(),
+                "filename": f"src/{repo}/module_{i}.py",
+                "status": "modified",
+                "additions": 10 + i % 7,
+                "deletions": i % 5,
+                "changes": 10 + i % 7 + i % 5,
+            }
+            for i in range(self.config.files_per_pr)
+        ]
+
+    def _pull(self, owner: str, repo: str, number: int) -> Dict[str, Any]:
+        return {
+            "number": number,
+            "state": "open",
+            "title": f"Change #{number}",
+            "head": {"ref": f"feature-{number}", "sha": head_sha(owner, repo, number)},
+            "base": {"ref": "main", "sha": base_sha(owner, repo)},
+            "changed_files": self.config.files_per_pr,
+        }
+
+    def _blob(self, expression: str) -> Optional[Dict[str, Any]]:
+        _, _, path = expression.partition(":")
+        if path != ".testbot.yml" or self.config.config_text is None:
+            return None
+        return {"oid": git_blob_sha(self.config.config_text), "text": self.config.config_text, "isBinary": False}
+
+    def _graphql_files(self, owner: str, repo: str, number: int, first: int, after: Optional[str]) -> Dict[str, Any]:
+        files = self._files(owner, repo, number)
+        start = int(after) if after else 0
+        end = start + min(first, 100)
+        return {
+            "pageInfo": {"hasNextPage": end < len(files), "endCursor": str(end)},
+            "nodes": [
+                {"path": f["filename"], "additions": f["additions"], "deletions": f["deletions"], "changeType": "MODIFIED"}
+                for f in files[start:end]
+            ],
+        }
+
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        match = _OPERATION.match(query)
+        operation = match.group(1) if match else ""
+        owner, repo = variables.get("owner"), variables.get("repo")
+        if operation == "PullRequestContext":
+            number = variables["number"]
+            repository: Dict[str, Any] = {
+                "pullRequest": {
+                    "number": number,
+                    "headRefName": f"feature-{number}",
+                    "headRefOid": head_sha(owner, repo, number),
+                    "headRepository": {"nameWithOwner": f"{owner}/{repo}"},
+                    "baseRefName": "main",
+                    "baseRefOid": base_sha(owner, repo),
+                    "changedFiles": self.config.files_per_pr,
+                    "files": self._graphql_files(owner, repo, number, variables["filesFirst"], None),
+                }
+            }
+            if variables.get("withConfig"):
+                repository["config"] = self._blob(variables["configExpression"])
+            return {"data": {"repository": repository}}
+        if operation == "PullRequestFiles":
+            number = variables["number"]
+            files = self._graphql_files(owner, repo, number, variables["first"], variables.get("after"))
+            return {"data": {"repository": {"pullRequest": {"headRefOid": head_sha(owner, repo, number), "files": files}}}}
+        if operation == "Blob":
+            return {"data": {"repository": {"object": self._blob(variables["expression"])}}}
+        return {"data": None, "errors": [{"message": f"Unsupported operation {operation or '(anonymous)'}"}]}
+
+    # Routes
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake GitHub API")
+        app.middleware("http")(self._middleware)
+
+        @app.post("/app/installations/{installation_id}/access_tokens", status_code=201)
+        async def access_token(installation_id: int):
+            expires_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + self.config.token_ttl))
+            return {"token": f"ghs_fake_{installation_id}_{next(self._ids)}", "expires_at": expires_at}
+
+        @app.get("/installation/repositories")
+        async def installation_repositories(request: Request):
+            repositories = [
+                {"id": i, "name": f"repo-{i}", "full_name": f"octo/repo-{i}", "private": True}
+                for i in range(1, self.config.repositories_per_installation + 1)
+            ]
+            return self._paginate(request, repositories, wrap="repositories")
+
+        @app.get("/repos/{owner}/{repo}")
+        async def repository(request: Request, owner: str, repo: str):
+            return self._conditional(request, {
+                "id": int(hashlib.sha1(f"{owner}/{repo}".encode()).hexdigest()[:8], 16),
+                "name": repo,
+                "full_name": f"{owner}/{repo}",
+                "owner": {"login": owner},
+                "default_branch": "main",
+                "private": True,
+            })
+
+        @app.get("/repos/{owner}/{repo}/pulls/{number}")
+        async def pull_request(request: Request, owner: str, repo: str, number: int):
+            return self._conditional(request, self._pull(owner, repo, number))
+
+        @app.get("/repos/{owner}/{repo}/pulls/{number}/files")
+        async def pull_request_files(request: Request, owner: str, repo: str, number: int):
+            return self._paginate(request, self._files(owner, repo, number))
+
+        @app.get("/repos/{owner}/{repo}/contents/{path:path}")
+        async def contents(request: Request, owner: str, repo: str, path: str):
+            blob = self._blob(f"{request.query_params.get('ref', 'main')}:{path}")
+            if blob is None:
+                return JSONResponse({"message": "Not Found"}, status_code=404)
+            return self._conditional(request, {
+                "type": "file",
+                "path": path,
+                "sha": blob["oid"],
+                "encoding": "base64",
+                "content": base64.b64encode(blob["text"].encode("utf-8")).decode("ascii"),
+            })
+
+        @app.post("/repos/{owner}/{repo}/check-runs", status_code=201)
+        async def create_check_run(request: Request, owner: str, repo: str):
+            run = {"id": next(self._ids), "repository": f"{owner}/{repo}", **(await request.json())}
+            self.check_runs[run["id"]] = run
+            return run
+
+        @app.patch("/repos/{owner}/{repo}/check-runs/{check_run_id}")
+        async def update_check_run(request: Request, owner: str, repo: str, check_run_id: int):
+            run = self.check_runs.get(check_run_id)
+            if run is None:
+                return JSONResponse({"message": "Not Found"}, status_code=404)
+            run.update(await request.json())
+            return run
+
+        @app.get("/repos/{owner}/{repo}/commits/{ref}/check-runs")
+        async def list_check_runs(request: Request, owner: str, repo: str, ref: str):
+            runs = [
+                run for run in self.check_runs.values()
+                if run["repository"] == f"{owner}/{repo}" and run.get("head_sha") == ref
+            ]
+            return self._paginate(request, runs, wrap="check_runs")
+
+        @app.post("/repos/{owner}/{repo}/issues/{number}/comments", status_code=201)
+        async def create_comment(request: Request, owner: str, repo: str, number: int):
+            comment = {"id": next(self._ids), "issue": f"{owner}/{repo}#{number}", "body": (await request.json())["body"]}
+            self.comments[comment["id"]] = comment
+            return comment
+
+        @app.patch("/repos/{owner}/{repo}/issues/comments/{comment_id}")
+        async def update_comment(request: Request, owner: str, repo: str, comment_id: int):
+            comment = self.comments.get(comment_id)
+            if comment is None:
+                return JSONResponse({"message": "Not Found"}, status_code=404)
+            comment["body"] = (await request.json())["body"]
+            return comment
+
+        @app.post("/graphql")
+        async def graphql(request: Request):
+            body = await request.json()
+            return self._graphql(body.get("query", ""), body.get("variables") or {})
+
+        @app.get("/_fake/stats")
+        async def stats():
+            return {
+                "requests": {route: count for route, count in self.requests.items() if count},
+                **self.counters,
+                "check_runs": len(self.check_runs),
+                "comments": len(self.comments),
+            }
+
+        return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, in seconds")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="Requests per installation per window")
+    parser.add_argument("--rate-limit-window", type=int, default=3600)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=502)
+    parser.add_argument("--error-paths", help="Regex limiting error injection to matching paths")
+    parser.add_argument("--secondary-limit-rate", type=float, default=0.0, help="Share of requests answered 403 + Retry-After")
+    parser.add_argument("--files-per-pr", type=int, default=30)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    fake = FakeGitHub(FakeGitHubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        error_paths=args.error_paths,
+        secondary_limit_rate=args.secondary_limit_rate,
+        files_per_pr=args.files_per_pr,
+        seed=args.seed,
+    ))
+    print(f"🐙 Fake GitHub API on http://{args.host}:{args.port} (stats at /_fake/stats)")
+    uvicorn.run(fake.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
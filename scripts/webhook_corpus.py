@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""Webhook payload corpus for benchmarks.
+
+Builds payloads with the same shape and size as GitHub's ``pull_request``
+and ``issue_comment`` deliveries (full user, repository and PR objects),
+or loads recorded deliveries from a directory. Recorded files are named
+``<event>.<action>[.<anything>].json``, e.g. ``pull_request.opened.1.json``
+as saved from the GitHub App's "Recent Deliveries" page.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+API = "https://api.github.com"
+WEB = "https://github.com"
+
+
+def _user(login: str, user_id: int) -> Dict[str, Any]:
+    return {
+        "login": login,
+        "id": user_id,
+        "node_id": f"MDQ6VXNlcj{user_id}",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{user_id}?v=4",
+        "gravatar_id": "",
+        "url": f"{API}/users/{login}",
+        "html_url": f"{WEB}/{login}",
+        "followers_url": f"{API}/users/{login}/followers",
+        "following_url": f"{API}/users/{login}/following{{/other_user}}",
+        "gists_url": f"{API}/users/{login}/gists{{/gist_id}}",
+        "starred_url": f"{API}/users/{login}/starred{{/owner}}{{/repo}}",
+        "subscriptions_url": f"{API}/users/{login}/subscriptions",
+        "organizations_url": f"{API}/users/{login}/orgs",
+        "repos_url": f"{API}/users/{login}/repos",
+        "events_url": f"{API}/users/{login}/events{{/privacy}}",
+        "received_events_url": f"{API}/users/{login}/received_events",
+        "type": "User",
+        "user_view_type": "public",
+        "site_admin": False,
+    }
+
+
+def _repo(owner: Dict[str, Any], name: str, repo_id: int) -> Dict[str, Any]:
+    full_name = f"{owner['login']}/{name}"
+    base = f"{API}/repos/{full_name}"
+    repo = {
+        "id": repo_id,
+        "node_id": f"R_kgDO{repo_id}",
+        "name": name,
+        "full_name": full_name,
+        "private": False,
+        "owner": owner,
+        "html_url": f"{WEB}/{full_name}",
+        "description": "Service that does important things for the platform team",
+        "fork": False,
+        "url": base,
+        "created_at": "2023-02-11T09:21:44Z",
+        "updated_at": "2026-10-01T17:03:12Z",
+        "pushed_at": "2026-10-16T08:44:01Z",
+        "git_url": f"git://github.com/{full_name}.git",
+        "ssh_url": f"git@github.com:{full_name}.git",
+        "clone_url": f"{WEB}/{full_name}.git",
+        "svn_url": f"{WEB}/{full_name}",
+        "homepage": None,
+        "size": 48213,
+        "stargazers_count": 112,
+        "watchers_count": 112,
+        "language": "Python",
+        "has_issues": True,
+        "has_projects": True,
+        "has_downloads": True,
+        "has_wiki": False,
+        "has_pages": False,
+        "has_discussions": False,
+        "forks_count": 14,
+        "mirror_url": None,
+        "archived": False,
+        "disabled": False,
+        "open_issues_count": 37,
+        "license": {
+            "key": "mit",
+            "name": "MIT License",
+            "spdx_id": "MIT",
+            "url": f"{API}/licenses/mit",
+            "node_id": "MDc6TGljZW5zZTEz",
+        },
+        "allow_forking": True,
+        "is_template": False,
+        "web_commit_signoff_required": False,
+        "topics": ["python", "fastapi", "testing"],
+        "visibility": "public",
+        "forks": 14,
+        "open_issues": 37,
+        "watchers": 112,
+        "default_branch": "main",
+        "allow_squash_merge": True,
+        "allow_merge_commit": False,
+        "allow_rebase_merge": True,
+        "allow_auto_merge": False,
+        "delete_branch_on_merge": True,
+        "allow_update_branch": True,
+        "use_squash_pr_title_as_default": True,
+        "squash_merge_commit_message": "PR_BODY",
+        "squash_merge_commit_title": "PR_TITLE",
+        "merge_commit_message": "PR_TITLE",
+        "merge_commit_title": "MERGE_MESSAGE",
+    }
+    for rel in (
+        "forks", "keys", "collaborators", "teams", "hooks", "issue_events",
+        "events", "assignees", "branches", "tags", "blobs", "git_tags",
+        "git_refs", "trees", "statuses", "languages", "stargazers",
+        "contributors", "subscribers", "subscription", "commits", "git_commits",
+        "comments", "issue_comment", "contents", "compare", "merges",
+        "archive", "downloads", "issues", "pulls", "milestones",
+        "notifications", "labels", "releases", "deployments",
+    ):
+        repo[f"{rel}_url"] = f"{base}/{rel}"
+    return repo
+
+
+def _label(name: str, label_id: int) -> Dict[str, Any]:
+    return {
+        "id": label_id,
+        "node_id": f"LA_kwDO{label_id}",
+        "url": f"{API}/labels/{name}",
+        "name": name,
+        "color": "0e8a16",
+        "default": False,
+        "description": f"{name} changes",
+    }
+
+
+def pull_request_payload(
+    action: str = "opened",
+    number: int = 1347,
+    head_sha: str = "6dcb09b5b57875f334f61aebed695e2e4193db5e",
+    base_sha: str = "9049f1265b7d61be4a8904a9a27120d2064dab3b",
+    body_kb: int = 4,
+) -> Dict[str, Any]:
+    """Build a ``pull_request`` delivery."""
+    org = _user("octo-org", 6811672)
+    author = _user("monalisa", 583231)
+    repo = _repo(org, "platform-service", 502371944)
+    pr_url = f"{API}/repos/{repo['full_name']}/pulls/{number}"
+    issue_url = f"{API}/repos/{repo['full_name']}/issues/{number}"
+    body = ("This change reworks the request pipeline. " * 24 + "\n") * max(1, body_kb)
+    return {
+        "action": action,
+        "number": number,
+        "pull_request": {
+            "url": pr_url,
+            "id": 1987654321,
+            "node_id": "PR_kwDOHfl3Zc5wS2Nx",
+            "html_url": f"{WEB}/{repo['full_name']}/pull/{number}",
+            "diff_url": f"{WEB}/{repo['full_name']}/pull/{number}.diff",
+            "patch_url": f"{WEB}/{repo['full_name']}/pull/{number}.patch",
+            "issue_url": issue_url,
+            "number": number,
+            "state": "open",
+            "locked": False,
+            "title": "Rework request pipeline for streaming bodies",
+            "user": author,
+            "body": body,
+            "created_at": "2026-10-16T08:40:12Z",
+            "updated_at": "2026-10-16T08:44:01Z",
+            "closed_at": None,
+            "merged_at": None,
+            "merge_commit_sha": None,
+            "assignee": None,
+            "assignees": [],
+            "requested_reviewers": [_user(f"reviewer-{i}", 900000 + i) for i in range(3)],
+            "requested_teams": [],
+            "labels": [_label(name, 4100 + i) for i, name in enumerate(("backend", "perf", "needs-tests"))],
+            "milestone": None,
+            "draft": False,
+            "commits_url": f"{pr_url}/commits",
+            "review_comments_url": f"{pr_url}/comments",
+            "review_comment_url": f"{API}/repos/{repo['full_name']}/pulls/comments{{/number}}",
+            "comments_url": f"{issue_url}/comments",
+            "statuses_url": f"{API}/repos/{repo['full_name']}/statuses/{head_sha}",
+            "head": {
+                "label": f"{author['login']}:feature/streaming",
+                "ref": "feature/streaming",
+                "sha": head_sha,
+                "user": author,
+                "repo": _repo(author, "platform-service", 502371999),
+            },
+            "base": {
+                "label": f"{org['login']}:main",
+                "ref": "main",
+                "sha": base_sha,
+                "user": org,
+                "repo": repo,
+            },
+            "_links": {
+                rel: {"href": f"{pr_url}/{rel}"}
+                for rel in ("self", "html", "issue", "comments", "review_comments",
+                            "review_comment", "commits", "statuses")
+            },
+            "author_association": "CONTRIBUTOR",
+            "auto_merge": None,
+            "active_lock_reason": None,
+            "merged": False,
+            "mergeable": None,
+            "rebaseable": None,
+            "mergeable_state": "unknown",
+            "merged_by": None,
+            "comments": 4,
+            "review_comments": 11,
+            "maintainer_can_modify": True,
+            "commits": 7,
+            "additions": 912,
+            "deletions": 240,
+            "changed_files": 23,
+        },
+        "repository": repo,
+        "organization": {
+            "login": org["login"],
+            "id": org["id"],
+            "node_id": org["node_id"],
+            "url": f"{API}/orgs/{org['login']}",
+            "repos_url": f"{API}/orgs/{org['login']}/repos",
+            "events_url": f"{API}/orgs/{org['login']}/events",
+            "hooks_url": f"{API}/orgs/{org['login']}/hooks",
+            "issues_url": f"{API}/orgs/{org['login']}/issues",
+            "members_url": f"{API}/orgs/{org['login']}/members{{/member}}",
+            "public_members_url": f"{API}/orgs/{org['login']}/public_members{{/member}}",
+            "avatar_url": org["avatar_url"],
+            "description": "",
+        },
+        "sender": author,
+        "installation": {"id": 41234567, "node_id": "MDIzOkludGVncmF0aW9uSW5zdGFsbGF0aW9uNDEyMzQ1Njc="},
+    }
+
+
+def issue_comment_payload(
+    action: str = "created",
+    number: int = 1347,
+    comment: str = "/patchpanda generate",
+    body_kb: int = 4,
+) -> Dict[str, Any]:
+    """Build an ``issue_comment`` delivery on a pull request."""
+    pr = pull_request_payload(number=number, body_kb=body_kb)
+    repo = pr["repository"]
+    commenter = _user("hubot", 1234567)
+    issue_url = f"{API}/repos/{repo['full_name']}/issues/{number}"
+    return {
+        "action": action,
+        "issue": {
+            "url": issue_url,
+            "repository_url": repo["url"],
+            "labels_url": f"{issue_url}/labels{{/name}}",
+            "comments_url": f"{issue_url}/comments",
+            "events_url": f"{issue_url}/events",
+            "html_url": f"{WEB}/{repo['full_name']}/pull/{number}",
+            "id": 2468013579,
+            "node_id": "PR_kwDOHfl3Zc5wS2Nx",
+            "number": number,
+            "title": pr["pull_request"]["title"],
+            "user": pr["pull_request"]["user"],
+            "labels": pr["pull_request"]["labels"],
+            "state": "open",
+            "locked": False,
+            "assignee": None,
+            "assignees": [],
+            "milestone": None,
+            "comments": 5,
+            "created_at": "2026-10-16T08:40:12Z",
+            "updated_at": "2026-10-16T09:02:47Z",
+            "closed_at": None,
+            "author_association": "CONTRIBUTOR",
+            "active_lock_reason": None,
+            "draft": False,
+            "pull_request": {
+                "url": pr["pull_request"]["url"],
+                "html_url": pr["pull_request"]["html_url"],
+                "diff_url": pr["pull_request"]["diff_url"],
+                "patch_url": pr["pull_request"]["patch_url"],
+                "merged_at": None,
+            },
+            "body": pr["pull_request"]["body"],
+            "reactions": {
+                "url": f"{issue_url}/reactions",
+                "total_count": 2, "+1": 2, "-1": 0, "laugh": 0, "hooray": 0,
+                "confused": 0, "heart": 0, "rocket": 0, "eyes": 0,
+            },
+            "timeline_url": f"{issue_url}/timeline",
+            "performed_via_github_app": None,
+            "state_reason": None,
+        },
+        "comment": {
+            "url": f"{API}/repos/{repo['full_name']}/issues/comments/3141592653",
+            "html_url": f"{WEB}/{repo['full_name']}/pull/{number}#issuecomment-3141592653",
+            "issue_url": issue_url,
+            "id": 3141592653,
+            "node_id": "IC_kwDOHfl3Zc67Ggq9",
+            "user": commenter,
+            "created_at": "2026-10-16T09:02:47Z",
+            "updated_at": "2026-10-16T09:02:47Z",
+            "author_association": "MEMBER",
+            "body": comment,
+            "reactions": {
+                "url": f"{API}/repos/{repo['full_name']}/issues/comments/3141592653/reactions",
+                "total_count": 0, "+1": 0, "-1": 0, "laugh": 0, "hooray": 0,
+                "confused": 0, "heart": 0, "rocket": 0, "eyes": 0,
+            },
+            "performed_via_github_app": None,
+        },
+        "repository": repo,
+        "organization": pr["organization"],
+        "sender": commenter,
+        "installation": pr["installation"],
+    }
+
+
+def push_payload(commits: int = 3) -> Dict[str, Any]:
+    """Build a ``push`` delivery, which the gateway only acknowledges."""
+    org = _user("octo-org", 6811672)
+    author = _user("monalisa", 583231)
+    repo = _repo(org, "platform-service", 502371944)
+    entries = [
+        {
+            "id": f"{i:040x}",
+            "tree_id": f"{i + 1000:040x}",
+            "distinct": True,
+            "message": f"Rework request pipeline, part {i}",
+            "timestamp": "2026-10-16T08:44:01Z",
+            "url": f"{WEB}/{repo['full_name']}/commit/{i:040x}",
+            "author": {"name": "Mona Lisa", "email": "monalisa@example.com", "username": author["login"]},
+            "committer": {"name": "GitHub", "email": "noreply@github.com", "username": "web-flow"},
+            "added": [f"src/pipeline/stage_{i}.py"],
+            "removed": [],
+            "modified": ["src/pipeline/__init__.py", "tests/test_pipeline.py"],
+        }
+        for i in range(1, commits + 1)
+    ]
+    return {
+        "ref": "refs/heads/feature/streaming",
+        "before": "9049f1265b7d61be4a8904a9a27120d2064dab3b",
+        "after": entries[-1]["id"] if entries else "0" * 40,
+        "repository": repo,
+        "pusher": {"name": author["login"], "email": "monalisa@example.com"},
+        "organization": {"login": org["login"], "id": org["id"]},
+        "sender": author,
+        "installation": {"id": 41234567, "node_id": "MDIzOkludGVncmF0aW9uSW5zdGFsbGF0aW9uNDEyMzQ1Njc="},
+        "created": False,
+        "deleted": False,
+        "forced": False,
+        "base_ref": None,
+        "compare": f"{WEB}/{repo['full_name']}/compare/9049f1265b7d...{entries[-1]['id'][:12] if entries else ''}",
+        "commits": entries,
+        "head_commit": entries[-1] if entries else None,
+    }
+
+
+def build_corpus(body_kb: int = 4) -> List[Tuple[str, str, bytes]]:
+    """Build ``(name, event, body)`` entries covering the handled events."""
+    entries = [
+        ("pull_request.opened", "pull_request", pull_request_payload("opened", body_kb=body_kb)),
+        ("pull_request.synchronize", "pull_request", pull_request_payload("synchronize", body_kb=body_kb)),
+        ("pull_request.labeled", "pull_request", pull_request_payload("labeled", body_kb=body_kb)),
+        ("issue_comment.created", "issue_comment", issue_comment_payload(body_kb=body_kb)),
+        ("issue_comment.chatter", "issue_comment", issue_comment_payload(comment="LGTM, thanks!", body_kb=body_kb)),
+        ("push", "push", push_payload()),
+    ]
+    return [(name, event, json.dumps(payload).encode("utf-8")) for name, event, payload in entries]
+
+
+def load_corpus(directory: Optional[str] = None, body_kb: int = 4) -> List[Tuple[str, str, bytes]]:
+    """Load recorded deliveries from ``directory`` or build the synthetic corpus."""
+    if not directory:
+        return build_corpus(body_kb=body_kb)
+
+    entries = []
+    for path in sorted(Path(directory).glob("*.json")):
+        name = path.stem
+        entries.append((name, name.split(".", 1)[0], path.read_bytes()))
+    if not entries:
+        raise SystemExit(f"No *.json payloads found in {directory}")
+    return entries
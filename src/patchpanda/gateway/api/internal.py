@@ -0,0 +1,151 @@
+"""Internal metrics endpoints.
+
+Read-only counters of the gateway's queues, caches and GitHub guards for
+dashboards and operators. They are served only when ``METRICS_TOKEN`` is
+set, to callers presenting it as a bearer token.
+"""
+
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from ..settings import get_settings
+
+bearer = HTTPBearer(auto_error=False)
+
+
+async def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+) -> None:
+    """Require the configured metrics token."""
+    token = get_settings().metrics_token
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/webhooks/inbox")
+async def get_webhook_inbox_stats(request: Request) -> dict:
+    """Get webhook inbox depth and drain latency."""
+    inbox = getattr(request.app.state, "webhook_inbox", None)
+    if inbox is None:
+        return {"enabled": False}
+    return {"enabled": True, **await inbox.stats()}
+
+
+@router.get("/webhooks/dedup")
+async def get_webhook_dedup_stats(request: Request) -> dict:
+    """Get webhook delivery dedup cache counters."""
+    dedup = getattr(request.app.state, "webhook_dedup", None)
+    if dedup is None:
+        return {"enabled": False}
+    return {"enabled": True, **dedup.stats()}
+
+
+@router.get("/webhooks/admission")
+async def get_webhook_admission_stats(request: Request) -> dict:
+    """Get webhook admitted, shed and queued counts."""
+    admission = getattr(request.app.state, "webhook_admission", None)
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission.stats()}
+
+
+@router.get("/webhooks/coalescer")
+async def get_pr_coalescer_stats(request: Request) -> dict:
+    """Get pull request push coalescing counters."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.coalescer is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.coalescer.stats()}
+
+
+@router.get("/github/http")
+async def get_github_http_stats(request: Request) -> dict:
+    """Get GitHub API connection pool saturation and reuse."""
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.http.stats()}
+
+
+@router.get("/github/rate-limits")
+async def get_github_rate_limit_stats(request: Request) -> dict:
+    """Get GitHub API rate-limit budgets and queued requests."""
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.github_app.rate_limits.stats()}
+
+
+@router.get("/github/etag-cache")
+async def get_github_etag_cache_stats(request: Request) -> dict:
+    """Get GitHub API conditional-request cache size and hits."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.github_app.etag_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.github_app.etag_cache.stats()}
+
+
+@router.get("/github/singleflight")
+async def get_github_singleflight_stats(request: Request) -> dict:
+    """Get GitHub API shared in-flight GET counters."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.github_app.singleflight is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.github_app.singleflight.stats()}
+
+
+@router.get("/github/call-guard")
+async def get_github_call_guard_stats(request: Request) -> dict:
+    """Get the GitHub API concurrency limit and circuit breaker states."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.github_app.call_guard is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.github_app.call_guard.stats()}
+
+
+@router.get("/config-cache")
+async def get_config_cache_stats(request: Request) -> dict:
+    """Get .testbot.yml cache sizes and hit counters."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.config_loader.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.config_loader.cache.stats()}
+
+
+@router.get("/effective-config")
+async def get_effective_config_stats(request: Request) -> dict:
+    """Get effective config memo sizes and hit counters."""
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.effective_config.stats()}
+
+
+@router.get("/changed-files")
+async def get_changed_files_stats(request: Request) -> dict:
+    """Get pull request changed-file cache size and hit counters."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.changed_files is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.changed_files.stats()}
+
+
+@router.get("/prefetch")
+async def get_prefetch_stats(request: Request) -> dict:
+    """Get pull request prefetch queue sizes and counters."""
+    services = getattr(request.app.state, "services", None)
+    if services is None or services.prefetcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **services.prefetcher.stats()}
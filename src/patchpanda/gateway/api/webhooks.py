@@ -1,20 +1,40 @@
 """GitHub webhook endpoints."""
 
-import json
-from typing import Dict, Any
+import logging
+from contextlib import nullcontext
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
 from fastapi.responses import JSONResponse
 
+from .. import codec
 from ..services.github_app import GitHubAppService
 from ..services.authz import AuthService
 from ..services.config_loader import ConfigLoaderService
 from ..services.queue import QueueService
 from ..services.checks import ChecksService
-from ..security.signature import verify_webhook_signature
-from ..models.config import TestbotConfig
+from ..services.changed_files import ChangedFilesCache, is_relevant
+from ..services.effective_config import EffectiveConfig, EffectiveConfigResolver
+from ..services.admission import AdmissionRejected, classify, scan_installation_id
+from ..services.container import ServiceContainer, get_services
+from ..services.graphql import PullRequestHeadMoved
+from ..services.inbox import InboxItem
+from ..services.prefetch import PullRequestPrefetcher
+from ..services.rate_limit import RequestPriority
+from ..services.resilience import deadline
+from ..services.routing import ignore_reason, should_handle
+from ..security.signature import PayloadTooLargeError, read_signed_body, verify_webhook_signature
+from ..settings import get_settings
+from ..models.config import CONFIG_PATH, TestbotConfig
+from ..models.events import IssueCommentEvent, PullRequestEvent, PushEvent, WebhookEvent, decode_event
+from ..models.jobs import JobType
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Pull request actions that generate tests for the head SHA
+TEST_GENERATION_ACTIONS = frozenset({"opened", "reopened", "synchronize"})
+
 
 @router.post("/github")
 async def github_webhook(
@@ -22,6 +42,7 @@ async def github_webhook(
     x_hub_signature_256: str = Header(None),
     x_github_event: str = Header(None),
     x_github_delivery: str = Header(None),
+    services: ServiceContainer = Depends(get_services),
 ):
     """Handle GitHub webhook events."""
 
@@ -29,66 +50,282 @@ async def github_webhook(
     if not x_hub_signature_256:
         raise HTTPException(status_code=401, detail="Missing signature header")
 
-    body = await request.body()
-    if not verify_webhook_signature(body, x_hub_signature_256):
+    # Reject oversized deliveries before reading them when the size is known
+    max_bytes = get_settings().webhook_max_body_bytes
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Payload too large")
+
+    # Hash the body while it streams in; the same buffer goes to the decoder
+    try:
+        body, mac = await read_signed_body(request.stream(), max_bytes)
+    except PayloadTooLargeError:
+        raise HTTPException(status_code=413, detail="Payload too large")
+
+    if not verify_webhook_signature(body, x_hub_signature_256, mac=mac):
         raise HTTPException(status_code=401, detail="Invalid signature")
 
-    # Parse webhook payload
+    # Acknowledge events and actions we do not act on before any decoding
+    if ignore_reason(x_github_event, body) is not None:
+        return JSONResponse(content={"status": "acknowledged"})
+
+    # GitHub stops waiting for the response; skip API calls that cannot finish before
+    webhook_deadline = get_settings().webhook_deadline
+    with deadline(webhook_deadline) if webhook_deadline > 0 else nullcontext():
+        # Bound concurrent deliveries; shed low-priority ones when saturated
+        admission = getattr(request.app.state, "webhook_admission", None)
+        if admission is None:
+            return await process_delivery(request, services, x_github_event, x_github_delivery, body)
+        try:
+            async with admission.admit(classify(x_github_event, body), scan_installation_id(body)):
+                return await process_delivery(request, services, x_github_event, x_github_delivery, body)
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=503,
+                detail="Webhook delivery shed",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+
+async def process_delivery(
+    request: Request,
+    services: ServiceContainer,
+    event_name: Optional[str],
+    delivery_id: Optional[str],
+    body: codec.Buffer,
+) -> JSONResponse:
+    """Deduplicate, then queue or dispatch a verified delivery."""
+    # Short-circuit GitHub retries and manual redeliveries
+    dedup = getattr(request.app.state, "webhook_dedup", None)
+    if dedup is not None and await dedup.check_and_mark(delivery_id):
+        return JSONResponse(content={"status": "duplicate"})
+
     try:
-        payload = await request.json()
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=422, detail="Invalid JSON payload")
+        # Inbox mode: persist the verified delivery and acknowledge
+        # immediately, the inbox worker pool dispatches it to the handlers.
+        inbox = getattr(request.app.state, "webhook_inbox", None)
+        if inbox is not None:
+            await inbox.put(event_name, body, delivery_id)
+            return JSONResponse(status_code=202, content={"status": "accepted"})
+
+        # Decode the handled fields from the same buffer the signature covered
+        try:
+            event = decode_event(event_name, body)
+        except codec.PayloadDecodeError:
+            raise HTTPException(status_code=422, detail="Invalid JSON payload")
+
+        return await dispatch_event(event, services)
+    except Exception:
+        # Let GitHub's redelivery of a failed delivery through
+        if dedup is not None:
+            await dedup.forget(delivery_id)
+        raise
+
+
+async def dispatch_event(
+    event: Optional[WebhookEvent], services: ServiceContainer, durable: bool = False
+) -> JSONResponse:
+    """Dispatch a decoded webhook event to its handler.
+
+    ``durable`` deliveries come from the inbox and are only finished once
+    their work is done, so a debounced push is waited for.
+    """
+    if not should_handle(event):
+        return JSONResponse(content={"status": "acknowledged"})
 
-    # Create service instances
-    github_app_service = GitHubAppService()
-    auth_service = AuthService()
-    config_loader = ConfigLoaderService(github_app_service)
-    queue_service = QueueService()
-    checks_service = ChecksService(github_app_service)
+    github_app_service = services.github_app
+    auth_service = services.auth
+    config_loader = services.config_loader
+    queue_service = services.queue
+    checks_service = services.checks
 
     # Handle different event types
     # Core events for the gateway functionality
-    if x_github_event == "issue_comment":
+    if isinstance(event, IssueCommentEvent):
         return await handle_issue_comment(
-            payload, github_app_service, auth_service, config_loader, queue_service, checks_service
+            event, github_app_service, auth_service, config_loader, queue_service, checks_service,
+            effective_config=services.effective_config, prefetcher=services.prefetcher,
         )
-    elif x_github_event == "pull_request":
+    elif isinstance(event, PullRequestEvent):
+        # Warm what a bot command on the pull request will need
+        if services.prefetcher is not None and event.action in TEST_GENERATION_ACTIONS:
+            services.prefetcher.offer(event)
+        # Hold pushes briefly so a burst only builds the latest head SHA
+        if event.action == "synchronize" and services.coalescer is not None:
+            if durable:
+                # Failures submitting the push fail the delivery, which is retried
+                await services.coalescer.offer_and_wait(event)
+            else:
+                services.coalescer.offer(event)
+            return JSONResponse(status_code=202, content={"status": "debounced"})
         return await handle_pull_request(
-            payload, github_app_service, auth_service, config_loader, queue_service, checks_service
+            event, github_app_service, auth_service, config_loader, queue_service, checks_service,
+            effective_config=services.effective_config, changed_files=services.changed_files,
         )
+    elif isinstance(event, PushEvent):
+        # A push touching the config file moves what the branch resolves to
+        if event.ref and event.ref.startswith("refs/heads/"):
+            await services.effective_config.invalidate_ref(event.owner, event.repo, event.ref)
+        return JSONResponse(content={"status": "acknowledged"})
     else:
         # Acknowledge other events (including any additional events you add later)
         return JSONResponse(content={"status": "acknowledged"})
 
 
+async def submit_pull_request(event: PullRequestEvent, services: ServiceContainer) -> JSONResponse:
+    """Handle a pull request push released by the coalescing window."""
+    return await handle_pull_request(
+        event, services.github_app, services.auth, services.config_loader, services.queue, services.checks,
+        effective_config=services.effective_config, changed_files=services.changed_files,
+    )
+
+
+async def process_inbox_item(item: InboxItem, services: ServiceContainer) -> JSONResponse:
+    """Process a delivery drained from the webhook inbox."""
+    return await dispatch_event(decode_event(item.event, item.body), services, durable=True)
+
+
 async def handle_issue_comment(
-    payload: Dict[str, Any],
+    event: IssueCommentEvent,
     github_app_service: GitHubAppService,
     auth_service: AuthService,
     config_loader: ConfigLoaderService,
     queue_service: QueueService,
     checks_service: ChecksService,
+    effective_config: Optional[EffectiveConfigResolver] = None,
+    prefetcher: Optional[PullRequestPrefetcher] = None,
 ) -> JSONResponse:
-    """Handle issue comment events."""
-    # TODO: Implement issue comment handling
-    # - Check if comment contains test generation command
-    # - Verify user permissions
-    # - Load configuration
-    # - Enqueue test generation job
+    """Handle issue comment events.
+
+    A bot command on a pull request generates tests for its head. The head
+    and the effective config at it are usually warm from the pull request's
+    latest event; otherwise the head is looked up.
+    """
+    if (
+        event.is_pull_request
+        and effective_config is not None
+        and event.installation_id and event.owner and event.repo and event.number
+    ):
+        # TODO: Verify user permissions
+        head = prefetcher.head(event.owner, event.repo, event.number) if prefetcher is not None else None
+        if head is not None:
+            head_sha, head_ref, head_repo = head.head_sha, head.head_ref, head.head_repo
+        else:
+            # One query; the config comes from the effective config below
+            context = await github_app_service.get_pull_request_context(
+                event.owner, event.repo, event.number, event.installation_id,
+                config_path=None, priority=RequestPriority.INTERACTIVE,
+            )
+            head_sha, head_ref, head_repo = context.head_sha, context.head_ref, context.head_repo
+
+        # ConfigUnavailable propagates: the delivery is retried rather than built with defaults
+        config = await effective_config.resolve(
+            event.owner, event.repo, head_sha, event.installation_id, RequestPriority.INTERACTIVE
+        )
+        if not (config.enabled and config.test_generation):
+            return JSONResponse(content={"status": "disabled"})
+
+        await queue_service.enqueue_job({
+            "job_type": JobType.TEST_GENERATION.value,
+            "owner": event.owner,
+            "repository": event.repo,
+            "commit_sha": head_sha,
+            "branch": head_ref,
+            "pr_number": event.number,
+            "head_repository": head_repo,
+            "installation_id": event.installation_id,
+            "config": config.model_dump(mode="json", exclude={"version"}),
+            "config_version": config.version,
+            "source": "comment",
+        })
+
     return JSONResponse(content={"status": "comment_processed"})
 
 
 async def handle_pull_request(
-    payload: Dict[str, Any],
+    event: PullRequestEvent,
     github_app_service: GitHubAppService,
     auth_service: AuthService,
     config_loader: ConfigLoaderService,
     queue_service: QueueService,
     checks_service: ChecksService,
+    effective_config: Optional[EffectiveConfigResolver] = None,
+    changed_files: Optional[ChangedFilesCache] = None,
 ) -> JSONResponse:
     """Handle pull request events."""
+    if (
+        event.action in TEST_GENERATION_ACTIONS
+        and effective_config is not None
+        and event.installation_id and event.owner and event.repo and event.number and event.head_sha
+    ):
+        # ConfigUnavailable propagates: the delivery is retried rather than built with defaults
+        config = await effective_config.resolve(event.owner, event.repo, event.head_sha, event.installation_id)
+        if not (config.enabled and config.test_generation):
+            return JSONResponse(content={"status": "disabled"})
+
+        # Pushes touching only docs, lockfiles or excluded paths do not need a job
+        if changed_files is not None:
+            skipped = await skip_reason(event, config, changed_files)
+            if skipped is not None:
+                if get_settings().pr_change_filter_neutral_check:
+                    await post_skipped_check(event, checks_service, skipped)
+                return JSONResponse(content={"status": "skipped", "reason": "no_relevant_changes"})
+
+        await queue_service.enqueue_job({
+            "job_type": JobType.TEST_GENERATION.value,
+            "owner": event.owner,
+            "repository": event.repo,
+            "commit_sha": event.head_sha,
+            "branch": event.head_ref,
+            "pr_number": event.number,
+            "head_repository": event.head_repo,
+            "installation_id": event.installation_id,
+            "config": config.model_dump(mode="json", exclude={"version"}),
+            "config_version": config.version,
+            "source": "webhook",
+        })
+
     # TODO: Implement PR event handling
     # - Check PR state changes
     # - Update status checks
     # - Handle configuration changes
     return JSONResponse(content={"status": "pr_processed"})
+
+
+async def post_skipped_check(event: PullRequestEvent, checks_service: ChecksService, summary: str) -> None:
+    """Post a neutral check run for a skipped push; best effort."""
+    try:
+        await checks_service.create_skipped_test_generation_check(
+            event.owner, event.repo, event.head_sha, event.installation_id, summary
+        )
+    except Exception:
+        # The skip stands without the check
+        logger.warning(
+            "Failed to post skipped check on %s/%s#%s", event.owner, event.repo, event.number, exc_info=True
+        )
+
+
+async def skip_reason(
+    event: PullRequestEvent, config: EffectiveConfig, changed_files: ChangedFilesCache
+) -> Optional[str]:
+    """Explain why a push needs no tests, None when it touches a relevant file."""
+    try:
+        changed = await changed_files.get(
+            event.owner, event.repo, event.number, event.head_sha, event.base_sha, event.installation_id
+        )
+    except PullRequestHeadMoved:
+        # GitHub only lists the files of the newer head
+        logger.info("%s/%s#%s moved on since %s, not skipping", event.owner, event.repo, event.number, event.head_sha)
+        return None
+    except Exception:
+        # Generating tests needlessly beats missing a change
+        logger.warning(
+            "Failed to list changed files of %s/%s#%s", event.owner, event.repo, event.number, exc_info=True
+        )
+        return None
+    if is_relevant(changed, config):
+        return None
+    return (
+        f"None of the {len(changed.paths)} changed files match the include and exclude patterns "
+        f"in {CONFIG_PATH}, no tests were generated for this push."
+    )
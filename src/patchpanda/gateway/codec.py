@@ -0,0 +1,87 @@
+"""JSON decoding for webhook payloads.
+
+Webhook bodies are decoded straight from the bytes buffer that was used for
+signature verification. orjson or msgspec are used when installed (the
+``fast-json`` extra), with the standard library as a fallback.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Tuple, Union
+
+from .settings import get_settings
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class PayloadDecodeError(ValueError):
+    """Raised when a payload is not valid JSON."""
+
+
+def _stdlib_decoder() -> Callable[[Buffer], Any]:
+    def loads(data: Buffer) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise PayloadDecodeError(str(e)) from e
+
+    return loads
+
+
+def _orjson_decoder() -> Callable[[Buffer], Any]:
+    import orjson
+
+    def loads(data: Buffer) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise PayloadDecodeError(str(e)) from e
+
+    return loads
+
+
+def _msgspec_decoder() -> Callable[[Buffer], Any]:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Buffer) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise PayloadDecodeError(str(e)) from e
+
+    return loads
+
+
+DECODERS = {
+    "orjson": _orjson_decoder,
+    "msgspec": _msgspec_decoder,
+    "json": _stdlib_decoder,
+}
+
+
+@lru_cache()
+def get_decoder(name: str = "auto") -> Tuple[str, Callable[[Buffer], Any]]:
+    """Resolve a decoder by name, returning ``(name, loads)``.
+
+    ``auto`` picks the fastest installed decoder. An explicitly requested
+    decoder that is not installed falls back to the standard library.
+    """
+    candidates = ("orjson", "msgspec") if name == "auto" else (name,)
+    for candidate in candidates:
+        factory = DECODERS.get(candidate)
+        if factory is None:
+            continue
+        try:
+            return candidate, factory()
+        except ImportError:
+            continue
+    return "json", _stdlib_decoder()
+
+
+def loads(data: Buffer) -> Any:
+    """Decode a JSON payload with the configured decoder."""
+    return get_decoder(get_settings().json_decoder)[1](data)
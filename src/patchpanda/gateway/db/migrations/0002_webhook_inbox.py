@@ -0,0 +1,43 @@
+"""Add webhook inbox
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create webhook_inbox table
+    op.create_table('webhook_inbox',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('delivery_id', sa.String(length=100), nullable=True),
+        sa.Column('event', sa.String(length=100), nullable=False),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_inbox_delivery_id'), 'webhook_inbox', ['delivery_id'], unique=False)
+    op.create_index(op.f('ix_webhook_inbox_status'), 'webhook_inbox', ['status'], unique=False)
+    op.create_index(op.f('ix_webhook_inbox_received_at'), 'webhook_inbox', ['received_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webhook_inbox_received_at'), table_name='webhook_inbox')
+    op.drop_index(op.f('ix_webhook_inbox_status'), table_name='webhook_inbox')
+    op.drop_index(op.f('ix_webhook_inbox_delivery_id'), table_name='webhook_inbox')
+    op.drop_table('webhook_inbox')
@@ -0,0 +1,25 @@
+"""Add billing project default config
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Configuration defaults layered under repository bindings
+    op.add_column('billing_projects', sa.Column('default_config', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('billing_projects', 'default_config')
@@ -0,0 +1,27 @@
+"""Add pull request number and head repository to jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Superseded jobs are cancelled per pull request, not per branch name
+    op.add_column('jobs', sa.Column('pr_number', sa.Integer(), nullable=True))
+    op.add_column('jobs', sa.Column('head_repository', sa.String(length=200), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'head_repository')
+    op.drop_column('jobs', 'pr_number')
@@ -0,0 +1,25 @@
+"""Add retry backoff to the webhook inbox
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Failed deliveries are not claimed again before available_at
+    op.add_column('webhook_inbox', sa.Column('available_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('webhook_inbox', 'available_at')
@@ -1,7 +1,7 @@
 """Database table definitions."""
 
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, ForeignKey, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,6 +19,9 @@ class Job(Base):
     owner = Column(String(100), nullable=False)
     commit_sha = Column(String(40), nullable=False)
     branch = Column(String(100), nullable=False)
+    # Pull request the job was created for and the repository its head lives in
+    pr_number = Column(Integer, nullable=True)
+    head_repository = Column(String(200), nullable=True)
 
     job_type = Column(String(50), nullable=False)
     status = Column(String(20), nullable=False, default="pending")
@@ -84,6 +87,9 @@ class BillingProject(Base):
     monthly_limit = Column(Integer, nullable=True)
     current_usage = Column(Integer, nullable=False, default=0)
 
+    # Configuration defaults for every bound repository
+    default_config = Column(JSON, nullable=True)
+
     # Status
     active = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime, nullable=False, default=func.now())
@@ -139,11 +145,6 @@ class RepositoryBinding(Base):
     # Relationships
     project = relationship("BillingProject", backref="repository_bindings")
 
-    # Unique constraint
-    __table_args__ = (
-        {"sqlite_on_conflict": "REPLACE"},
-    )
-
 
 class AuditEvent(Base):
     """Audit events table."""
@@ -163,7 +164,26 @@ class AuditEvent(Base):
     ip_address = Column(String(45), nullable=True)  # IPv6 compatible
     user_agent = Column(String(500), nullable=True)
 
-    # Index for efficient querying
-    __table_args__ = (
-        {"sqlite_on_conflict": "REPLACE"},
-    )
+
+class WebhookDelivery(Base):
+    """Durable inbox of verified GitHub webhook deliveries."""
+
+    __tablename__ = "webhook_inbox"
+
+    id = Column(String(36), primary_key=True)
+    delivery_id = Column(String(100), nullable=True, index=True)
+    event = Column(String(100), nullable=False)
+
+    # Raw, signature-verified request body
+    body = Column(LargeBinary, nullable=False)
+
+    # Processing state
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text, nullable=True)
+
+    received_at = Column(DateTime, nullable=False, default=func.now(), index=True)
+    # Not claimed before this time while backing off after a failure
+    available_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
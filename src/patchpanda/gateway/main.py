@@ -1,12 +1,81 @@
 """PatchPanda Gateway main application."""
 
+from contextlib import asynccontextmanager
+from functools import partial
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .api import admin, coverage, jobs, webhooks
+from .api import admin, coverage, internal, jobs, webhooks
+from .db.base import SessionLocal
+from .services.admission import AdmissionController
+from .services.coalescer import PullRequestCoalescer
+from .services.container import ServiceContainer
+from .services.dedup import DeliveryDeduplicator
+from .services.inbox import DatabaseInboxBackend, InboxWorkerPool
 from .settings import get_settings
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services and start background workers with the application."""
+    settings = get_settings()
+    services = ServiceContainer(settings, session_factory=SessionLocal)
+    app.state.services = services
+
+    if settings.pr_coalesce_window > 0:
+        services.coalescer = PullRequestCoalescer(
+            partial(webhooks.submit_pull_request, services=services),
+            window=settings.pr_coalesce_window,
+            max_delay=settings.pr_coalesce_max_delay,
+            session_factory=SessionLocal,
+        )
+
+    admission = None
+    if settings.webhook_admission_enabled:
+        admission = AdmissionController(
+            max_in_flight=settings.webhook_max_in_flight,
+            low_priority_share=settings.webhook_low_priority_share,
+            queue_timeout=settings.webhook_admission_queue_timeout,
+            retry_after=settings.webhook_shed_retry_after,
+            installation_rate=settings.webhook_installation_rate,
+            installation_burst=settings.webhook_installation_burst,
+        )
+    app.state.webhook_admission = admission
+
+    dedup = None
+    if settings.webhook_dedup_enabled:
+        dedup = DeliveryDeduplicator(
+            redis_client=services.redis,
+            max_entries=settings.webhook_dedup_max_entries,
+            ttl_seconds=settings.webhook_dedup_ttl,
+        )
+    app.state.webhook_dedup = dedup
+
+    inbox = None
+    if settings.webhook_inbox_enabled:
+        inbox = InboxWorkerPool(
+            DatabaseInboxBackend(
+                SessionLocal,
+                visibility_timeout=settings.webhook_inbox_visibility_timeout,
+            ),
+            partial(webhooks.process_inbox_item, services=services),
+            workers=settings.webhook_inbox_workers,
+            poll_interval=settings.webhook_inbox_poll_interval,
+            max_attempts=settings.webhook_inbox_max_attempts,
+            retry_backoff=settings.webhook_inbox_retry_backoff,
+            retry_backoff_max=settings.webhook_inbox_retry_backoff_max,
+        )
+        await inbox.start()
+    app.state.webhook_inbox = inbox
+
+    yield
+
+    if inbox is not None:
+        await inbox.stop()
+    await services.aclose()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = get_settings()
@@ -17,6 +86,7 @@ def create_app() -> FastAPI:
         version="0.1.0",
         docs_url="/docs",  # Always enable docs for development
         redoc_url="/redoc",  # Always enable redoc for development
+        lifespan=lifespan,
     )
 
     # CORS middleware
@@ -37,6 +107,7 @@ def create_app() -> FastAPI:
     )
     app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
     app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+    app.include_router(internal.router, prefix="/internal/metrics", tags=["internal"])
 
     @app.get("/healthz")
     async def health_check():
@@ -3,6 +3,9 @@
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field, ConfigDict
 
+# Repository path of the config file
+CONFIG_PATH = ".testbot.yml"
+
 
 class TestbotConfig(BaseModel):
     """Configuration for PatchPanda test bot."""
@@ -0,0 +1,322 @@
+"""Compact webhook event structures.
+
+GitHub deliveries carry hundreds of nested objects, but the gateway only
+acts on a handful of fields. Events are decoded into small ``__slots__``
+dataclasses so the full payload dict can be released as soon as the
+delivery has been parsed. When msgspec is installed the raw body is decoded
+straight into typed structs that skip every field not listed here, unless
+``JSON_DECODER`` pins a different decoder. Either way, a listed field of the
+wrong JSON type raises ``PayloadDecodeError``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, List, Optional, Type
+
+from .. import codec
+from ..settings import get_settings
+from .config import CONFIG_PATH
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional fast-json extra
+    msgspec = None
+
+
+@dataclass(frozen=True, slots=True)
+class WebhookEvent:
+    """Fields shared by every handled webhook event."""
+
+    event_name: ClassVar[str] = ""
+
+    action: Optional[str] = None
+    installation_id: Optional[int] = None
+    owner: Optional[str] = None
+    repo: Optional[str] = None
+    sender: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class PullRequestEvent(WebhookEvent):
+    """A ``pull_request`` delivery."""
+
+    event_name: ClassVar[str] = "pull_request"
+
+    number: Optional[int] = None
+    head_sha: Optional[str] = None
+    head_ref: Optional[str] = None
+    # owner/name of the repository the head branch lives in, a fork for fork PRs
+    head_repo: Optional[str] = None
+    base_sha: Optional[str] = None
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "PullRequestEvent":
+        """Build the event from a decoded payload dict."""
+        pull_request = _object(payload, "pull_request", "$")
+        head = _object(pull_request, "head", "$.pull_request")
+        base = _object(pull_request, "base", "$.pull_request")
+        number = _typed(payload, "number", int, "$")
+        pr_number = _typed(pull_request, "number", int, "$.pull_request")
+        return cls(
+            **_common(payload),
+            number=number or pr_number,
+            head_sha=_typed(head, "sha", str, "$.pull_request.head"),
+            head_ref=_typed(head, "ref", str, "$.pull_request.head"),
+            head_repo=_typed(
+                _object(head, "repo", "$.pull_request.head"), "full_name", str, "$.pull_request.head.repo"
+            ),
+            base_sha=_typed(base, "sha", str, "$.pull_request.base"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class IssueCommentEvent(WebhookEvent):
+    """An ``issue_comment`` delivery."""
+
+    event_name: ClassVar[str] = "issue_comment"
+
+    number: Optional[int] = None
+    comment_id: Optional[int] = None
+    comment_body: Optional[str] = None
+    is_pull_request: bool = False
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "IssueCommentEvent":
+        """Build the event from a decoded payload dict."""
+        issue = _object(payload, "issue", "$")
+        comment = _object(payload, "comment", "$")
+        _object(issue, "pull_request", "$.issue")
+        return cls(
+            **_common(payload),
+            number=_typed(issue, "number", int, "$.issue"),
+            comment_id=_typed(comment, "id", int, "$.comment"),
+            comment_body=_typed(comment, "body", str, "$.comment"),
+            is_pull_request=issue.get("pull_request") is not None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PushEvent(WebhookEvent):
+    """A ``push`` delivery, reduced to whether it may have changed the config file."""
+
+    event_name: ClassVar[str] = "push"
+
+    ref: Optional[str] = None
+    head_sha: Optional[str] = None
+    config_changed: bool = False
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "PushEvent":
+        """Build the event from a decoded payload dict."""
+        commits = [
+            [_strings(commit, change, f"$.commits[{i}]") for change in ("added", "modified", "removed")]
+            for i, commit in enumerate(_objects(payload, "commits", "$"))
+        ]
+        return cls(
+            **_common(payload),
+            ref=_typed(payload, "ref", str, "$"),
+            head_sha=_typed(payload, "after", str, "$"),
+            config_changed=bool(_typed(payload, "forced", bool, "$") or _typed(payload, "deleted", bool, "$"))
+            or any(_touches_config(path_lists) for path_lists in commits),
+        )
+
+
+EVENT_TYPES: Dict[str, Type[WebhookEvent]] = {
+    "pull_request": PullRequestEvent,
+    "issue_comment": IssueCommentEvent,
+    "push": PushEvent,
+}
+
+
+def _touches_config(path_lists: Any) -> bool:
+    return any(isinstance(paths, list) and CONFIG_PATH in paths for paths in path_lists)
+
+
+_JSON_TYPES = {dict: "object", list: "array", str: "str", int: "int", float: "float", bool: "bool"}
+
+
+def _type_error(expected: type, value: Any, path: str) -> codec.PayloadDecodeError:
+    # Worded like msgspec's ValidationError
+    return codec.PayloadDecodeError(
+        f"Expected `{_JSON_TYPES[expected]}`, got `{_JSON_TYPES.get(type(value), 'null')}` - at `{path}`"
+    )
+
+
+def _typed(parent: Dict[str, Any], key: str, expected: type, path: str) -> Any:
+    """Return an optional field, checking its JSON type."""
+    value = parent.get(key)
+    # bool is an int subclass, but JSON true is not a number
+    if value is None or (isinstance(value, expected) and (expected is bool or not isinstance(value, bool))):
+        return value
+    raise _type_error(expected, value, f"{path}.{key}")
+
+
+def _object(parent: Dict[str, Any], key: str, path: str) -> Dict[str, Any]:
+    """Return an optional nested object, empty when missing."""
+    return _typed(parent, key, dict, path) or {}
+
+
+def _objects(parent: Dict[str, Any], key: str, path: str) -> List[Dict[str, Any]]:
+    """Return an optional array of objects, empty when missing."""
+    items = _typed(parent, key, list, path) or []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise _type_error(dict, item, f"{path}.{key}[{i}]")
+    return items
+
+
+def _strings(parent: Dict[str, Any], key: str, path: str) -> Optional[List[str]]:
+    """Return an optional array of strings."""
+    items = _typed(parent, key, list, path)
+    for i, item in enumerate(items or ()):
+        if not isinstance(item, str):
+            raise _type_error(str, item, f"{path}.{key}[{i}]")
+    return items
+
+
+def _common(payload: Dict[str, Any]) -> Dict[str, Any]:
+    repository = _object(payload, "repository", "$")
+    return {
+        "action": _typed(payload, "action", str, "$"),
+        "installation_id": _typed(_object(payload, "installation", "$"), "id", int, "$.installation"),
+        "owner": _typed(_object(repository, "owner", "$.repository"), "login", str, "$.repository.owner"),
+        "repo": _typed(repository, "name", str, "$.repository"),
+        "sender": _typed(_object(payload, "sender", "$"), "login", str, "$.sender"),
+    }
+
+
+if msgspec is not None:
+
+    class _Account(msgspec.Struct):
+        login: Optional[str] = None
+
+    class _Installation(msgspec.Struct):
+        id: Optional[int] = None
+
+    class _Repository(msgspec.Struct):
+        name: Optional[str] = None
+        owner: Optional[_Account] = None
+
+    class _HeadRepository(msgspec.Struct):
+        full_name: Optional[str] = None
+
+    class _Ref(msgspec.Struct):
+        sha: Optional[str] = None
+        ref: Optional[str] = None
+        repo: Optional[_HeadRepository] = None
+
+    class _PullRequest(msgspec.Struct):
+        number: Optional[int] = None
+        head: Optional[_Ref] = None
+        base: Optional[_Ref] = None
+
+    class _Present(msgspec.Struct):
+        """Matches any object without decoding its fields."""
+
+    class _Issue(msgspec.Struct):
+        number: Optional[int] = None
+        pull_request: Optional[_Present] = None
+
+    class _Comment(msgspec.Struct):
+        id: Optional[int] = None
+        body: Optional[str] = None
+
+    class _Payload(msgspec.Struct):
+        action: Optional[str] = None
+        installation: Optional[_Installation] = None
+        repository: Optional[_Repository] = None
+        sender: Optional[_Account] = None
+
+    class _PullRequestPayload(_Payload):
+        number: Optional[int] = None
+        pull_request: Optional[_PullRequest] = None
+
+    class _IssueCommentPayload(_Payload):
+        issue: Optional[_Issue] = None
+        comment: Optional[_Comment] = None
+
+    class _Commit(msgspec.Struct):
+        added: Optional[List[str]] = None
+        modified: Optional[List[str]] = None
+        removed: Optional[List[str]] = None
+
+    class _PushPayload(_Payload):
+        ref: Optional[str] = None
+        after: Optional[str] = None
+        forced: bool = False
+        deleted: bool = False
+        commits: Optional[List[_Commit]] = None
+
+    def _struct_common(payload: "_Payload") -> Dict[str, Any]:
+        repository = payload.repository
+        return {
+            "action": payload.action,
+            "installation_id": payload.installation.id if payload.installation else None,
+            "owner": repository.owner.login if repository and repository.owner else None,
+            "repo": repository.name if repository else None,
+            "sender": payload.sender.login if payload.sender else None,
+        }
+
+    def _pull_request_from_struct(payload: "_PullRequestPayload") -> PullRequestEvent:
+        pull_request = payload.pull_request or _PullRequest()
+        head = pull_request.head or _Ref()
+        base = pull_request.base or _Ref()
+        return PullRequestEvent(
+            **_struct_common(payload),
+            number=payload.number or pull_request.number,
+            head_sha=head.sha,
+            head_ref=head.ref,
+            head_repo=head.repo.full_name if head.repo else None,
+            base_sha=base.sha,
+        )
+
+    def _issue_comment_from_struct(payload: "_IssueCommentPayload") -> IssueCommentEvent:
+        issue = payload.issue or _Issue()
+        comment = payload.comment or _Comment()
+        return IssueCommentEvent(
+            **_struct_common(payload),
+            number=issue.number,
+            comment_id=comment.id,
+            comment_body=comment.body,
+            is_pull_request=issue.pull_request is not None,
+        )
+
+    def _push_from_struct(payload: "_PushPayload") -> PushEvent:
+        return PushEvent(
+            **_struct_common(payload),
+            ref=payload.ref,
+            head_sha=payload.after,
+            config_changed=payload.forced or payload.deleted or any(
+                _touches_config((commit.added, commit.modified, commit.removed)) for commit in payload.commits or ()
+            ),
+        )
+
+    _STRUCT_DECODERS = {
+        "pull_request": (msgspec.json.Decoder(_PullRequestPayload), _pull_request_from_struct),
+        "issue_comment": (msgspec.json.Decoder(_IssueCommentPayload), _issue_comment_from_struct),
+        "push": (msgspec.json.Decoder(_PushPayload), _push_from_struct),
+    }
+
+
+def decode_event(event: Optional[str], body: codec.Buffer) -> Optional[WebhookEvent]:
+    """Decode a raw delivery body into its compact event.
+
+    Returns None for event types the gateway does not handle, without
+    decoding the body at all.
+    """
+    event_type = EVENT_TYPES.get(event or "")
+    if event_type is None:
+        return None
+
+    if msgspec is not None and get_settings().json_decoder in ("auto", "msgspec"):
+        decoder, convert = _STRUCT_DECODERS[event]
+        try:
+            return convert(decoder.decode(body))
+        except msgspec.DecodeError as e:
+            # ValidationError (wrong field types) is a DecodeError subclass
+            raise codec.PayloadDecodeError(str(e)) from e
+
+    payload = codec.loads(body)
+    if not isinstance(payload, dict):
+        raise codec.PayloadDecodeError("Webhook payload must be a JSON object")
+    return event_type.from_payload(payload)
+
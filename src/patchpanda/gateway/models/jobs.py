@@ -40,6 +40,8 @@ class JobCreate(BaseModel):
     owner: str = Field(description="Repository owner")
     commit_sha: str = Field(description="Commit SHA to analyze")
     branch: str = Field(description="Branch name")
+    pr_number: Optional[int] = Field(default=None, description="Pull request number")
+    head_repository: Optional[str] = Field(default=None, description="Repository of the pull request head (owner/name)")
 
     job_type: JobType = Field(description="Type of job to create")
     priority: JobPriority = Field(default=JobPriority.NORMAL, description="Job priority")
@@ -63,6 +65,8 @@ class JobData(BaseModel):
     owner: str = Field(description="Repository owner")
     commit_sha: str = Field(description="Commit SHA to analyze")
     branch: str = Field(description="Branch name")
+    pr_number: Optional[int] = Field(default=None, description="Pull request number")
+    head_repository: Optional[str] = Field(default=None, description="Repository of the pull request head (owner/name)")
 
     job_type: JobType = Field(description="Type of job")
     status: JobStatus = Field(description="Current job status")
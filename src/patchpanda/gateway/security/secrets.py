@@ -22,6 +22,19 @@ class SecretsManager:
         self._gcp_kms_client = None
         self._gcp_credentials = None
 
+    def close(self) -> None:
+        """Close cached cloud clients and their connection pools."""
+        for client in (self._aws_kms_client, self._aws_secrets_client):
+            if client is not None:
+                client.close()
+        for client in (self._gcp_secrets_client, self._gcp_kms_client):
+            if client is not None:
+                client.transport.close()
+        self._aws_kms_client = None
+        self._aws_secrets_client = None
+        self._gcp_secrets_client = None
+        self._gcp_kms_client = None
+
     # AWS Clients
     @property
     def aws_kms_client(self):
@@ -2,42 +2,80 @@
 
 import hmac
 import hashlib
-from typing import Union
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Tuple, Union
 from ..settings import get_settings
 
 
+class PayloadTooLargeError(Exception):
+    """Raised when a webhook body exceeds the configured size limit."""
+
+
+@lru_cache(maxsize=4)
+def _keyed_hmac(secret: str) -> "hmac.HMAC":
+    # Key schedule computed once per secret; callers only use copies
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+
+def new_webhook_hmac() -> Optional["hmac.HMAC"]:
+    """Return a fresh HMAC-SHA256 context keyed with the webhook secret.
+
+    Returns None when no webhook secret is configured.
+    """
+    webhook_secret = get_settings().github_webhook_secret
+    if not webhook_secret:
+        return None
+    return _keyed_hmac(webhook_secret).copy()
+
+
+async def read_signed_body(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int,
+) -> Tuple[bytearray, Optional["hmac.HMAC"]]:
+    """Read a streamed body while feeding each chunk into the webhook HMAC.
+
+    Raises PayloadTooLargeError as soon as more than ``max_bytes`` arrive.
+    """
+    mac = new_webhook_hmac()
+    body = bytearray()
+    async for chunk in chunks:
+        if len(body) + len(chunk) > max_bytes:
+            raise PayloadTooLargeError(f"Webhook body exceeds {max_bytes} bytes")
+        if mac is not None:
+            mac.update(chunk)
+        body += chunk
+    return body, mac
+
+
 def verify_webhook_signature(
-    payload: Union[bytes, str],
-    signature_header: str
+    payload: Union[bytes, bytearray, str],
+    signature_header: str,
+    mac: Optional["hmac.HMAC"] = None,
 ) -> bool:
-    """Verify GitHub webhook signature."""
-    settings = get_settings()
+    """Verify GitHub webhook signature.
 
+    ``mac`` may carry an HMAC context already fed with the payload by
+    ``read_signed_body``, in which case the payload is not hashed again.
+    """
     if not signature_header or not signature_header.startswith("sha256="):
         return False
 
     # Extract signature from header
     expected_signature = signature_header[7:]  # Remove "sha256=" prefix
 
-    # Get webhook secret
-    webhook_secret = settings.github_webhook_secret
+    if mac is None:
+        mac = new_webhook_hmac()
+        if mac is None:
+            # TODO: Log warning about missing webhook secret
+            return False
 
-    if not webhook_secret:
-        # TODO: Log warning about missing webhook secret
-        return False
-
-    # Convert payload to bytes if it's a string
-    if isinstance(payload, str):
-        payload_bytes = payload.encode('utf-8')
-    else:
-        payload_bytes = payload
+        # Convert payload to bytes if it's a string
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        mac.update(payload)
 
     # Calculate expected signature
-    calculated_signature = hmac.new(
-        webhook_secret.encode('utf-8'),
-        payload_bytes,
-        hashlib.sha256
-    ).hexdigest()
+    calculated_signature = mac.hexdigest()
 
     # Compare signatures using constant-time comparison
     return hmac.compare_digest(expected_signature, calculated_signature)
@@ -0,0 +1,195 @@
+"""Admission control and load shedding for webhook deliveries.
+
+Bounds the number of deliveries processed concurrently. When the gateway is
+saturated, bot commands and pull request updates wait briefly for a slot in
+priority order while everything else is shed with a 503 and ``Retry-After``.
+Per-installation token buckets keep one noisy installation from starving
+the rest.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .routing import ignore_reason, scan_action
+
+
+class Priority(IntEnum):
+    """Admission priority classes, lower is served first."""
+    COMMAND = 0
+    PULL_REQUEST = 1
+    OTHER = 2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a delivery is shed."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+_INSTALLATION_ID = re.compile(rb'"installation"\s*:\s*\{\s*"id"\s*:\s*(\d+)')
+
+
+def classify(event: Optional[str], body: bytes) -> Priority:
+    """Assign a priority class from the event header and body prefix."""
+    if event == "issue_comment" and ignore_reason(event, body) is None:
+        return Priority.COMMAND
+    if event == "pull_request" and scan_action(body) in ("opened", "synchronize"):
+        return Priority.PULL_REQUEST
+    return Priority.OTHER
+
+
+def scan_installation_id(body: bytes) -> Optional[int]:
+    """Find the installation id in a raw body without decoding it."""
+    match = _INSTALLATION_ID.search(body)
+    return int(match.group(1)) if match else None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def try_take(self) -> bool:
+        """Take one token if available."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def retry_after(self) -> int:
+        """Seconds until the next token is available."""
+        return max(1, math.ceil((1 - self._tokens) / self.rate))
+
+
+class AdmissionController:
+    """Bounded in-flight limiter with priority classes and per-installation buckets."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 64,
+        low_priority_share: float = 0.75,
+        queue_timeout: float = 2.0,
+        retry_after: int = 5,
+        installation_rate: float = 10.0,
+        installation_burst: int = 50,
+        max_installations: int = 10000,
+    ):
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.installation_rate = installation_rate
+        self.installation_burst = installation_burst
+        self.max_installations = max_installations
+        # Low-priority deliveries leave headroom for commands and PR updates
+        self._limits = {
+            Priority.COMMAND: max_in_flight,
+            Priority.PULL_REQUEST: max_in_flight,
+            Priority.OTHER: max(1, int(max_in_flight * low_priority_share)),
+        }
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._admitted = {priority: 0 for priority in Priority}
+        self._shed: Dict[str, int] = {"saturated": 0, "queue_timeout": 0, "rate_limited": 0}
+        self._queued = 0
+
+    def _bucket(self, installation_id: int) -> TokenBucket:
+        bucket = self._buckets.get(installation_id)
+        if bucket is None:
+            bucket = self._buckets[installation_id] = TokenBucket(
+                self.installation_rate, self.installation_burst
+            )
+            if len(self._buckets) > self.max_installations:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(installation_id)
+        return bucket
+
+    def _reject(self, reason: str, retry_after: int) -> AdmissionRejected:
+        self._shed[reason] += 1
+        return AdmissionRejected(reason, retry_after)
+
+    def _has_waiter_ahead(self, priority: Priority) -> bool:
+        return any(not future.done() and waiting <= priority for waiting, _, future in self._waiters)
+
+    async def acquire(self, priority: Priority, installation_id: Optional[int] = None) -> None:
+        """Take an in-flight slot or raise AdmissionRejected."""
+        if installation_id is not None:
+            bucket = self._bucket(installation_id)
+            if not bucket.try_take():
+                raise self._reject("rate_limited", bucket.retry_after())
+
+        if self._in_flight < self._limits[priority] and not self._has_waiter_ahead(priority):
+            self._in_flight += 1
+            self._admitted[priority] += 1
+            return
+
+        if priority == Priority.OTHER:
+            raise self._reject("saturated", self.retry_after)
+
+        # Wait for a slot handed over by release(), best priority first
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._queued += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over as the wait expired
+                self.release()
+            raise self._reject("queue_timeout", self.retry_after)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            self._queued -= 1
+        self._admitted[priority] += 1
+
+    def release(self) -> None:
+        """Return a slot, handing it to the best waiting delivery if any."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority, installation_id: Optional[int] = None) -> AsyncIterator[None]:
+        """Hold an in-flight slot for the duration of the block."""
+        await self.acquire(priority, installation_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, object]:
+        """Return admission counters."""
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self._queued,
+            "admitted": {priority.name.lower(): count for priority, count in self._admitted.items()},
+            "shed": dict(self._shed),
+            "installations": len(self._buckets),
+        }
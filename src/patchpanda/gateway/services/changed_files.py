@@ -0,0 +1,122 @@
+"""Changed files of pull requests, cached by head SHA.
+
+Deciding whether a push needs test generation takes the pull request's
+list of changed files. A head and base SHA pair always names the same
+diff, so the list is streamed from GitHub once and kept in an in-process
+LRU; deliveries for the same push arriving together share one fetch.
+GitHub only lists the files at the pull request's current head, so a list
+fetched after the pull request moved on fails with PullRequestHeadMoved
+and is not cached under the older head.
+Lists stop at ``max_files`` paths, the rest of a very large pull request
+is not fetched and the list is marked incomplete.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from ..models.config import CONFIG_PATH
+from .effective_config import EffectiveConfig
+from .github_app import GitHubAppService
+from .rate_limit import RequestPriority
+from .singleflight import SingleFlight
+
+ChangedFilesKey = Tuple[str, str, int, str, Optional[str]]
+
+
+@dataclass(frozen=True)
+class ChangedFiles:
+    """Paths changed by a pull request at a head SHA."""
+    paths: Tuple[str, ...]
+    # False when the pull request changes more than max_files files
+    complete: bool = True
+
+
+def is_relevant(changed: ChangedFiles, config: EffectiveConfig) -> bool:
+    """Whether a change touches a file tests are generated for, or the config file.
+
+    An incomplete list may hide a relevant file and always counts as relevant.
+    """
+    if not changed.complete:
+        return True
+    path_filter = config.path_filter
+    return any(path == CONFIG_PATH or path_filter(path) for path in changed.paths)
+
+
+class ChangedFilesCache:
+    """Stream and remember pull request file lists."""
+
+    def __init__(
+        self,
+        github_app_service: GitHubAppService,
+        max_entries: int = 1000,
+        max_files: int = 3000,
+        timeout: float = 30.0,
+    ):
+        self.github_app_service = github_app_service
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self._entries: "OrderedDict[ChangedFilesKey, ChangedFiles]" = OrderedDict()
+        self._inflight = SingleFlight(timeout)
+        self._stats = {"hits": 0, "misses": 0, "truncated": 0, "errors": 0}
+
+    async def get(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        head_sha: str,
+        base_sha: Optional[str],
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> ChangedFiles:
+        """Return the files a pull request changes at a head SHA."""
+        key = (owner.lower(), repo.lower(), pr_number, head_sha, base_sha)
+        changed = self._entries.get(key)
+        if changed is not None:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return changed
+        self._stats["misses"] += 1
+        try:
+            return await self._inflight.do(
+                key, lambda: self._fetch(key, owner, repo, pr_number, head_sha, installation_id, priority)
+            )
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    async def _fetch(
+        self,
+        key: ChangedFilesKey,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        head_sha: str,
+        installation_id: int,
+        priority: RequestPriority,
+    ) -> ChangedFiles:
+        paths = []
+        complete = True
+        files = self.github_app_service.iter_pull_request_files(
+            owner, repo, pr_number, installation_id, priority=priority, head_sha=head_sha
+        )
+        try:
+            async for changed_file in files:
+                if len(paths) >= self.max_files:
+                    complete = False
+                    self._stats["truncated"] += 1
+                    break
+                paths.append(changed_file.path)
+        finally:
+            await files.aclose()
+
+        changed = self._entries[key] = ChangedFiles(tuple(paths), complete)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return changed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit counters."""
+        return {"entries": len(self._entries), "max_entries": self.max_entries, **self._stats}
@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional, List
 from enum import Enum
 
 from ..services.github_app import GitHubAppService
+from ..services.rate_limit import RequestPriority
 
 
 class CheckStatus(str, Enum):
@@ -37,13 +38,19 @@ class ChecksService:
         name: str,
         installation_id: int,
         status: CheckStatus = CheckStatus.QUEUED,
+        priority: RequestPriority = RequestPriority.NORMAL,
         **kwargs
     ) -> str:
-        """Create a new Check Run."""
-        # TODO: Implement Check Run creation
-        # - Use GitHub API to create check run
-        # - Return check run ID
-        return "temp_check_run_id"
+        """Create a new Check Run.
+
+        Pass ``RequestPriority.INTERACTIVE`` for runs a user command asked for
+        so they go ahead of background calls when the rate limit runs low.
+        """
+        payload = {"name": name, "head_sha": sha, "status": status.value, **kwargs}
+        data = await self.github_app_service.make_github_request(
+            "POST", f"/repos/{owner}/{repo}/check-runs", installation_id, priority=priority, json=payload
+        )
+        return str(data["id"])
 
     async def update_check_run(
         self,
@@ -53,12 +60,18 @@ class ChecksService:
         installation_id: int,
         status: Optional[CheckStatus] = None,
         conclusion: Optional[CheckConclusion] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
         **kwargs
     ) -> bool:
         """Update an existing Check Run."""
-        # TODO: Implement Check Run update
-        # - Use GitHub API to update check run
-        # - Return success status
+        payload = {key: value for key, value in kwargs.items() if value is not None}
+        if status is not None:
+            payload["status"] = status.value
+        if conclusion is not None:
+            payload["conclusion"] = conclusion.value
+        await self.github_app_service.make_github_request(
+            "PATCH", f"/repos/{owner}/{repo}/check-runs/{check_run_id}", installation_id, priority=priority, json=payload
+        )
         return True
 
     async def create_comment(
@@ -67,13 +80,18 @@ class ChecksService:
         repo: str,
         issue_number: int,
         body: str,
-        installation_id: int
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> str:
         """Create a comment on an issue or PR."""
-        # TODO: Implement comment creation
-        # - Use GitHub API to create comment
-        # - Return comment ID
-        return "temp_comment_id"
+        data = await self.github_app_service.make_github_request(
+            "POST",
+            f"/repos/{owner}/{repo}/issues/{issue_number}/comments",
+            installation_id,
+            priority=priority,
+            json={"body": body},
+        )
+        return str(data["id"])
 
     async def update_comment(
         self,
@@ -84,9 +102,9 @@ class ChecksService:
         installation_id: int
     ) -> bool:
         """Update an existing comment."""
-        # TODO: Implement comment update
-        # - Use GitHub API to update comment
-        # - Return success status
+        await self.github_app_service.make_github_request(
+            "PATCH", f"/repos/{owner}/{repo}/issues/comments/{comment_id}", installation_id, json={"body": body}
+        )
         return True
 
     async def create_test_generation_check(
@@ -94,7 +112,8 @@ class ChecksService:
         owner: str,
         repo: str,
         sha: str,
-        installation_id: int
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> str:
         """Create a Check Run for test generation."""
         return await self.create_check_run(
@@ -104,6 +123,31 @@ class ChecksService:
             name="PatchPanda Test Generation",
             installation_id=installation_id,
             status=CheckStatus.QUEUED,
+            priority=priority,
+            details_url="https://patchpanda.com",
+            external_id="test_generation"
+        )
+
+    async def create_skipped_test_generation_check(
+        self,
+        owner: str,
+        repo: str,
+        sha: str,
+        installation_id: int,
+        summary: str,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> str:
+        """Create a completed, neutral test generation Check Run for a skipped push."""
+        return await self.create_check_run(
+            owner=owner,
+            repo=repo,
+            sha=sha,
+            name="PatchPanda Test Generation",
+            installation_id=installation_id,
+            status=CheckStatus.COMPLETED,
+            priority=priority,
+            conclusion=CheckConclusion.NEUTRAL.value,
+            output={"title": "No relevant changes", "summary": summary},
             details_url="https://patchpanda.com",
             external_id="test_generation"
         )
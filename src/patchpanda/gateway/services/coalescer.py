@@ -0,0 +1,183 @@
+"""Debounce and coalesce ``pull_request.synchronize`` bursts.
+
+Developers often push several commits to a pull request within seconds.
+Each push is held for a short window per (installation, repository, PR);
+only the latest head SHA is handed on, and jobs still queued for the
+superseded SHAs of the same PR are marked cancelled.
+
+Callers that must not lose a push, such as the webhook inbox, use
+``offer_and_wait``: it returns once the push was submitted or superseded
+and raises when submitting it failed, so the delivery stays unfinished
+until then and is retried. Such a delivery holds its inbox worker for up
+to ``max_delay``.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from ..db.tables import Job
+from ..models.events import PullRequestEvent
+from ..models.jobs import JobStatus, JobType
+
+logger = logging.getLogger(__name__)
+
+CoalesceKey = Tuple[Optional[int], Optional[str], Optional[str], Optional[int]]
+
+
+def coalesce_key(event: PullRequestEvent) -> CoalesceKey:
+    """Key pushes by installation, repository and PR number."""
+    return (event.installation_id, event.owner, event.repo, event.number)
+
+
+@dataclass
+class _Pending:
+    event: PullRequestEvent
+    first_seen: float
+    last_seen: float
+    superseded: int = 0
+    task: Optional[asyncio.Task] = None
+    # Settled once the current event was submitted or superseded
+    waiter: Optional[asyncio.Future] = None
+
+
+def _settle(waiter: Optional[asyncio.Future], result: bool, error: Optional[BaseException] = None) -> None:
+    if waiter is None or waiter.done():
+        return
+    if error is not None:
+        waiter.set_exception(error)
+    else:
+        waiter.set_result(result)
+
+
+class PullRequestCoalescer:
+    """Per-PR debounce window for ``synchronize`` events."""
+
+    def __init__(
+        self,
+        submit: Callable[[PullRequestEvent], Awaitable[Any]],
+        window: float = 5.0,
+        max_delay: float = 30.0,
+        session_factory: Optional[sessionmaker] = None,
+    ):
+        self.submit = submit
+        self.window = window
+        # Bounds the wait for PRs that keep receiving pushes
+        self.max_delay = max(window, max_delay)
+        self.session_factory = session_factory
+        self._pending: Dict[CoalesceKey, _Pending] = {}
+        self._stats = {"received": 0, "coalesced": 0, "submitted": 0, "cancelled_jobs": 0, "errors": 0}
+
+    def offer(self, event: PullRequestEvent, waiter: Optional[asyncio.Future] = None) -> bool:
+        """Hold a push for the window.
+
+        Returns True when the event replaced a pending push for the same PR.
+        ``waiter`` is settled like the result of ``offer_and_wait``.
+        """
+        self._stats["received"] += 1
+        now = time.monotonic()
+        key = coalesce_key(event)
+        pending = self._pending.get(key)
+        if pending is not None:
+            # The newer push carries on for the replaced one
+            _settle(pending.waiter, False)
+            pending.event = event
+            pending.waiter = waiter
+            pending.last_seen = now
+            pending.superseded += 1
+            self._stats["coalesced"] += 1
+            return True
+
+        pending = self._pending[key] = _Pending(event=event, first_seen=now, last_seen=now, waiter=waiter)
+        # Fresh context: the push is handled after the delivery's deadline has passed
+        pending.task = asyncio.create_task(self._flush_later(key, pending), context=contextvars.Context())
+        return False
+
+    async def offer_and_wait(self, event: PullRequestEvent) -> bool:
+        """Hold a push for the window and wait until it is handled.
+
+        Returns True once it was submitted and False when a later push
+        superseded it. Raises what submitting it raised.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self.offer(event, waiter)
+        return await waiter
+
+    async def _flush_later(self, key: CoalesceKey, pending: _Pending) -> None:
+        # Trailing debounce: wait until no push arrived for a full window
+        while True:
+            deadline = min(pending.last_seen + self.window, pending.first_seen + self.max_delay)
+            delay = deadline - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+            await self._submit(pending)
+
+    async def _submit(self, pending: _Pending) -> None:
+        event = pending.event
+        try:
+            if self.session_factory is not None:
+                self._stats["cancelled_jobs"] += await asyncio.to_thread(self._cancel_superseded, event)
+            await self.submit(event)
+            self._stats["submitted"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            if pending.waiter is None:
+                logger.exception("Failed to submit coalesced push for %s/%s#%s", event.owner, event.repo, event.number)
+            # Raised to the waiting delivery, e.g. ConfigUnavailable, so it is retried
+            _settle(pending.waiter, False, e)
+        else:
+            _settle(pending.waiter, True)
+
+    def _cancel_superseded(self, event: PullRequestEvent) -> int:
+        """Cancel not-yet-started jobs for older SHAs of the PR.
+
+        Jobs are matched by PR number and head repository rather than branch
+        name: fork PRs against one repository often share names like ``main``.
+        """
+        if not (event.owner and event.repo and event.number and event.head_repo and event.head_sha):
+            return 0
+        with self.session_factory() as session:
+            cancelled = (
+                session.query(Job)
+                .filter(
+                    Job.owner == event.owner,
+                    Job.repository == event.repo,
+                    Job.pr_number == event.number,
+                    Job.head_repository == event.head_repo,
+                    Job.job_type == JobType.TEST_GENERATION.value,
+                    Job.status.in_([JobStatus.PENDING.value, JobStatus.QUEUED.value]),
+                    Job.commit_sha != event.head_sha,
+                )
+                .update(
+                    {
+                        Job.status: JobStatus.CANCELLED.value,
+                        Job.completed_at: datetime.now(timezone.utc).replace(tzinfo=None),
+                        Job.error_message: f"Superseded by {event.head_sha}",
+                    },
+                    synchronize_session=False,
+                )
+            )
+            session.commit()
+        return cancelled
+
+    async def stop(self) -> None:
+        """Submit every pending push immediately."""
+        pending, self._pending = self._pending, {}
+        for entry in pending.values():
+            if entry.task is not None:
+                entry.task.cancel()
+        for entry in pending.values():
+            await self._submit(entry)
+
+    def stats(self) -> Dict[str, int]:
+        """Return coalescing counters."""
+        return {"pending": len(self._pending), **self._stats}
@@ -0,0 +1,192 @@
+"""Content-addressed cache of parsed ``.testbot.yml`` files.
+
+A config file changes far less often than the commits it is read at.
+Parsed and validated configs are therefore stored by the file's git blob
+SHA, which only changes with the content, in an in-process LRU optionally
+backed by Redis. A small second map resolves ``(repository, ref)`` to that
+blob SHA; an empty SHA records that the ref has no usable config, so
+repositories without one do not cost a 404 per event.
+
+Commit SHA refs never move and are kept in process indefinitely. Branch
+refs move with every push: ``push`` events touching the config file
+invalidate them, and ``ref_ttl`` bounds staleness if a delivery is
+missed. With Redis, branch refs are only read from Redis so an
+invalidation handled by one replica is seen by all.
+"""
+
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+from pydantic import ValidationError
+
+from ..models.config import TestbotConfig
+
+logger = logging.getLogger(__name__)
+
+RefKey = Tuple[str, str, str]
+
+# Stored for refs without a config file, or with one that does not validate
+NO_CONFIG = ""
+
+_COMMIT_SHA = re.compile(r"\A[0-9a-f]{40}\Z")
+
+
+def ref_key(owner: str, repo: str, ref: str) -> RefKey:
+    """Key a ref; GitHub owner and repository names are case-insensitive."""
+    if ref.startswith("refs/heads/"):
+        ref = ref[len("refs/heads/"):]
+    return owner.lower(), repo.lower(), ref
+
+
+def is_commit_sha(ref: str) -> bool:
+    """Whether a ref is a full commit SHA, which always names the same tree."""
+    return bool(_COMMIT_SHA.match(ref))
+
+
+class ConfigCache:
+    """Parsed configs by blob SHA plus a ref to blob SHA map."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        redis_client: Optional[redis.Redis] = None,
+        ttl: int = 86400,
+        ref_ttl: int = 3600,
+        negative_ttl: int = 600,
+        key_prefix: str = "patchpanda:config:",
+    ):
+        self.max_entries = max_entries
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.ref_ttl = ref_ttl
+        self.negative_ttl = negative_ttl
+        self.key_prefix = key_prefix
+        self._blobs: "OrderedDict[str, TestbotConfig]" = OrderedDict()
+        # Blob SHA or NO_CONFIG, and when the entry expires (time.monotonic())
+        self._refs: "OrderedDict[RefKey, Tuple[str, float]]" = OrderedDict()
+        self._stats = {
+            "ref_hits": 0, "ref_misses": 0, "negative_hits": 0, "blob_hits": 0, "blob_misses": 0,
+            "redis_hits": 0, "invalidations": 0, "errors": 0,
+        }
+
+    def _ref_redis_key(self, key: RefKey) -> str:
+        return f"{self.key_prefix}ref:{key[0]}/{key[1]}@{key[2]}"
+
+    def _local_ref(self, key: RefKey) -> bool:
+        """Whether the ref is resolved in process rather than in Redis."""
+        return self.redis_client is None or is_commit_sha(key[2])
+
+    async def get_ref(self, owner: str, repo: str, ref: str) -> Optional[str]:
+        """Return the config blob SHA at a ref, NO_CONFIG, or None when unknown."""
+        key = ref_key(owner, repo, ref)
+        blob_sha = self._get_local_ref(key) if self._local_ref(key) else await self._redis_get(self._ref_redis_key(key))
+        if blob_sha is None:
+            self._stats["ref_misses"] += 1
+        elif blob_sha == NO_CONFIG:
+            self._stats["negative_hits"] += 1
+        else:
+            self._stats["ref_hits"] += 1
+        return blob_sha
+
+    def _get_local_ref(self, key: RefKey) -> Optional[str]:
+        entry = self._refs.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._refs[key]
+            return None
+        self._refs.move_to_end(key)
+        return entry[0]
+
+    async def set_ref(self, owner: str, repo: str, ref: str, blob_sha: str) -> None:
+        """Record the config blob SHA at a ref, NO_CONFIG when there is none."""
+        key = ref_key(owner, repo, ref)
+        ttl = self.ref_ttl if blob_sha != NO_CONFIG else self.negative_ttl
+        if self._local_ref(key):
+            expires_at = float("inf") if is_commit_sha(key[2]) else time.monotonic() + ttl
+            self._refs[key] = (blob_sha, expires_at)
+            self._refs.move_to_end(key)
+            if len(self._refs) > self.max_entries:
+                self._refs.popitem(last=False)
+        if self.redis_client is not None:
+            await self._redis_set(self._ref_redis_key(key), blob_sha, ttl)
+
+    async def invalidate_ref(self, owner: str, repo: str, ref: str) -> None:
+        """Forget what a branch resolved to, e.g. after a push changed the file."""
+        key = ref_key(owner, repo, ref)
+        self._stats["invalidations"] += 1
+        self._refs.pop(key, None)
+        if self.redis_client is None:
+            return
+        try:
+            await self.redis_client.delete(self._ref_redis_key(key))
+        except Exception:
+            self._stats["errors"] += 1
+            logger.warning("Config cache unavailable", exc_info=True)
+
+    async def get_blob(self, blob_sha: str) -> Optional[TestbotConfig]:
+        """Return the parsed config for a blob SHA, if cached.
+
+        The instance is shared between callers and must not be modified.
+        """
+        config = self._blobs.get(blob_sha)
+        if config is not None:
+            self._blobs.move_to_end(blob_sha)
+            self._stats["blob_hits"] += 1
+            return config
+        value = await self._redis_get(f"{self.key_prefix}blob:{blob_sha}") if self.redis_client else None
+        if value:
+            try:
+                config = TestbotConfig.model_validate_json(value)
+            except ValidationError:
+                # Written by a version with a different schema
+                config = None
+        if config is None:
+            self._stats["blob_misses"] += 1
+            return None
+        self._stats["redis_hits"] += 1
+        self._remember_blob(blob_sha, config)
+        return config
+
+    async def set_blob(self, blob_sha: str, config: TestbotConfig) -> None:
+        """Store the parsed config of a blob."""
+        self._remember_blob(blob_sha, config)
+        if self.redis_client is not None:
+            # Only the keys the file set, so layering can tell them from defaults
+            await self._redis_set(f"{self.key_prefix}blob:{blob_sha}", config.model_dump_json(exclude_unset=True), self.ttl)
+
+    def _remember_blob(self, blob_sha: str, config: TestbotConfig) -> None:
+        self._blobs[blob_sha] = config
+        self._blobs.move_to_end(blob_sha)
+        if len(self._blobs) > self.max_entries:
+            self._blobs.popitem(last=False)
+
+    async def _redis_get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.redis_client.get(key)
+        except Exception:
+            self._stats["errors"] += 1
+            logger.warning("Config cache unavailable", exc_info=True)
+            return None
+        return None if value is None else bytes(value).decode("utf-8")
+
+    async def _redis_set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            await self.redis_client.set(key, value, ex=ttl)
+        except Exception:
+            self._stats["errors"] += 1
+            logger.warning("Config cache unavailable", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache sizes and hit counters."""
+        return {
+            "blobs": len(self._blobs),
+            "refs": len(self._refs),
+            "max_entries": self.max_entries,
+            "redis": self.redis_client is not None,
+            **self._stats,
+        }
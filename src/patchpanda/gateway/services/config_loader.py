@@ -1,18 +1,29 @@
 """Configuration loader service for .testbot.yml files."""
 
+import base64
+import binascii
+import logging
 import yaml
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 
-from ..models.config import TestbotConfig
+import httpx
+
+from ..models.config import CONFIG_PATH, TestbotConfig
 from ..services.github_app import GitHubAppService
+from .config_cache import NO_CONFIG, ConfigCache
+from .graphql import ConfigBlob
+from .rate_limit import RequestPriority
+
+logger = logging.getLogger(__name__)
 
 
 class ConfigLoaderService:
     """Service for loading and parsing configuration files."""
 
-    def __init__(self, github_app_service: GitHubAppService):
+    def __init__(self, github_app_service: GitHubAppService, cache: Optional[ConfigCache] = None):
         self.github_app_service = github_app_service
+        self.cache = cache
 
     async def load_config(
         self,
@@ -21,43 +32,114 @@ class ConfigLoaderService:
         ref: str,
         installation_id: int
     ) -> Optional[TestbotConfig]:
-        """Load .testbot.yml configuration from a repository."""
+        """Load .testbot.yml configuration from a repository.
+
+        With a cache, a ref resolved before is answered without calling
+        GitHub, including refs known to have no config. Fetch errors are
+        not cached.
+        """
+        _, config = await self.load_versioned_config(owner, repo, ref, installation_id)
+        return config
+
+    async def load_versioned_config(
+        self,
+        owner: str,
+        repo: str,
+        ref: str,
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> Tuple[Optional[str], Optional[TestbotConfig]]:
+        """Load the config together with the blob SHA it was parsed from.
+
+        The SHA is NO_CONFIG when the ref has no usable config and None when
+        fetching it failed.
+        """
+        if self.cache is not None:
+            blob_sha = await self.cache.get_ref(owner, repo, ref)
+            if blob_sha == NO_CONFIG:
+                return NO_CONFIG, None
+            if blob_sha is not None:
+                config = await self.cache.get_blob(blob_sha)
+                if config is not None:
+                    return blob_sha, config
+
         try:
             # Get file content from GitHub
-            content = await self._get_file_content(
-                owner, repo, ref, ".testbot.yml", installation_id
-            )
+            blob = await self._get_file(owner, repo, ref, CONFIG_PATH, installation_id, priority)
+        except Exception:
+            logger.warning("Failed to fetch %s from %s/%s@%s", CONFIG_PATH, owner, repo, ref, exc_info=True)
+            return None, None
 
-            if not content:
-                return None
+        config = await self.load_config_blob(blob) if blob is not None else None
+        blob_sha = blob.oid if config is not None else NO_CONFIG
+        if self.cache is not None:
+            await self.cache.set_ref(owner, repo, ref, blob_sha)
+        return blob_sha, config
 
+    async def load_config_blob(self, blob: ConfigBlob) -> Optional[TestbotConfig]:
+        """Parse a config file blob, reusing the cached result for its SHA."""
+        if self.cache is not None:
+            config = await self.cache.get_blob(blob.oid)
+            if config is not None:
+                return config
+        config = self.parse_config(blob.text)
+        if config is not None and self.cache is not None:
+            await self.cache.set_blob(blob.oid, config)
+        return config
+
+    def parse_config(self, content: str) -> Optional[TestbotConfig]:
+        """Parse and validate config file content, None when it is invalid."""
+        if not content:
+            return None
+        try:
             # Parse YAML content
             config_data = yaml.safe_load(content)
 
             # Validate and return config
             return TestbotConfig(**config_data)
-
-        except Exception as e:
-            # TODO: Log error
+        except Exception:
+            logger.warning("Ignoring invalid %s", CONFIG_PATH, exc_info=True)
             return None
 
-    async def _get_file_content(
+    async def invalidate(self, owner: str, repo: str, ref: str) -> None:
+        """Forget the config cached for a branch after a push changed it."""
+        if self.cache is not None:
+            await self.cache.invalidate_ref(owner, repo, ref)
+
+    async def _get_file(
         self,
         owner: str,
         repo: str,
         ref: str,
         path: str,
-        installation_id: int
-    ) -> Optional[str]:
-        """Get file content from GitHub repository."""
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> Optional[ConfigBlob]:
+        """Get a file and its blob SHA from a GitHub repository.
+
+        Returns None when the file is missing or is not UTF-8 text; neither
+        changes until the file does, so callers cache both as no config.
+        """
         try:
-            # TODO: Implement GitHub API call to get file content
-            # - Use GitHub API to fetch file
-            # - Handle base64 decoding
-            # - Return file content
+            data = await self.github_app_service.make_github_request(
+                "GET",
+                f"/repos/{owner}/{repo}/contents/{path}",
+                installation_id,
+                priority=priority,
+                params={"ref": ref},
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        if data.get("encoding") != "base64" or "content" not in data or "sha" not in data:
             return None
-        except Exception:
+        try:
+            text = base64.b64decode(data["content"]).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            logger.warning("Ignoring %s in %s/%s@%s, it is not UTF-8 text", path, owner, repo, ref)
             return None
+        return ConfigBlob(oid=data["sha"], text=text)
 
     async def validate_config(self, config: TestbotConfig) -> bool:
         """Validate configuration settings."""
@@ -0,0 +1,112 @@
+"""Process-wide service container.
+
+Services cache expensive state: the GitHub App private key, AWS/GCP secret
+and KMS clients and queue connections. The container builds them once per
+process in the application lifespan and hands the same instances to every
+request through FastAPI dependencies.
+"""
+
+from typing import Optional
+
+import redis.asyncio as redis
+from fastapi import Request
+from sqlalchemy.orm import sessionmaker
+
+from ..security.secrets import SecretsManager
+from ..settings import Settings, get_settings
+from .authz import AuthService
+from .changed_files import ChangedFilesCache
+from .checks import ChecksService
+from .coalescer import PullRequestCoalescer
+from .config_cache import ConfigCache
+from .config_loader import ConfigLoaderService
+from .effective_config import EffectiveConfigResolver
+from .github_app import GitHubAppService
+from .http_client import GitHubHTTPClient
+from .prefetch import PullRequestPrefetcher
+from .queue import QueueService
+
+
+class ServiceContainer:
+    """Long-lived service instances shared by all requests."""
+
+    def __init__(self, settings: Optional[Settings] = None, session_factory: Optional[sessionmaker] = None):
+        self.settings = settings or get_settings()
+        # Connects lazily on first command
+        self.redis = redis.from_url(self.settings.redis_url, socket_connect_timeout=1)
+        self.secrets_manager = SecretsManager()
+        # One connection pool to the GitHub API for the whole process
+        self.http = GitHubHTTPClient(
+            base_url=self.settings.github_api_url,
+            http2=self.settings.github_http2,
+            max_connections=self.settings.github_http_max_connections,
+            max_keepalive_connections=self.settings.github_http_max_keepalive,
+            keepalive_expiry=self.settings.github_http_keepalive_expiry,
+            timeout=self.settings.github_http_timeout,
+            connect_timeout=self.settings.github_http_connect_timeout,
+            pool_timeout=self.settings.github_http_pool_timeout,
+        )
+        self.github_app = GitHubAppService(self.secrets_manager, self.redis, self.http)
+        self.auth = AuthService()
+        self.config_loader = ConfigLoaderService(self.github_app, self._config_cache())
+        self.effective_config = EffectiveConfigResolver(
+            self.config_loader,
+            session_factory,
+            max_entries=self.settings.effective_config_max_entries,
+            ttl=self.settings.effective_config_ttl,
+        )
+        self.queue = QueueService(self.redis)
+        self.checks = ChecksService(self.github_app)
+        self.changed_files: Optional[ChangedFilesCache] = None
+        if self.settings.pr_change_filter_enabled:
+            self.changed_files = ChangedFilesCache(
+                self.github_app,
+                max_entries=self.settings.pr_changed_files_max_entries,
+                max_files=self.settings.pr_changed_files_max_files,
+            )
+        self.prefetcher: Optional[PullRequestPrefetcher] = None
+        if self.settings.pr_prefetch_enabled:
+            self.prefetcher = PullRequestPrefetcher(
+                self.github_app,
+                self.effective_config,
+                max_concurrency=self.settings.pr_prefetch_concurrency,
+                max_pending=self.settings.pr_prefetch_max_pending,
+                timeout=self.settings.pr_prefetch_timeout,
+                head_ttl=self.settings.pr_prefetch_head_ttl,
+            )
+        # Set up by the lifespan when PR push coalescing is enabled
+        self.coalescer: Optional[PullRequestCoalescer] = None
+
+    def _config_cache(self) -> Optional[ConfigCache]:
+        if not self.settings.config_cache_enabled:
+            return None
+        return ConfigCache(
+            max_entries=self.settings.config_cache_max_entries,
+            redis_client=self.redis if self.settings.config_cache_redis else None,
+            ttl=self.settings.config_cache_ttl,
+            ref_ttl=self.settings.config_cache_ref_ttl,
+            negative_ttl=self.settings.config_cache_negative_ttl,
+        )
+
+    async def aclose(self) -> None:
+        """Close connections held by the services."""
+        if self.coalescer is not None:
+            await self.coalescer.stop()
+        if self.prefetcher is not None:
+            await self.prefetcher.stop()
+        await self.queue.close()
+        self.secrets_manager.close()
+        await self.http.aclose()
+        await self.redis.aclose()
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """FastAPI dependency returning the application's service container.
+
+    Apps started without the lifespan (e.g. a bare router under test) get a
+    container created on first use.
+    """
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        services = request.app.state.services = ServiceContainer()
+    return services
@@ -0,0 +1,101 @@
+"""Deduplication of redelivered GitHub webhooks by delivery ID."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryDeduplicator:
+    """Two-tier seen-delivery cache.
+
+    A bounded in-process LRU answers repeats seen by this replica without a
+    network hop; a Redis ``SET NX EX`` key makes the check work across
+    replicas. Redis errors fail open so an outage never drops deliveries.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        max_entries: int = 10000,
+        ttl_seconds: int = 86400,
+        key_prefix: str = "patchpanda:webhook:delivery:",
+    ):
+        self.redis_client = redis_client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._local_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._redis_errors = 0
+
+    def _seen_locally(self, delivery_id: str) -> bool:
+        expires_at = self._seen.get(delivery_id)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._seen[delivery_id]
+            return False
+        self._seen.move_to_end(delivery_id)
+        return True
+
+    def _remember(self, delivery_id: str) -> None:
+        self._seen[delivery_id] = time.monotonic() + self.ttl_seconds
+        self._seen.move_to_end(delivery_id)
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+    async def check_and_mark(self, delivery_id: Optional[str]) -> bool:
+        """Record a delivery and return True if it was already seen."""
+        if not delivery_id:
+            return False
+
+        if self._seen_locally(delivery_id):
+            self._local_hits += 1
+            return True
+
+        if self.redis_client is not None:
+            try:
+                created = await self.redis_client.set(
+                    self.key_prefix + delivery_id, 1, nx=True, ex=self.ttl_seconds
+                )
+            except Exception:
+                self._redis_errors += 1
+                logger.warning("Delivery dedup cache unavailable", exc_info=True)
+            else:
+                if not created:
+                    self._remember(delivery_id)
+                    self._redis_hits += 1
+                    return True
+
+        self._remember(delivery_id)
+        self._misses += 1
+        return False
+
+    async def forget(self, delivery_id: Optional[str]) -> None:
+        """Drop a delivery so a GitHub redelivery is processed again."""
+        if not delivery_id:
+            return
+
+        self._seen.pop(delivery_id, None)
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.delete(self.key_prefix + delivery_id)
+            except Exception:
+                self._redis_errors += 1
+                logger.warning("Delivery dedup cache unavailable", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters for the dedup cache."""
+        return {
+            "entries": len(self._seen),
+            "local_hits": self._local_hits,
+            "redis_hits": self._redis_hits,
+            "misses": self._misses,
+            "redis_errors": self._redis_errors,
+        }
@@ -0,0 +1,252 @@
+"""Effective repository configuration.
+
+The configuration a handler acts on is merged from layers, later ones
+winning key by key (``custom_settings`` is merged one level deeper):
+
+1. the built-in defaults (``ConfigLoaderService.get_default_config``);
+2. the billing project's ``default_config``;
+3. the repository binding's ``config``;
+4. the repository's ``.testbot.yml`` at the ref.
+
+A disabled binding or an inactive project turns the bot off whatever the
+file says. The merged result is frozen and memoised by a version key built
+from the project and binding ``updated_at`` stamps and the config file's
+blob SHA, so refs sharing a config share one object, including its
+compiled path filters. Resolved refs are remembered as well, which makes a
+repeated lookup a single dictionary hit.
+
+``invalidate_repository`` drops a repository after its binding or project
+changed and ``invalidate_ref`` drops a branch after a push changed its
+config file. Entries also expire after ``ttl`` seconds, which bounds how
+long changes made through another replica go unseen.
+
+When the binding or the config file cannot be read ``ConfigUnavailable``
+is raised rather than guessing a config, and nothing is remembered, so the
+delivery fails and is retried. A ref without a config file is not a
+failure and resolves to the other layers.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import ConfigDict, Field, ValidationError
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from ..db.tables import RepositoryBinding
+from ..models.config import TestbotConfig
+from .config_cache import RefKey, ref_key
+from .config_loader import ConfigLoaderService
+from .path_filter import PathFilter
+from .rate_limit import RequestPriority
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigUnavailable(Exception):
+    """A configuration layer could not be loaded."""
+
+
+class EffectiveConfig(TestbotConfig):
+    """Merged, read-only configuration for a repository at a ref."""
+
+    include_patterns: Optional[Tuple[str, ...]] = Field(default=None, description="File patterns to include")
+    exclude_patterns: Optional[Tuple[str, ...]] = Field(default=None, description="File patterns to exclude")
+    coverage_exclude: Optional[Tuple[str, ...]] = Field(default=None, description="Files to exclude from coverage")
+
+    version: str = Field(description="Version key of the layers the config was merged from")
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    # Compiled on first use and shared by every ref resolving to this config
+    @cached_property
+    def path_filter(self) -> PathFilter:
+        """Filter of the files tests are generated for."""
+        return PathFilter(self.include_patterns, self.exclude_patterns)
+
+    @cached_property
+    def coverage_filter(self) -> PathFilter:
+        """Filter of the files coverage is reported for."""
+        return PathFilter(self.include_patterns, self.coverage_exclude)
+
+
+@dataclass(frozen=True)
+class ServerLayers:
+    """Server-side configuration of a repository."""
+    project: Dict[str, Any] = field(default_factory=dict)
+    binding: Dict[str, Any] = field(default_factory=dict)
+    enabled: bool = True
+    version: str = "-"
+
+
+def merge_layers(*layers: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge config layers, later layers winning."""
+    merged: Dict[str, Any] = {}
+    for layer in layers:
+        for key, value in (layer or {}).items():
+            if key == "custom_settings" and isinstance(value, dict) and isinstance(merged.get(key), dict):
+                value = {**merged[key], **value}
+            merged[key] = value
+    return merged
+
+
+def _layer(data: Any, source: str) -> Dict[str, Any]:
+    """Validate a server-side layer, keeping only the keys it sets."""
+    if not data:
+        return {}
+    try:
+        return TestbotConfig(**data).model_dump(exclude_unset=True)
+    except (TypeError, ValidationError):
+        logger.warning("Ignoring invalid %s config", source, exc_info=True)
+        return {}
+
+
+def _stamp(value: Optional[datetime]) -> str:
+    return value.isoformat() if value is not None else "-"
+
+
+class EffectiveConfigResolver:
+    """Resolve and memoise the effective configuration of repositories."""
+
+    def __init__(
+        self,
+        config_loader: ConfigLoaderService,
+        session_factory: Optional[sessionmaker] = None,
+        max_entries: int = 10000,
+        ttl: float = 300.0,
+    ):
+        self.config_loader = config_loader
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Each resolved ref and its expiry (time.monotonic())
+        self._refs: "OrderedDict[RefKey, Tuple[EffectiveConfig, float]]" = OrderedDict()
+        self._versions: "OrderedDict[str, EffectiveConfig]" = OrderedDict()
+        self._repositories: "OrderedDict[Tuple[str, str], Tuple[ServerLayers, float]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "merges": 0, "invalidations": 0, "errors": 0}
+
+    async def resolve(
+        self,
+        owner: str,
+        repo: str,
+        ref: str,
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> EffectiveConfig:
+        """Return the effective configuration of a repository at a ref.
+
+        Concurrent lookups of the same ref share one resolution.
+        """
+        key = ref_key(owner, repo, ref)
+        entry = self._refs.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._refs.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+        self._stats["misses"] += 1
+        return await self._inflight.do(key, lambda: self._resolve(key, owner, repo, ref, installation_id, priority))
+
+    async def _resolve(
+        self, key: RefKey, owner: str, repo: str, ref: str, installation_id: int, priority: RequestPriority
+    ) -> EffectiveConfig:
+        server = await self._server_layers(owner, repo)
+        blob_sha, file_config = await self.config_loader.load_versioned_config(
+            owner, repo, ref, installation_id, priority
+        )
+        if blob_sha is None:
+            self._stats["errors"] += 1
+            raise ConfigUnavailable(f"Failed to fetch the config of {owner}/{repo}@{ref}")
+        version = f"{server.version}|{blob_sha or '-'}"
+        config = self._versions.get(version)
+        if config is None:
+            defaults = await self.config_loader.get_default_config()
+            merged = merge_layers(
+                defaults.model_dump(exclude_unset=True),
+                server.project,
+                server.binding,
+                file_config.model_dump(exclude_unset=True) if file_config is not None else None,
+            )
+            if not server.enabled:
+                merged["enabled"] = False
+            config = EffectiveConfig(**merged, version=version)
+            self._stats["merges"] += 1
+            self._remember(self._versions, version, config)
+
+        self._remember(self._refs, key, (config, time.monotonic() + self.ttl))
+        return config
+
+    async def _server_layers(self, owner: str, repo: str) -> ServerLayers:
+        if self.session_factory is None:
+            return ServerLayers()
+        key = (owner.lower(), repo.lower())
+        entry = self._repositories.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        try:
+            layers = await asyncio.to_thread(self._load_server_layers, owner, repo)
+        except Exception as e:
+            self._stats["errors"] += 1
+            raise ConfigUnavailable(f"Failed to load the binding of {owner}/{repo}") from e
+        self._remember(self._repositories, key, (layers, time.monotonic() + self.ttl))
+        return layers
+
+    def _load_server_layers(self, owner: str, repo: str) -> ServerLayers:
+        with self.session_factory() as session:
+            binding = (
+                session.query(RepositoryBinding)
+                .filter(
+                    func.lower(RepositoryBinding.owner) == owner.lower(),
+                    func.lower(RepositoryBinding.repository) == repo.lower(),
+                )
+                .first()
+            )
+            if binding is None:
+                return ServerLayers()
+            project = binding.project
+            return ServerLayers(
+                project=_layer(project.default_config, f"project {project.id}") if project is not None else {},
+                binding=_layer(binding.config, f"{owner}/{repo} binding"),
+                enabled=binding.enabled and (project is None or project.active),
+                version=(
+                    f"{binding.project_id}@{_stamp(project.updated_at) if project is not None else '-'}"
+                    f":{binding.id}@{_stamp(binding.updated_at)}"
+                ),
+            )
+
+    def _remember(self, entries: OrderedDict, key: Any, value: Any) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    async def invalidate_ref(self, owner: str, repo: str, ref: str) -> None:
+        """Forget a branch after a push changed its config file."""
+        self._stats["invalidations"] += 1
+        self._refs.pop(ref_key(owner, repo, ref), None)
+        await self.config_loader.invalidate(owner, repo, ref)
+
+    def invalidate_repository(self, owner: str, repo: str) -> None:
+        """Forget a repository after its binding or billing project changed."""
+        self._stats["invalidations"] += 1
+        owner, repo = owner.lower(), repo.lower()
+        self._repositories.pop((owner, repo), None)
+        for key in [key for key in self._refs if key[0] == owner and key[1] == repo]:
+            del self._refs[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return memo sizes and hit counters."""
+        return {
+            "refs": len(self._refs),
+            "versions": len(self._versions),
+            "repositories": len(self._repositories),
+            "max_entries": self.max_entries,
+            **self._stats,
+        }
@@ -0,0 +1,118 @@
+"""Conditional-request cache for GitHub API GETs.
+
+Stores the ``ETag`` and body of GET responses per installation and URL.
+Later requests send ``If-None-Match``; a ``304 Not Modified`` is answered
+from the cache and does not count against GitHub rate limits. Entries live
+in an in-process LRU bounded by total bytes, optionally backed by Redis so
+replicas share them.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A validator and the body it belongs to."""
+    etag: str
+    body: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.etag) + len(self.body)
+
+
+def cache_key(installation_id: int, endpoint: str, params: Any = None) -> str:
+    """Key a GET by installation and URL, query string included."""
+    return f"{installation_id}:{httpx.URL(endpoint, params=params)}"
+
+
+class ETagCache:
+    """Byte-bounded LRU of ETag-validated responses with an optional Redis tier."""
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        redis_client: Optional[redis.Redis] = None,
+        ttl: int = 86400,
+        key_prefix: str = "patchpanda:etag:",
+    ):
+        self.max_bytes = max_bytes
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"lookups": 0, "not_modified": 0, "stores": 0, "evictions": 0, "redis_hits": 0, "errors": 0}
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response to revalidate, if any."""
+        self._stats["lookups"] += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.redis_client is None:
+            return None
+        try:
+            value = await self.redis_client.get(f"{self.key_prefix}{key}")
+        except Exception:
+            self._stats["errors"] += 1
+            logger.warning("ETag cache unavailable", exc_info=True)
+            return None
+        if not value:
+            return None
+        etag, _, body = bytes(value).partition(b"\n")
+        entry = CachedResponse(etag=etag.decode("utf-8"), body=body)
+        self._stats["redis_hits"] += 1
+        self._remember(key, entry)
+        return entry
+
+    async def set(self, key: str, etag: str, body: bytes) -> None:
+        """Store a response body under its ETag."""
+        entry = CachedResponse(etag=etag, body=body)
+        self._stats["stores"] += 1
+        self._remember(key, entry)
+        if self.redis_client is None:
+            return
+        try:
+            await self.redis_client.set(f"{self.key_prefix}{key}", etag.encode("utf-8") + b"\n" + body, ex=self.ttl)
+        except Exception:
+            self._stats["errors"] += 1
+            logger.warning("ETag cache unavailable", exc_info=True)
+
+    def record_not_modified(self) -> None:
+        """Count a 304 answered from the cache."""
+        self._stats["not_modified"] += 1
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit counters."""
+        lookups = self._stats["lookups"]
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "redis": self.redis_client is not None,
+            "hit_ratio": round(self._stats["not_modified"] / lookups, 3) if lookups else None,
+            **self._stats,
+        }
@@ -1,22 +1,165 @@
 """GitHub App service for JWT and installation tokens."""
 
+import asyncio
+import hashlib
+import json
 import jwt
 import time
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Awaitable, Optional, Dict, Any, List, Tuple, Union
 from datetime import datetime, timedelta, timezone
 
+import httpx
+import redis.asyncio as redis
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes
+
+from ..models.config import CONFIG_PATH
 from ..settings import get_settings
 from ..security.secrets import SecretsManager
+from .etag_cache import ETagCache, cache_key
+from .graphql import (
+    BLOB_QUERY,
+    MAX_PAGE_SIZE,
+    PULL_REQUEST_CONTEXT_QUERY,
+    PULL_REQUEST_FILES_QUERY,
+    ChangedFile,
+    ConfigBlob,
+    GraphQLError,
+    PullRequestContext,
+    PullRequestHeadMoved,
+    next_cursor,
+    parse_blob,
+    parse_files,
+    parse_pull_request_context,
+)
+from .http_client import GitHubHTTPClient
+from .rate_limit import (
+    BudgetKey,
+    RateLimitScheduler,
+    RequestPriority,
+    app_budget,
+    installation_budget,
+)
+from .resilience import AdaptiveLimiter, CallGuard
+from .singleflight import SingleFlight
+from .token_cache import InstallationToken, InstallationTokenCache, fernet_from_secret
+
+
+# GitHub rejects app JWTs valid for more than 10 minutes
+APP_JWT_LIFETIME = timedelta(minutes=10)
+
+
+def load_signing_key(pem: str) -> Union[PrivateKeyTypes, str]:
+    """Parse a PEM private key once so signing skips PEM decoding.
+
+    Falls back to the PEM string, leaving PyJWT to report unusable keys.
+    """
+    try:
+        return serialization.load_pem_private_key(pem.encode("utf-8"), password=None)
+    except (ValueError, TypeError, UnsupportedAlgorithm):
+        return pem
+
+
+def _read_ahead(page: Awaitable[Any]) -> asyncio.Future:
+    """Start fetching a page the caller will await later."""
+    future = asyncio.ensure_future(page)
+    # Read-ahead that nobody awaits must not log "exception never retrieved"
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return future
 
 
 class GitHubAppService:
     """Service for GitHub App operations."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        secrets_manager: Optional[SecretsManager] = None,
+        redis_client: Optional[redis.Redis] = None,
+        http_client: Optional[GitHubHTTPClient] = None,
+    ):
         self.settings = get_settings()
-        self.secrets_manager = SecretsManager()
+        self.secrets_manager = secrets_manager or SecretsManager()
+        self.redis_client = redis_client
+        self._http_client = http_client
         self._private_key = None
         self._webhook_secret = None
+        self._token_cache = None
+        self._rate_limits = None
+        self._etag_cache: Optional[ETagCache] = None
+        self._singleflight: Optional[SingleFlight] = None
+        self._call_guard: Optional[CallGuard] = None
+        self._signing_key = None
+        self._key_fingerprint = None
+        self._app_jwt: Optional[Tuple[str, float]] = None
+        self._jwt_lock = asyncio.Lock()
+
+    @property
+    def http_client(self) -> GitHubHTTPClient:
+        """Get the pooled GitHub HTTP client."""
+        if not self._http_client:
+            self._http_client = GitHubHTTPClient(base_url=self.settings.github_api_url)
+        return self._http_client
+
+    @property
+    def rate_limits(self) -> RateLimitScheduler:
+        """Get the GitHub API rate-limit scheduler."""
+        if not self._rate_limits:
+            self._rate_limits = RateLimitScheduler(
+                normal_reserve=self.settings.github_rate_limit_normal_reserve,
+                background_reserve=self.settings.github_rate_limit_background_reserve,
+                max_wait=self.settings.github_rate_limit_max_wait,
+            )
+        return self._rate_limits
+
+    @property
+    def etag_cache(self) -> Optional[ETagCache]:
+        """Get the conditional-request cache, None when disabled."""
+        if self._etag_cache is None and self.settings.github_etag_cache_enabled:
+            self._etag_cache = ETagCache(
+                max_bytes=self.settings.github_etag_cache_max_bytes,
+                redis_client=self.redis_client if self.settings.github_etag_cache_redis else None,
+                ttl=self.settings.github_etag_cache_ttl,
+            )
+        return self._etag_cache
+
+    @property
+    def singleflight(self) -> Optional[SingleFlight]:
+        """Get the in-flight GET deduplication, None when disabled."""
+        if self._singleflight is None and self.settings.github_singleflight_enabled:
+            self._singleflight = SingleFlight(timeout=self.settings.github_singleflight_timeout)
+        return self._singleflight
+
+    @property
+    def call_guard(self) -> Optional[CallGuard]:
+        """Get the adaptive concurrency limit and circuit breakers, None when disabled."""
+        if self._call_guard is None and self.settings.github_call_guard_enabled:
+            self._call_guard = CallGuard(
+                AdaptiveLimiter(
+                    initial_limit=self.settings.github_concurrency_initial,
+                    min_limit=self.settings.github_concurrency_min,
+                    max_limit=self.settings.github_concurrency_max,
+                    backoff=self.settings.github_concurrency_backoff,
+                    max_wait=self.settings.github_concurrency_max_wait,
+                ),
+                failure_threshold=self.settings.github_circuit_failure_threshold,
+                reset_timeout=self.settings.github_circuit_reset_timeout,
+                latency_tolerance=self.settings.github_concurrency_latency_tolerance,
+            )
+        return self._call_guard
+
+    @property
+    def token_cache(self) -> InstallationTokenCache:
+        """Get the installation token cache."""
+        if not self._token_cache:
+            self._token_cache = InstallationTokenCache(
+                self._exchange_installation_token,
+                fernet_from_secret(self.settings.secret_key),
+                redis_client=self.redis_client,
+                refresh_margin=self.settings.installation_token_refresh_margin,
+                max_entries=self.settings.installation_token_cache_max_entries,
+            )
+        return self._token_cache
 
     @property
     async def private_key(self) -> str:
@@ -38,41 +181,273 @@ class GitHubAppService:
                 self._webhook_secret = self.settings.github_webhook_secret
         return self._webhook_secret
 
+    async def _load_signing_key(self) -> Union[PrivateKeyTypes, str]:
+        """Fetch the current private key, re-parsing it only when it changed."""
+        pem = await self.secrets_manager.get_github_private_key()
+        if not pem:
+            # Fallback to environment variable
+            pem = self.settings.github_app_private_key
+        if not pem:
+            raise ValueError("GitHub App private key is not configured")
+
+        fingerprint = hashlib.sha256(pem.encode("utf-8")).hexdigest()
+        if fingerprint != self._key_fingerprint:
+            # New secret version: drop the JWT signed with the old key
+            self._signing_key = load_signing_key(pem)
+            self._key_fingerprint = fingerprint
+            self._private_key = pem
+            self._app_jwt = None
+        return self._signing_key
+
     async def generate_jwt(self) -> str:
-        """Generate JWT for GitHub App authentication."""
-        now = datetime.now(timezone.utc)
-        payload = {
-            "iat": int(now.timestamp()),
-            "exp": int((now + timedelta(minutes=10)).timestamp()),
-            "iss": self.settings.github_app_id
-        }
+        """Generate JWT for GitHub App authentication.
+
+        The signed JWT is reused until ``app_jwt_refresh_margin`` seconds
+        before it expires. The private key is fetched again whenever a new
+        JWT is signed, so a rotated secret takes effect at the next refresh.
+        """
+        cached = self._app_jwt
+        if cached is not None and time.time() < cached[1] - self.settings.app_jwt_refresh_margin:
+            return cached[0]
 
-        private_key = await self.private_key
-        return jwt.encode(payload, private_key, algorithm="RS256")
+        async with self._jwt_lock:
+            cached = self._app_jwt
+            if cached is not None and time.time() < cached[1] - self.settings.app_jwt_refresh_margin:
+                return cached[0]
+
+            signing_key = await self._load_signing_key()
+            now = datetime.now(timezone.utc)
+            expires_at = now + APP_JWT_LIFETIME
+            payload = {
+                "iat": int(now.timestamp()),
+                "exp": int(expires_at.timestamp()),
+                "iss": self.settings.github_app_id
+            }
+            token = jwt.encode(payload, signing_key, algorithm="RS256")
+            self._app_jwt = (token, expires_at.timestamp())
+            return token
+
+    def invalidate_jwt(self) -> None:
+        """Force the next JWT to be re-signed with a freshly fetched key."""
+        self._app_jwt = None
+        self._key_fingerprint = None
 
     async def get_installation_token(self, installation_id: int) -> str:
         """Get installation access token for a repository."""
-        # TODO: Implement installation token exchange
-        # - Use JWT to authenticate with GitHub
-        # - Exchange for installation token
-        # - Cache token (with expiration)
-        # - Return token
-        return "temp_installation_token"
+        return await self.token_cache.get(installation_id)
+
+    async def _exchange_installation_token(self, installation_id: int) -> InstallationToken:
+        """Exchange the app JWT for an installation access token."""
+        app_jwt = await self.generate_jwt()
+        endpoint = f"/app/installations/{installation_id}/access_tokens"
+        # Every call for the installation waits on this exchange
+        response, _ = await self._send(
+            app_budget(endpoint),
+            RequestPriority.INTERACTIVE,
+            "POST",
+            endpoint,
+            headers={"Authorization": f"Bearer {app_jwt}"},
+        )
+        response.raise_for_status()
+        data = response.json()
+        expires_at = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00"))
+        return InstallationToken(token=data["token"], expires_at=expires_at.timestamp())
+
+    async def _send(
+        self,
+        budget: BudgetKey,
+        priority: RequestPriority,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> Tuple[httpx.Response, Optional[float]]:
+        """Send a request within its rate-limit budget and the call guard.
+
+        Returns the response and, when GitHub rate limited it, the seconds
+        until the limit lifts. Under a ``deadline()`` the request times out
+        when the deadline passes.
+        """
+        def send(remaining: Optional[float]) -> Awaitable[httpx.Response]:
+            if remaining is not None:
+                kwargs.setdefault("timeout", min(remaining, self.settings.github_http_timeout))
+            return self.http_client.request(method, endpoint, **kwargs)
+
+        await self.rate_limits.acquire(budget, priority)
+        try:
+            if self.call_guard is None:
+                response = await self.http_client.request(method, endpoint, **kwargs)
+            else:
+                response = await self.call_guard.run(endpoint, priority, send)
+        except BaseException:
+            self.rate_limits.release(budget)
+            raise
+        return response, self.rate_limits.release(budget, response.status_code, response.headers)
 
     async def make_github_request(
         self,
         method: str,
         endpoint: str,
         installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
         **kwargs
     ) -> Dict[str, Any]:
-        """Make authenticated request to GitHub API."""
-        # TODO: Implement GitHub API requests
-        # - Get installation token
-        # - Make HTTP request with proper headers
-        # - Handle rate limiting
-        # - Return response data
-        return {"status": "not_implemented"}
+        """Make authenticated request to GitHub API.
+
+        Requests wait for the installation's rate-limit budget, best
+        ``priority`` first when it runs low. GETs are revalidated with their
+        cached ETag; a 304 is answered from the cache. Identical GETs already
+        in flight share one upstream request, which runs without any one
+        caller's deadline; each caller stops waiting at its own. Raises
+        ``RateLimitExceeded`` when the wait would be too long,
+        ``httpx.HTTPStatusError`` for error responses and, from the call
+        guard, ``DeadlineExceeded``, ``CircuitOpenError`` or
+        ``ConcurrencyLimitExceeded`` when GitHub is degraded.
+        """
+        if method == "GET" and self.singleflight is not None and set(kwargs) <= {"params"}:
+            if self.call_guard is not None:
+                # The shared request runs without this caller's deadline
+                self.call_guard.check_deadline(endpoint)
+            key = (cache_key(installation_id, endpoint, kwargs.get("params")), priority)
+            body = await self.singleflight.do(
+                key, lambda: self._request_body(method, endpoint, installation_id, priority, **kwargs)
+            )
+        else:
+            body = await self._request_body(method, endpoint, installation_id, priority, **kwargs)
+        # Decoded per caller so shared responses are never aliased
+        return json.loads(body) if body else {}
+
+    async def _request_body(
+        self,
+        method: str,
+        endpoint: str,
+        installation_id: int,
+        priority: RequestPriority,
+        **kwargs
+    ) -> bytes:
+        """Send an authenticated request and return the response body."""
+        headers = dict(kwargs.pop("headers", None) or {})
+        cache = self.etag_cache if method == "GET" else None
+        cached = None
+        if cache is not None:
+            key = cache_key(installation_id, endpoint, kwargs.get("params"))
+            cached = await cache.get(key)
+            if cached is not None:
+                headers.setdefault("If-None-Match", cached.etag)
+
+        response = await self._send_authenticated(
+            method, endpoint, installation_id, priority, headers=headers, **kwargs
+        )
+        if response.status_code == 304 and cached is not None:
+            cache.record_not_modified()
+            return cached.body
+        response.raise_for_status()
+        if response.status_code == 204:
+            return b""
+        if cache is not None and response.status_code == 200 and response.content and "etag" in response.headers:
+            await cache.set(key, response.headers["etag"], response.content)
+        return response.content
+
+    async def _send_authenticated(
+        self,
+        method: str,
+        endpoint: str,
+        installation_id: int,
+        priority: RequestPriority,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """Send a request with the installation token within its rate-limit budget."""
+        budget = installation_budget(installation_id, endpoint)
+        headers = dict(headers or {})
+        token_refreshed = False
+        rate_limit_retries = 0
+        while True:
+            token = await self.get_installation_token(installation_id)
+            headers["Authorization"] = f"token {token}"
+            response, retry_after = await self._send(
+                budget, priority, method, endpoint, headers=headers, **kwargs
+            )
+            if response.status_code == 401 and not token_refreshed:
+                # Token revoked or expired early: exchange a new one and retry once
+                token_refreshed = True
+                await self.token_cache.invalidate(installation_id, token)
+                continue
+            if retry_after is not None and rate_limit_retries < self.settings.github_rate_limit_retries:
+                # The scheduler holds the budget until the limit lifts
+                rate_limit_retries += 1
+                continue
+            return response
+
+    async def paginate(
+        self,
+        endpoint: str,
+        installation_id: int,
+        params: Optional[Dict[str, Any]] = None,
+        items_key: Optional[str] = None,
+        per_page: int = MAX_PAGE_SIZE,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> AsyncIterator[Any]:
+        """Stream the items of a paginated REST list, following ``Link`` headers.
+
+        The next page is requested while the caller works through the
+        current one. ``items_key`` names the list in wrapped responses such
+        as check runs (``"check_runs"``) or installation repositories
+        (``"repositories"``). Leaving the loop early cancels the read-ahead;
+        wrap the call in ``contextlib.aclosing`` to do so deterministically.
+        """
+        page = self._start_page(
+            endpoint, installation_id, items_key, priority, params={**(params or {}), "per_page": per_page}
+        )
+        try:
+            while page is not None:
+                items, next_url = await page
+                page = None
+                if next_url:
+                    page = self._start_page(next_url, installation_id, items_key, priority)
+                for item in items:
+                    yield item
+        finally:
+            if page is not None:
+                page.cancel()
+
+    def _start_page(
+        self,
+        url: str,
+        installation_id: int,
+        items_key: Optional[str],
+        priority: RequestPriority,
+        **kwargs
+    ) -> asyncio.Future:
+        return _read_ahead(self._get_page(url, installation_id, items_key, priority, **kwargs))
+
+    async def _get_page(
+        self,
+        url: str,
+        installation_id: int,
+        items_key: Optional[str],
+        priority: RequestPriority,
+        **kwargs
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Fetch one page; returns its items and the next page URL."""
+        response = await self._send_authenticated("GET", url, installation_id, priority, **kwargs)
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, dict):
+            data = data[items_key] if items_key else next(
+                (value for value in data.values() if isinstance(value, list)), []
+            )
+        return data, response.links.get("next", {}).get("url")
+
+    async def iter_installation_repositories(
+        self,
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the repositories an installation can access."""
+        async for repository in self.paginate(
+            "/installation/repositories", installation_id, items_key="repositories", priority=priority
+        ):
+            yield repository
 
     async def get_repository_info(self, owner: str, repo: str, installation_id: int) -> Dict[str, Any]:
         """Get repository information."""
@@ -85,3 +460,162 @@ class GitHubAppService:
         return await self.make_github_request(
             "GET", f"/repos/{owner}/{repo}/pulls/{pr_number}", installation_id
         )
+
+    @property
+    def graphql_endpoint(self) -> str:
+        """GraphQL endpoint for the configured API URL."""
+        api_url = self.settings.github_api_url.rstrip("/")
+        # GitHub Enterprise Server serves REST at /api/v3 and GraphQL at /api/graphql
+        if api_url.endswith("/api/v3"):
+            return api_url[:-len("/v3")] + "/graphql"
+        return "/graphql"
+
+    async def make_graphql_request(
+        self,
+        query: str,
+        variables: Dict[str, Any],
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> Dict[str, Any]:
+        """Run a GraphQL query with the installation token and return its data.
+
+        Raises ``GraphQLError`` when the response carries errors.
+        """
+        result = await self.make_github_request(
+            "POST",
+            self.graphql_endpoint,
+            installation_id,
+            priority=priority,
+            json={"query": query, "variables": variables},
+        )
+        if result.get("errors"):
+            raise GraphQLError(result["errors"])
+        return result["data"]
+
+    async def get_pull_request_context(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        installation_id: int,
+        head_sha: Optional[str] = None,
+        config_path: Optional[str] = CONFIG_PATH,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> PullRequestContext:
+        """Get PR refs, the first page of changed files and the config blob.
+
+        With ``head_sha`` (known from pull_request events) this is a single
+        query and the config is read at that SHA; without it the config takes
+        a second query at the PR's current head. A ``config_path`` of None
+        skips the config, e.g. when the caller resolves it itself.
+        """
+        data = await self.make_graphql_request(
+            PULL_REQUEST_CONTEXT_QUERY,
+            {
+                "owner": owner,
+                "repo": repo,
+                "number": pr_number,
+                "filesFirst": MAX_PAGE_SIZE,
+                "configExpression": f"{head_sha}:{config_path}" if head_sha and config_path else "",
+                "withConfig": head_sha is not None and config_path is not None,
+            },
+            installation_id,
+            priority,
+        )
+        context = parse_pull_request_context(data)
+        if head_sha is None and config_path is not None:
+            context.config = await self.get_blob(
+                owner, repo, f"{context.head_sha}:{config_path}", installation_id, priority
+            )
+        return context
+
+    async def get_blob(
+        self,
+        owner: str,
+        repo: str,
+        expression: str,
+        installation_id: int,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> Optional[ConfigBlob]:
+        """Get a text blob by ``<rev>:<path>`` expression, None if absent or binary."""
+        data = await self.make_graphql_request(
+            BLOB_QUERY, {"owner": owner, "repo": repo, "expression": expression}, installation_id, priority
+        )
+        return parse_blob(data["repository"]["object"])
+
+    async def iter_pull_request_files(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        installation_id: int,
+        context: Optional[PullRequestContext] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        head_sha: Optional[str] = None,
+    ) -> AsyncIterator[ChangedFile]:
+        """Stream the PR's changed files page by page.
+
+        Pass the context from ``get_pull_request_context`` to start after the
+        page it already holds. Like ``paginate``, the next page is requested
+        while the caller works through the current one. GitHub lists the
+        files of the PR's current head; with ``head_sha``, every page checks
+        that head and raises PullRequestHeadMoved once it is another commit.
+        """
+        if context is not None and head_sha is not None and context.head_sha != head_sha:
+            raise PullRequestHeadMoved(head_sha, context.head_sha)
+        page: Optional[asyncio.Future] = None
+        if context is None:
+            page = self._start_files_page(owner, repo, pr_number, installation_id, None, priority, head_sha)
+        elif context.files_cursor is not None:
+            page = self._start_files_page(
+                owner, repo, pr_number, installation_id, context.files_cursor, priority, head_sha
+            )
+        try:
+            if context is not None:
+                for changed_file in context.files:
+                    yield changed_file
+            while page is not None:
+                files = await page
+                page = None
+                cursor = next_cursor(files)
+                if cursor is not None:
+                    page = self._start_files_page(owner, repo, pr_number, installation_id, cursor, priority, head_sha)
+                for changed_file in parse_files(files):
+                    yield changed_file
+        finally:
+            if page is not None:
+                page.cancel()
+
+    def _start_files_page(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        installation_id: int,
+        cursor: Optional[str],
+        priority: RequestPriority,
+        head_sha: Optional[str],
+    ) -> asyncio.Future:
+        return _read_ahead(self._get_files_page(owner, repo, pr_number, installation_id, cursor, priority, head_sha))
+
+    async def _get_files_page(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        installation_id: int,
+        cursor: Optional[str],
+        priority: RequestPriority,
+        head_sha: Optional[str],
+    ) -> Dict[str, Any]:
+        """Fetch one page of the PR's ``files`` connection."""
+        data = await self.make_graphql_request(
+            PULL_REQUEST_FILES_QUERY,
+            {"owner": owner, "repo": repo, "number": pr_number, "first": MAX_PAGE_SIZE, "after": cursor},
+            installation_id,
+            priority,
+        )
+        pull_request = data["repository"]["pullRequest"]
+        if head_sha is not None and pull_request["headRefOid"] != head_sha:
+            raise PullRequestHeadMoved(head_sha, pull_request["headRefOid"])
+        return pull_request["files"]
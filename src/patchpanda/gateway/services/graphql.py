@@ -0,0 +1,155 @@
+"""GitHub GraphQL queries for pull request context.
+
+One query returns what handling a PR command needs: head and base refs,
+the first page of changed files and the config file blob at the head SHA.
+Further file pages are fetched by cursor.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# GitHub's maximum page size for connections
+MAX_PAGE_SIZE = 100
+
+_FILES_FIELDS = """
+        pageInfo { hasNextPage endCursor }
+        nodes { path additions deletions changeType }
+"""
+
+PULL_REQUEST_CONTEXT_QUERY = """
+query PullRequestContext(
+  $owner: String!, $repo: String!, $number: Int!, $filesFirst: Int!,
+  $configExpression: String!, $withConfig: Boolean!
+) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      number
+      headRefName
+      headRefOid
+      headRepository { nameWithOwner }
+      baseRefName
+      baseRefOid
+      changedFiles
+      files(first: $filesFirst) {%s}
+    }
+    config: object(expression: $configExpression) @include(if: $withConfig) {
+      ... on Blob { oid text isBinary }
+    }
+  }
+}
+""" % _FILES_FIELDS
+
+PULL_REQUEST_FILES_QUERY = """
+query PullRequestFiles($owner: String!, $repo: String!, $number: Int!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      headRefOid
+      files(first: $first, after: $after) {%s}
+    }
+  }
+}
+""" % _FILES_FIELDS
+
+BLOB_QUERY = """
+query Blob($owner: String!, $repo: String!, $expression: String!) {
+  repository(owner: $owner, name: $repo) {
+    object(expression: $expression) {
+      ... on Blob { oid text isBinary }
+    }
+  }
+}
+"""
+
+
+class GraphQLError(Exception):
+    """Raised when a GraphQL response carries errors."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__("; ".join(error.get("message", "unknown error") for error in errors))
+        self.errors = errors
+
+
+class PullRequestHeadMoved(Exception):
+    """Raised when a pull request's head is no longer the expected commit."""
+
+    def __init__(self, expected: str, actual: str):
+        super().__init__(f"Pull request head moved from {expected} to {actual}")
+        self.expected = expected
+        self.actual = actual
+
+
+@dataclass(frozen=True)
+class ChangedFile:
+    """A file changed by a pull request."""
+    path: str
+    additions: int
+    deletions: int
+    change_type: str
+
+
+@dataclass(frozen=True)
+class ConfigBlob:
+    """The config file at a commit, addressed by its blob SHA."""
+    oid: str
+    text: str
+
+
+@dataclass
+class PullRequestContext:
+    """Pull request refs, the first page of changed files and the config blob."""
+    number: int
+    head_ref: str
+    head_sha: str
+    base_ref: str
+    base_sha: str
+    changed_files: int
+    # owner/name of the head repository, None when it was deleted
+    head_repo: Optional[str] = None
+    files: List[ChangedFile] = field(default_factory=list)
+    files_cursor: Optional[str] = None
+    config: Optional[ConfigBlob] = None
+
+
+def parse_files(connection: Dict[str, Any]) -> List[ChangedFile]:
+    """Parse a ``files`` connection page."""
+    return [
+        ChangedFile(
+            path=node["path"],
+            additions=node["additions"],
+            deletions=node["deletions"],
+            change_type=node["changeType"],
+        )
+        for node in connection["nodes"]
+    ]
+
+
+def next_cursor(connection: Dict[str, Any]) -> Optional[str]:
+    """Cursor for the next page, None on the last one."""
+    page_info = connection["pageInfo"]
+    return page_info["endCursor"] if page_info["hasNextPage"] else None
+
+
+def parse_blob(node: Optional[Dict[str, Any]]) -> Optional[ConfigBlob]:
+    """Parse a text blob; missing paths, trees and binary files give None."""
+    if not node or node.get("isBinary") or node.get("text") is None:
+        return None
+    return ConfigBlob(oid=node["oid"], text=node["text"])
+
+
+def parse_pull_request_context(data: Dict[str, Any]) -> PullRequestContext:
+    """Build the context from a ``PullRequestContext`` query result."""
+    repository = data["repository"]
+    pull_request = repository["pullRequest"]
+    files = pull_request["files"]
+    return PullRequestContext(
+        number=pull_request["number"],
+        head_ref=pull_request["headRefName"],
+        head_sha=pull_request["headRefOid"],
+        base_ref=pull_request["baseRefName"],
+        base_sha=pull_request["baseRefOid"],
+        changed_files=pull_request["changedFiles"],
+        head_repo=(pull_request.get("headRepository") or {}).get("nameWithOwner"),
+        files=parse_files(files),
+        files_cursor=next_cursor(files),
+        config=parse_blob(repository.get("config")),
+    )
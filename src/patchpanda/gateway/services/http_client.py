@@ -0,0 +1,121 @@
+"""Shared pooled HTTP client for GitHub API calls.
+
+One ``httpx.AsyncClient`` per process keeps TLS connections to the GitHub
+API alive across requests, so outbound calls skip the TCP and TLS handshake.
+HTTP/2 multiplexes concurrent calls over a single connection when the
+``h2`` package is installed; otherwise HTTP/1.1 keep-alive is used.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional http2 extra
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+    "User-Agent": "patchpanda-gateway",
+}
+
+
+class GitHubHTTPClient:
+    """Pooled ``httpx.AsyncClient`` with connection and pool metrics."""
+
+    def __init__(
+        self,
+        base_url: str = "https://api.github.com",
+        http2: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        pool_timeout: float = 5.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_connections = max_connections
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=self.http2,
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout),
+            transport=transport,
+        )
+        self._in_flight = 0
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "pool_timeouts": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+            "peak_in_flight": 0,
+        }
+        self._latency_total = 0.0
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        # httpcore trace hooks: count connections the pool had to open
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self._stats["tls_handshakes"] += 1
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through the shared pool.
+
+        Accepts the ``httpx.AsyncClient.request`` arguments, including a
+        per-request ``timeout``.
+        """
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions.setdefault("trace", self._trace)
+        self._in_flight += 1
+        self._stats["requests"] += 1
+        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._in_flight)
+        start = time.perf_counter()
+        try:
+            return await self.client.request(method, url, extensions=extensions, **kwargs)
+        except httpx.PoolTimeout:
+            self._stats["pool_timeouts"] += 1
+            self._stats["errors"] += 1
+            raise
+        except httpx.HTTPError:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._latency_total += time.perf_counter() - start
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool saturation and connection reuse metrics."""
+        requests = self._stats["requests"]
+        opened = self._stats["connections_opened"]
+        return {
+            "http2": self.http2,
+            "in_flight": self._in_flight,
+            "max_connections": self.max_connections,
+            "pool_utilization": round(self._in_flight / self.max_connections, 3),
+            "peak_pool_utilization": round(self._stats["peak_in_flight"] / self.max_connections, 3),
+            "connection_reuse_ratio": round(1 - opened / requests, 3) if requests else None,
+            "mean_latency_ms": round(self._latency_total / requests * 1000, 2) if requests else None,
+            **self._stats,
+        }
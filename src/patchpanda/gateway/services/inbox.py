@@ -0,0 +1,338 @@
+"""Durable webhook inbox and background processing pool.
+
+A failed delivery is released for retry with an exponential backoff, until
+it has been attempted ``max_attempts`` times. Claiming a delivery counts as
+an attempt, so one reclaimed after its worker died counts too. A body that
+cannot be decoded fails at once, as retrying cannot fix it.
+"""
+
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import sessionmaker
+
+from .. import codec
+from ..db.tables import WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+
+class InboxStatus(str, Enum):
+    """Webhook inbox item status values."""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class InboxItem:
+    """A verified webhook delivery waiting to be processed."""
+
+    event: str
+    body: bytes
+    delivery_id: Optional[str] = None
+    id: Optional[str] = None
+    attempts: int = 0
+    received_at: Optional[datetime] = None
+
+
+def _utcnow() -> datetime:
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class InboxBackend(ABC):
+    """Abstract base class for inbox storage backends."""
+
+    @abstractmethod
+    async def put(self, item: InboxItem) -> str:
+        """Persist a delivery and return its inbox ID."""
+        pass
+
+    @abstractmethod
+    async def claim(self, limit: int) -> List[InboxItem]:
+        """Claim up to ``limit`` deliveries for processing."""
+        pass
+
+    @abstractmethod
+    async def complete(self, item_id: str) -> None:
+        """Mark a delivery as processed."""
+        pass
+
+    @abstractmethod
+    async def fail(self, item_id: str, error: str, retry: bool, delay: float = 0.0) -> None:
+        """Record a processing failure, optionally releasing it for retry after ``delay`` seconds."""
+        pass
+
+    @abstractmethod
+    async def depth(self) -> int:
+        """Number of deliveries not yet processed."""
+        pass
+
+
+class DatabaseInboxBackend(InboxBackend):
+    """Inbox backend storing deliveries in the ``webhook_inbox`` table.
+
+    SQLAlchemy sessions are synchronous, so every call runs in a worker
+    thread to keep the event loop free for incoming webhooks.
+    """
+
+    def __init__(self, session_factory: sessionmaker, visibility_timeout: int = 300):
+        self.session_factory = session_factory
+        self.visibility_timeout = visibility_timeout
+
+    async def put(self, item: InboxItem) -> str:
+        """Insert a delivery into the inbox table."""
+        return await asyncio.to_thread(self._put, item)
+
+    def _put(self, item: InboxItem) -> str:
+        item.id = item.id or str(uuid.uuid4())
+        item.received_at = item.received_at or _utcnow()
+        with self.session_factory() as session:
+            session.add(WebhookDelivery(
+                id=item.id,
+                delivery_id=item.delivery_id,
+                event=item.event,
+                body=item.body,
+                status=InboxStatus.PENDING.value,
+                attempts=0,
+                received_at=item.received_at,
+            ))
+            session.commit()
+        return item.id
+
+    async def claim(self, limit: int) -> List[InboxItem]:
+        """Claim pending deliveries, oldest first."""
+        return await asyncio.to_thread(self._claim, limit)
+
+    def _claim(self, limit: int) -> List[InboxItem]:
+        now = _utcnow()
+        stale_before = now - timedelta(seconds=self.visibility_timeout)
+        with self.session_factory() as session:
+            # Deliveries stuck in "processing" past the visibility timeout
+            # belong to a worker that died; pick them up again.
+            rows = (
+                session.query(WebhookDelivery)
+                .filter(or_(
+                    (WebhookDelivery.status == InboxStatus.PENDING.value)
+                    & or_(WebhookDelivery.available_at.is_(None), WebhookDelivery.available_at <= now),
+                    (WebhookDelivery.status == InboxStatus.PROCESSING.value)
+                    & (WebhookDelivery.started_at < stale_before),
+                ))
+                .order_by(WebhookDelivery.received_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            items = []
+            for row in rows:
+                # Compare-and-set on the observed state so two workers never
+                # claim the same row, even where SKIP LOCKED is unsupported.
+                claimed = (
+                    session.query(WebhookDelivery)
+                    .filter(
+                        WebhookDelivery.id == row.id,
+                        WebhookDelivery.status == row.status,
+                        WebhookDelivery.attempts == row.attempts,
+                    )
+                    .update({
+                        WebhookDelivery.status: InboxStatus.PROCESSING.value,
+                        WebhookDelivery.started_at: now,
+                        WebhookDelivery.attempts: row.attempts + 1,
+                    }, synchronize_session=False)
+                )
+                if not claimed:
+                    continue
+                items.append(InboxItem(
+                    id=row.id,
+                    delivery_id=row.delivery_id,
+                    event=row.event,
+                    body=row.body,
+                    attempts=row.attempts + 1,
+                    received_at=row.received_at,
+                ))
+            session.commit()
+        return items
+
+    async def complete(self, item_id: str) -> None:
+        """Mark a delivery as done."""
+        await asyncio.to_thread(self._finish, item_id, InboxStatus.DONE, None)
+
+    async def fail(self, item_id: str, error: str, retry: bool, delay: float = 0.0) -> None:
+        """Release a delivery for retry after ``delay`` seconds or mark it as failed."""
+        status = InboxStatus.PENDING if retry else InboxStatus.FAILED
+        await asyncio.to_thread(self._finish, item_id, status, error, delay)
+
+    def _finish(self, item_id: str, status: InboxStatus, error: Optional[str], delay: float = 0.0) -> None:
+        with self.session_factory() as session:
+            row = session.get(WebhookDelivery, item_id)
+            if row is None:
+                return
+            row.status = status.value
+            row.error_message = error
+            if status == InboxStatus.PENDING:
+                row.available_at = _utcnow() + timedelta(seconds=delay)
+            else:
+                row.completed_at = _utcnow()
+            session.commit()
+
+    async def depth(self) -> int:
+        """Count pending and in-flight deliveries."""
+        return await asyncio.to_thread(self._depth)
+
+    def _depth(self) -> int:
+        with self.session_factory() as session:
+            return (
+                session.query(WebhookDelivery)
+                .filter(WebhookDelivery.status.in_([
+                    InboxStatus.PENDING.value,
+                    InboxStatus.PROCESSING.value,
+                ]))
+                .count()
+            )
+
+
+class InboxWorkerPool:
+    """Bounded pool of asyncio workers draining the webhook inbox."""
+
+    def __init__(
+        self,
+        backend: InboxBackend,
+        dispatch: Callable[[InboxItem], Awaitable[Any]],
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        retry_backoff: float = 5.0,
+        retry_backoff_max: float = 300.0,
+        latency_window: int = 1000,
+    ):
+        self.backend = backend
+        self.dispatch = dispatch
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._busy = 0
+        self._processed = 0
+        self._failed = 0
+        self._retried = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._stopping = False
+        for index in range(self.workers):
+            self._tasks.append(
+                asyncio.create_task(self._run(), name=f"webhook-inbox-{index}")
+            )
+
+    async def stop(self) -> None:
+        """Stop the worker tasks, letting in-flight deliveries finish."""
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def put(self, event: str, body: bytes, delivery_id: Optional[str] = None) -> str:
+        """Persist a delivery and wake an idle worker."""
+        item_id = await self.backend.put(
+            InboxItem(event=event, body=body, delivery_id=delivery_id)
+        )
+        self._wakeup.set()
+        return item_id
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # Clear before claiming so a put() racing with an empty claim
+            # still wakes this worker.
+            self._wakeup.clear()
+            try:
+                items = await self.backend.claim(1)
+            except Exception:
+                logger.exception("Failed to claim webhook inbox items")
+                items = []
+
+            if not items:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for item in items:
+                try:
+                    await self._process(item)
+                except Exception:
+                    # The delivery stays "processing" and is reclaimed once
+                    # its visibility timeout expires.
+                    logger.exception("Failed to update webhook inbox item %s", item.id)
+
+    async def _process(self, item: InboxItem) -> None:
+        if item.attempts > self.max_attempts:
+            # Reclaimed after its worker died on every attempt
+            self._failed += 1
+            logger.error("Webhook delivery %s abandoned after %d attempts", item.delivery_id, item.attempts - 1)
+            await self.backend.fail(item.id, f"Abandoned after {item.attempts - 1} attempts", retry=False)
+            return
+
+        self._busy += 1
+        try:
+            await self.dispatch(item)
+        except Exception as e:
+            # A body that cannot be decoded never will be
+            retry = item.attempts < self.max_attempts and not isinstance(e, codec.PayloadDecodeError)
+            if retry:
+                self._retried += 1
+            else:
+                self._failed += 1
+            logger.exception("Webhook delivery %s failed", item.delivery_id)
+            await self.backend.fail(item.id, str(e), retry=retry, delay=self._backoff(item.attempts))
+        else:
+            await self.backend.complete(item.id)
+            self._processed += 1
+            if item.received_at is not None:
+                self._latencies.append(
+                    (_utcnow() - item.received_at).total_seconds()
+                )
+        finally:
+            self._busy -= 1
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempts - 1))
+
+    async def stats(self) -> Dict[str, Any]:
+        """Inbox depth, drain latency and worker utilisation."""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "depth": await self.backend.depth(),
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "processed": self._processed,
+            "retried": self._retried,
+            "failed": self._failed,
+            "drain_latency_seconds": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": latencies[-1] if latencies else None,
+            },
+        }
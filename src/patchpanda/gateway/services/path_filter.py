@@ -0,0 +1,103 @@
+"""Compiled include/exclude path matching.
+
+Config patterns are matched against every changed file of a pull request
+and every file of a coverage report. Checking each path against each
+pattern with ``fnmatch`` costs O(paths x patterns); ``PathMatcher`` is
+built once per pattern set and answers most paths with a set lookup or a
+single ``str.startswith``/``str.endswith`` call:
+
+* patterns without wildcards are looked up in a set;
+* ``literal*`` patterns (``docs/*``) become one prefix tuple and
+  ``*literal`` patterns (``*.md``) one suffix tuple;
+* the rest are compiled into one regex per literal first path segment,
+  so ``src/**/*.py`` is only tried for paths under ``src/``, plus one
+  regex for patterns starting with a wildcard.
+
+Matching follows ``fnmatch.fnmatchcase``: ``*`` also matches ``/``.
+"""
+
+import fnmatch
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+_WILDCARD = re.compile(r"[*?\[]")
+
+
+def _compile(patterns: List[str]) -> Optional[Callable[[str], Optional[re.Match]]]:
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns)).match
+
+
+class PathMatcher:
+    """Match paths against a fixed set of glob patterns."""
+
+    __slots__ = ("patterns", "_exact", "_prefixes", "_suffixes", "_by_segment", "_anywhere")
+
+    def __init__(self, patterns: Iterable[str]):
+        # Deduplicated, in their original order
+        self.patterns = tuple(dict.fromkeys(patterns))
+        exact = set()
+        prefixes: List[str] = []
+        suffixes: List[str] = []
+        grouped: Dict[Optional[str], List[str]] = {}
+        for pattern in self.patterns:
+            wildcard = _WILDCARD.search(pattern)
+            if wildcard is None:
+                exact.add(pattern)
+                continue
+            head, rest = pattern[:wildcard.start()], pattern[wildcard.start():]
+            if rest == "*":
+                prefixes.append(head)
+            elif not head and rest[0] == "*" and not _WILDCARD.search(rest, 1):
+                suffixes.append(rest[1:])
+            else:
+                segment = head.split("/", 1)[0] if "/" in head else None
+                grouped.setdefault(segment, []).append(pattern)
+        self._exact = frozenset(exact)
+        self._prefixes = tuple(prefixes)
+        self._suffixes = tuple(suffixes)
+        self._by_segment = {
+            segment: _compile(group) for segment, group in grouped.items() if segment is not None
+        }
+        self._anywhere = _compile(grouped.get(None, []))
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def __call__(self, path: str) -> bool:
+        """Whether any pattern matches the path."""
+        if path in self._exact:
+            return True
+        if self._prefixes and path.startswith(self._prefixes):
+            return True
+        if self._suffixes and path.endswith(self._suffixes):
+            return True
+        if self._by_segment:
+            slash = path.find("/")
+            if slash >= 0:
+                match = self._by_segment.get(path[:slash])
+                if match is not None and match(path) is not None:
+                    return True
+        return self._anywhere is not None and self._anywhere(path) is not None
+
+
+class PathFilter:
+    """Include and exclude patterns applied together."""
+
+    __slots__ = ("include", "exclude")
+
+    def __init__(self, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None):
+        # No include patterns means every path is included
+        self.include = PathMatcher(include) if include else None
+        self.exclude = PathMatcher(exclude or ())
+
+    def __call__(self, path: str) -> bool:
+        """Whether the path is included and not excluded."""
+        if self.include is not None and not self.include(path):
+            return False
+        return not self.exclude(path)
+
+    def filter(self, paths: Iterable[str]) -> Iterator[str]:
+        """Yield the paths that pass the filter."""
+        return filter(self, paths)
@@ -0,0 +1,150 @@
+"""Opportunistic prefetch for pull request bot commands.
+
+A bot command commented on a pull request needs the installation token,
+the pull request's head and the effective config at that head before it
+can enqueue anything. When a pull request is opened, reopened or pushed
+to, they are warmed in the background so a later command finds them
+without calling GitHub:
+
+* the head and base of the pull request come with the event and are
+  remembered per pull request (``head``) for ``head_ttl`` seconds, so a
+  command on a pull request closed since only runs until then;
+* the installation token lands in the token cache;
+* the effective config at the head SHA lands in the resolver's memo.
+
+Prefetching is best effort and is the first work dropped under load. At
+most ``max_concurrency`` prefetches run and ``max_pending`` wait; further
+ones are dropped, as are all new ones while the GitHub call guard has no
+free slot. Config lookups are sent with ``RequestPriority.BACKGROUND`` and
+each prefetch gives up after ``timeout`` seconds.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+from ..models.events import PullRequestEvent
+from .effective_config import EffectiveConfigResolver
+from .github_app import GitHubAppService
+from .rate_limit import RequestPriority
+from .resilience import deadline
+
+logger = logging.getLogger(__name__)
+
+PullRequestKey = Tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class PullRequestHead:
+    """Head and base of a pull request as of its latest event."""
+    installation_id: int
+    head_sha: str
+    head_ref: Optional[str]
+    head_repo: Optional[str]
+    base_sha: Optional[str]
+
+
+def pull_request_key(owner: str, repo: str, number: int) -> PullRequestKey:
+    """Key a pull request; GitHub owner and repository names are case-insensitive."""
+    return owner.lower(), repo.lower(), number
+
+
+class PullRequestPrefetcher:
+    """Warm the state a bot command on a pull request needs."""
+
+    def __init__(
+        self,
+        github_app_service: GitHubAppService,
+        effective_config: EffectiveConfigResolver,
+        max_concurrency: int = 4,
+        max_pending: int = 100,
+        timeout: float = 10.0,
+        max_entries: int = 10000,
+        head_ttl: float = 3600.0,
+    ):
+        self.github_app_service = github_app_service
+        self.effective_config = effective_config
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.head_ttl = head_ttl
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        # Each pull request's head and when it expires (time.monotonic())
+        self._heads: "OrderedDict[PullRequestKey, Tuple[PullRequestHead, float]]" = OrderedDict()
+        self._stats = {"offered": 0, "dropped": 0, "completed": 0, "failed": 0}
+
+    def offer(self, event: PullRequestEvent) -> bool:
+        """Remember the pull request's head and prefetch in the background.
+
+        Returns False when the prefetch was dropped.
+        """
+        if not (event.installation_id and event.owner and event.repo and event.number and event.head_sha):
+            return False
+        self._stats["offered"] += 1
+        key = pull_request_key(event.owner, event.repo, event.number)
+        head = PullRequestHead(
+            event.installation_id, event.head_sha, event.head_ref, event.head_repo, event.base_sha
+        )
+        self._heads[key] = (head, time.monotonic() + self.head_ttl)
+        self._heads.move_to_end(key)
+        if len(self._heads) > self.max_entries:
+            self._heads.popitem(last=False)
+
+        if len(self._tasks) >= self.max_concurrency + self.max_pending or self._github_saturated():
+            self._stats["dropped"] += 1
+            return False
+        # Fresh context: the prefetch outlives the delivery and its deadline
+        task = asyncio.create_task(self._prefetch(event), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def _github_saturated(self) -> bool:
+        call_guard = self.github_app_service.call_guard
+        return call_guard is not None and call_guard.limiter.saturated()
+
+    async def _prefetch(self, event: PullRequestEvent) -> None:
+        async with self._semaphore:
+            try:
+                with deadline(self.timeout):
+                    await self.github_app_service.get_installation_token(event.installation_id)
+                    await self.effective_config.resolve(
+                        event.owner, event.repo, event.head_sha, event.installation_id, RequestPriority.BACKGROUND
+                    )
+                self._stats["completed"] += 1
+            except Exception:
+                self._stats["failed"] += 1
+                logger.debug("Prefetch for %s/%s#%s failed", event.owner, event.repo, event.number, exc_info=True)
+
+    def head(self, owner: str, repo: str, number: int) -> Optional[PullRequestHead]:
+        """Return the pull request's head as of its latest event, if known."""
+        key = pull_request_key(owner, repo, number)
+        entry = self._heads.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._heads[key]
+            return None
+        return entry[0]
+
+    async def stop(self) -> None:
+        """Cancel running and waiting prefetches."""
+        tasks, self._tasks = self._tasks, set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue sizes and counters."""
+        return {
+            "pending": len(self._tasks),
+            "heads": len(self._heads),
+            "max_concurrency": self.max_concurrency,
+            **self._stats,
+        }
@@ -4,6 +4,8 @@ import json
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+import redis.asyncio as redis
+
 from ..settings import get_settings
 
 
@@ -20,24 +22,31 @@ class QueueBackend(ABC):
         """Dequeue a message from a queue."""
         pass
 
+    async def close(self) -> None:
+        """Release backend connections."""
+
 
 class RedisQueueBackend(QueueBackend):
     """Redis-based queue backend."""
 
-    def __init__(self):
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
         self.settings = get_settings()
-        self._redis_client = None
+        self._redis_client = redis_client
+        self._owns_client = redis_client is None
 
     @property
     async def redis_client(self):
         """Get Redis client connection."""
         if not self._redis_client:
-            # TODO: Initialize Redis client
-            # - Connect to Redis using settings
-            # - Handle connection pooling
-            pass
+            self._redis_client = redis.from_url(self.settings.redis_url)
         return self._redis_client
 
+    async def close(self) -> None:
+        """Close the Redis client if this backend created it."""
+        if self._owns_client and self._redis_client is not None:
+            await self._redis_client.aclose()
+            self._redis_client = None
+
     async def enqueue(self, queue_name: str, message: Dict[str, Any]) -> str:
         """Enqueue a message to Redis queue."""
         # TODO: Implement Redis enqueue
@@ -92,8 +101,9 @@ class SQSQueueBackend(QueueBackend):
 class QueueService:
     """Main queue service with backend abstraction."""
 
-    def __init__(self):
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
         self.settings = get_settings()
+        self._redis_client = redis_client
         self._backend = None
 
     @property
@@ -103,9 +113,14 @@ class QueueService:
             if self.settings.queue_backend == "sqs":
                 self._backend = SQSQueueBackend()
             else:
-                self._backend = RedisQueueBackend()
+                self._backend = RedisQueueBackend(self._redis_client)
         return self._backend
 
+    async def close(self) -> None:
+        """Close the backend connections."""
+        if self._backend is not None:
+            await self._backend.close()
+
     async def enqueue_job(self, job_data: Dict[str, Any]) -> str:
         """Enqueue a test generation job."""
         return await self.backend.enqueue("test_generation", job_data)
@@ -0,0 +1,284 @@
+"""GitHub API rate-limit scheduling.
+
+GitHub meters REST and GraphQL calls per installation token and, for calls
+made with the app JWT, per app. The scheduler tracks the
+``X-RateLimit-*`` headers of every response per budget and decides when
+the next request may start:
+
+* a secondary rate limit (``Retry-After``) or an exhausted budget holds all
+  requests for that budget until it lifts;
+* as a budget runs low, background work stops first, normal calls are
+  spread evenly over the time left until the reset, and user-triggered
+  calls may use the budget down to zero;
+* waiting requests start in priority order.
+
+Requests that would wait longer than ``max_wait`` fail fast with
+``RateLimitExceeded`` instead of queueing behind a reset an hour away.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+BudgetKey = Tuple[str, Optional[int], str]
+
+# GitHub asks clients to wait at least a minute after a secondary limit
+# that carries no Retry-After header
+SECONDARY_LIMIT_BACKOFF = 60.0
+
+
+class RequestPriority(IntEnum):
+    """GitHub API request priorities, lower is served first."""
+    INTERACTIVE = 0  # user-triggered commands
+    NORMAL = 1
+    BACKGROUND = 2  # prefetches and cache refreshes
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would wait too long for its rate-limit budget."""
+
+    def __init__(self, key: BudgetKey, retry_after: float):
+        super().__init__(f"GitHub rate limit for {key[0]} {key[1]} ({key[2]}), retry in {retry_after:.0f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+def rate_limit_resource(endpoint: str) -> str:
+    """Rate-limit resource GitHub meters an endpoint against."""
+    path = urlsplit(endpoint).path.rstrip("/")
+    if path.startswith("/api/v3/"):
+        # GitHub Enterprise Server REST prefix
+        path = path[len("/api/v3"):]
+    if path.endswith("/graphql"):
+        return "graphql"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
+
+
+def installation_budget(installation_id: int, endpoint: str) -> BudgetKey:
+    """Budget for calls made with an installation token."""
+    return ("installation", installation_id, rate_limit_resource(endpoint))
+
+
+def app_budget(endpoint: str) -> BudgetKey:
+    """Budget for calls made with the app JWT."""
+    return ("app", None, rate_limit_resource(endpoint))
+
+
+@dataclass
+class _Budget:
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0.0
+    blocked_until: float = 0.0
+    in_flight: int = 0
+    last_start: float = 0.0
+    waiters: List[Tuple[int, int, asyncio.Future]] = field(default_factory=list)
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    pump: Optional[asyncio.Task] = None
+
+
+class RateLimitScheduler:
+    """Per-budget request pacing driven by GitHub rate-limit headers."""
+
+    def __init__(
+        self,
+        normal_reserve: float = 0.05,
+        background_reserve: float = 0.2,
+        max_wait: float = 60.0,
+        max_budgets: int = 10000,
+    ):
+        self.max_wait = max_wait
+        self.max_budgets = max_budgets
+        # Share of a budget each priority leaves untouched for the ones above it
+        self._reserves = {
+            RequestPriority.INTERACTIVE: 0.0,
+            RequestPriority.NORMAL: normal_reserve,
+            RequestPriority.BACKGROUND: max(normal_reserve, background_reserve),
+        }
+        self._budgets: "OrderedDict[BudgetKey, _Budget]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._started = {priority: 0 for priority in RequestPriority}
+        self._stats = {"waited": 0, "rate_limited": 0, "secondary_limited": 0, "rejected": 0}
+
+    def _budget(self, key: BudgetKey) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget()
+            if len(self._budgets) > self.max_budgets:
+                self._evict()
+        else:
+            self._budgets.move_to_end(key)
+        return budget
+
+    def _evict(self) -> None:
+        # Forget the least recently used budget nobody is using
+        for key, budget in self._budgets.items():
+            if not budget.in_flight and not budget.waiters:
+                del self._budgets[key]
+                return
+
+    def _ready_at(self, budget: _Budget, priority: RequestPriority, now: float) -> float:
+        """Earliest time a request of this priority may start."""
+        if budget.blocked_until > now:
+            return budget.blocked_until
+        if budget.remaining is None or budget.limit is None or now >= budget.reset_at:
+            # Unknown or already reset: the next response tells us
+            return now
+        available = budget.remaining - budget.in_flight
+        if available <= budget.limit * self._reserves[priority]:
+            return budget.reset_at
+        if priority != RequestPriority.INTERACTIVE and available <= budget.limit * self._reserves[RequestPriority.BACKGROUND]:
+            # Running low: spread what is left evenly until the reset
+            return max(now, budget.last_start + (budget.reset_at - now) / available)
+        return now
+
+    def _start(self, budget: _Budget, priority: RequestPriority, now: float) -> None:
+        budget.in_flight += 1
+        budget.last_start = now
+        self._started[priority] += 1
+
+    async def acquire(self, key: BudgetKey, priority: RequestPriority = RequestPriority.NORMAL) -> None:
+        """Wait until the budget allows a request, or raise RateLimitExceeded."""
+        budget = self._budget(key)
+        now = time.time()
+        ready_at = self._ready_at(budget, priority, now)
+        if ready_at <= now and not any(
+            not future.done() and waiting <= priority for waiting, _, future in budget.waiters
+        ):
+            self._start(budget, priority, now)
+            return
+        if ready_at - now > self.max_wait:
+            self._stats["rejected"] += 1
+            raise RateLimitExceeded(key, ready_at - now)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(budget.waiters, (priority, next(self._sequence), future))
+        self._stats["waited"] += 1
+        self._wake(budget)
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over as the wait expired
+                self.release(key)
+            self._stats["rejected"] += 1
+            raise RateLimitExceeded(key, max(0.0, self._ready_at(budget, priority, time.time()) - time.time()))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Started as the caller went away: give the slot back
+                self.release(key)
+            raise
+
+    def release(self, key: BudgetKey, status_code: Optional[int] = None, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """Record a finished request.
+
+        Returns the seconds to wait before retrying when GitHub rejected the
+        request for rate limiting, otherwise None.
+        """
+        budget = self._budget(key)
+        budget.in_flight = max(0, budget.in_flight - 1)
+        delay = self._observe(key, budget, status_code, headers) if headers is not None else None
+        if budget.waiters:
+            self._wake(budget)
+        return delay
+
+    def _observe(self, key: BudgetKey, budget: _Budget, status_code: Optional[int], headers: Mapping[str, str]) -> Optional[float]:
+        now = time.time()
+        try:
+            if "x-ratelimit-limit" in headers:
+                budget.limit = int(headers["x-ratelimit-limit"])
+            if "x-ratelimit-remaining" in headers:
+                budget.remaining = int(headers["x-ratelimit-remaining"])
+            if "x-ratelimit-reset" in headers:
+                budget.reset_at = float(headers["x-ratelimit-reset"])
+        except ValueError:
+            logger.warning("Ignoring malformed rate-limit headers for %s", key)
+
+        if status_code not in (403, 429):
+            return None
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = SECONDARY_LIMIT_BACKOFF
+            self._stats["secondary_limited"] += 1
+        elif budget.remaining == 0 and budget.reset_at > now:
+            delay = budget.reset_at - now
+            self._stats["rate_limited"] += 1
+        elif status_code == 429:
+            delay = SECONDARY_LIMIT_BACKOFF
+            self._stats["secondary_limited"] += 1
+        else:
+            # A plain 403 is a permission problem, not a rate limit
+            return None
+        budget.blocked_until = max(budget.blocked_until, now + delay)
+        logger.warning("GitHub rate limit hit for %s, holding requests for %.0fs", key, delay)
+        return delay
+
+    def _wake(self, budget: _Budget) -> None:
+        budget.changed.set()
+        if budget.pump is None:
+            budget.pump = asyncio.create_task(self._pump(budget))
+
+    async def _pump(self, budget: _Budget) -> None:
+        """Start waiting requests in priority order as the budget allows."""
+        try:
+            while budget.waiters:
+                priority, _, future = budget.waiters[0]
+                if future.done():
+                    heapq.heappop(budget.waiters)
+                    continue
+                now = time.time()
+                ready_at = self._ready_at(budget, RequestPriority(priority), now)
+                if ready_at <= now:
+                    heapq.heappop(budget.waiters)
+                    self._start(budget, RequestPriority(priority), now)
+                    future.set_result(None)
+                    continue
+                # Sleep until the budget allows it or a response changes the picture
+                budget.changed.clear()
+                try:
+                    await asyncio.wait_for(budget.changed.wait(), ready_at - now)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            budget.pump = None
+
+    def stats(self) -> Dict[str, object]:
+        """Return scheduling counters and the budgets closest to exhaustion."""
+        now = time.time()
+        known = [
+            (key, budget) for key, budget in self._budgets.items()
+            if budget.limit and budget.remaining is not None and budget.reset_at > now
+        ]
+        known.sort(key=lambda item: item[1].remaining / item[1].limit)
+        return {
+            "budgets": len(self._budgets),
+            "waiting": sum(len(budget.waiters) for budget in self._budgets.values()),
+            "blocked": sum(1 for budget in self._budgets.values() if budget.blocked_until > now),
+            "started": {priority.name.lower(): count for priority, count in self._started.items()},
+            **self._stats,
+            "lowest": [
+                {
+                    "scope": key[0],
+                    "installation_id": key[1],
+                    "resource": key[2],
+                    "remaining": budget.remaining,
+                    "limit": budget.limit,
+                    "reset_in": round(budget.reset_at - now),
+                }
+                for key, budget in known[:5]
+            ],
+        }
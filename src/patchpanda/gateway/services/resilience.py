@@ -0,0 +1,434 @@
+"""Adaptive concurrency, circuit breaking and deadlines for GitHub calls.
+
+When GitHub degrades, sending more requests only lengthens its queue and
+ours. Outbound calls therefore pass three guards:
+
+* an AIMD concurrency limit shared by all calls. Each call that comes back
+  in time raises the limit by about one per round of calls; a timeout, a
+  429 or a 5xx cuts it by ``backoff``, and so does an endpoint class whose
+  recent average latency climbs ``latency_tolerance`` times above its own
+  long-run average. Calls over the limit wait in priority order, so
+  background work yields first;
+* a circuit breaker per endpoint class (``pulls``, ``contents``,
+  ``check-runs``, ``graphql``...). After ``failure_threshold`` consecutive
+  failures the class fails fast with ``CircuitOpenError`` until
+  ``reset_timeout`` has passed, then a single probe decides whether it
+  closes again;
+* a deadline carried in a context variable. Code working against a budget,
+  such as a webhook GitHub stops waiting for after ten seconds, wraps its
+  work in ``deadline()``. Calls whose endpoint class usually takes longer
+  than the time left are skipped with ``DeadlineExceeded`` rather than
+  started, and the rest get the time left as their timeout. Work shared
+  between callers, such as single-flight calls and token refreshes, runs
+  without any one caller's deadline.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .rate_limit import RequestPriority
+
+logger = logging.getLogger(__name__)
+
+# time.monotonic() by which the current unit of work has to be done
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("github_deadline", default=None)
+
+# Weight of a new sample in the recent average latency of an endpoint class
+LATENCY_SMOOTHING = 0.2
+# Weight of a new sample in the long-run average the recent one is compared with
+BASELINE_SMOOTHING = 0.01
+# Successful calls an endpoint class needs before its latency can signal overload
+BASELINE_MIN_SAMPLES = 20
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call cannot finish within the caller's deadline."""
+
+    def __init__(self, endpoint_class: str, remaining: float, expected: float = 0.0):
+        super().__init__(
+            f"GitHub {endpoint_class} call skipped: {max(remaining, 0.0):.2f}s left, usually takes {expected:.2f}s"
+        )
+        self.endpoint_class = endpoint_class
+        self.remaining = remaining
+        self.expected = expected
+
+
+class CircuitOpenError(Exception):
+    """Raised while the circuit for an endpoint class is open."""
+
+    def __init__(self, endpoint_class: str, retry_after: float):
+        super().__init__(f"GitHub {endpoint_class} circuit open, retry in {retry_after:.0f}s")
+        self.endpoint_class = endpoint_class
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a call waited too long for a concurrency slot."""
+
+    def __init__(self, limit: int, waited: float):
+        super().__init__(f"No GitHub concurrency slot within {waited:.1f}s (limit {limit})")
+        self.limit = limit
+        self.waited = waited
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Bound the GitHub calls made inside the block to ``seconds`` from now.
+
+    A nested deadline can only shorten the enclosing one. Tasks started
+    inside the block inherit it.
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        at = min(at, current)
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left until the current deadline, None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def endpoint_class(endpoint: str) -> str:
+    """Group an endpoint with the ones GitHub serves from the same backend.
+
+    ``/repos/{owner}/{repo}/pulls/1`` and ``/repositories/{id}/pulls`` are
+    ``pulls``, the repository itself is ``repos`` and token exchanges are
+    ``app``.
+    """
+    path = urlsplit(endpoint).path
+    if path.startswith("/api/"):
+        # GitHub Enterprise Server: /api/v3/... and /api/graphql
+        path = path[len("/api"):]
+        if path.startswith("/v3/"):
+            path = path[len("/v3"):]
+    parts = [part for part in path.split("/") if part]
+    if not parts:
+        return "other"
+    if parts[0] == "repos":
+        return parts[3] if len(parts) > 3 else "repos"
+    if parts[0] == "repositories":
+        return parts[2] if len(parts) > 2 else "repos"
+    return parts[0]
+
+
+class AdaptiveLimiter:
+    """AIMD limit on concurrent calls."""
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        backoff: float = 0.75,
+        max_wait: float = 10.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._stats = {"acquired": 0, "waited": 0, "rejected": 0, "increases": 0, "decreases": 0}
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def saturated(self) -> bool:
+        """Whether a new call would have to wait for a slot."""
+        return not self._has_slot() or any(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.NORMAL, timeout: Optional[float] = None) -> None:
+        """Wait for a slot, at most ``timeout`` or ``max_wait`` seconds.
+
+        Raises ConcurrencyLimitExceeded when no slot frees up in time.
+        """
+        if not self.saturated():
+            self._start()
+            return
+
+        wait = self.max_wait if timeout is None else max(0.0, min(timeout, self.max_wait))
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._stats["waited"] += 1
+        try:
+            await asyncio.wait_for(future, wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over as the wait expired
+                self.release()
+            self._stats["rejected"] += 1
+            raise ConcurrencyLimitExceeded(int(self.limit), wait)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Started as the caller went away: give the slot back
+                self.release()
+            raise
+
+    def _start(self) -> None:
+        self.in_flight += 1
+        self._stats["acquired"] += 1
+
+    def release(self, overloaded: Optional[bool] = None, started: float = 0.0) -> None:
+        """Free a slot and adapt the limit.
+
+        ``overloaded`` is None for calls that tell nothing about GitHub's
+        health (cancelled or never sent). Failures of calls started before
+        the last cut were sent under the old limit and do not cut again.
+        """
+        self.in_flight = max(0, self.in_flight - 1)
+        if overloaded:
+            if started >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self._stats["decreases"] += 1
+                logger.info("GitHub concurrency limit lowered to %d", int(self.limit))
+        elif overloaded is not None and self.in_flight + 1 >= self.limit / 2:
+            # Only a limit that is actually in use has earned a raise
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._stats["increases"] += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_slot():
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._start()
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, object]:
+        """Return the current limit, queue length and counters."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            **self._stats,
+        }
+
+
+class CircuitBreaker:
+    """Closed, open and half-open states for one endpoint class."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"opened": 0, "short_circuited": 0}
+
+    def allow(self) -> None:
+        """Admit a call or raise CircuitOpenError."""
+        if self.state == self.CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            retry_after = self._opened_at + self.reset_timeout - now
+            if retry_after > 0:
+                self._stats["short_circuited"] += 1
+                raise CircuitOpenError(self.name, retry_after)
+            self.state = self.HALF_OPEN
+        if self._probing:
+            # One probe at a time while half open
+            self._stats["short_circuited"] += 1
+            raise CircuitOpenError(self.name, 1.0)
+        self._probing = True
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of an admitted call."""
+        self._probing = False
+        if success:
+            if self.state != self.CLOSED:
+                logger.info("GitHub %s circuit closed", self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._stats["opened"] += 1
+            logger.warning("GitHub %s circuit opened after %d failures", self.name, self.failures)
+
+    def abandon(self) -> None:
+        """Forget an admitted call that ended without an outcome."""
+        self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        """Return the state and counters."""
+        return {"state": self.state, "failures": self.failures, **self._stats}
+
+
+@dataclass
+class _EndpointClass:
+    breaker: CircuitBreaker
+    # Recent average latency of successful calls: what the next call is expected to take
+    latency: Optional[float] = None
+    # Long-run average latency: how fast this endpoint class usually is
+    baseline: Optional[float] = None
+    samples: int = 0
+    calls: Dict[str, int] = field(default_factory=lambda: {"succeeded": 0, "failed": 0, "throttled": 0})
+
+    def observe(self, latency: float, tolerance: float) -> bool:
+        """Add a successful call's latency; whether the class now looks overloaded."""
+        self.samples += 1
+        if self.latency is None:
+            self.latency = self.baseline = latency
+            return False
+        # Clamped so a single outlier cannot swing either average on its own
+        sample = min(latency, self.baseline * tolerance * 2)
+        self.latency += (sample - self.latency) * LATENCY_SMOOTHING
+        self.baseline += (sample - self.baseline) * BASELINE_SMOOTHING
+        return self.samples > BASELINE_MIN_SAMPLES and self.latency > self.baseline * tolerance
+
+
+class CallGuard:
+    """Adaptive limit, per-class breakers and deadlines around outbound calls."""
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        latency_tolerance: float = 2.0,
+    ):
+        self.limiter = limiter or AdaptiveLimiter()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_tolerance = latency_tolerance
+        self._endpoints: Dict[str, _EndpointClass] = {}
+        self._stats = {"deadline_skipped": 0, "deadline_timeouts": 0}
+
+    def _endpoint(self, name: str) -> _EndpointClass:
+        state = self._endpoints.get(name)
+        if state is None:
+            state = self._endpoints[name] = _EndpointClass(
+                breaker=CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+            )
+        return state
+
+    def check_deadline(self, endpoint: str) -> None:
+        """Raise DeadlineExceeded when the endpoint usually takes longer than the time left.
+
+        Callers joining shared work check here, as the work itself runs
+        without their deadline.
+        """
+        name = endpoint_class(endpoint)
+        state = self._endpoint(name)
+        remaining = time_remaining()
+        if remaining is not None and remaining <= (state.latency or 0.0):
+            self._stats["deadline_skipped"] += 1
+            raise DeadlineExceeded(name, remaining, state.latency or 0.0)
+
+    async def run(
+        self,
+        endpoint: str,
+        priority: RequestPriority,
+        send: Callable[[Optional[float]], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Send a call through the guards.
+
+        ``send`` receives the seconds left until the deadline, None without
+        one, to use as its timeout. Responses with a 5xx status and transport
+        errors count as failures. A 429 only cuts the concurrency limit.
+        """
+        name = endpoint_class(endpoint)
+        state = self._endpoint(name)
+        self.check_deadline(endpoint)
+        remaining = time_remaining()
+
+        state.breaker.allow()
+        try:
+            await self.limiter.acquire(priority, remaining)
+        except ConcurrencyLimitExceeded as e:
+            state.breaker.abandon()
+            remaining = time_remaining()
+            if remaining is not None and remaining <= 0:
+                self._stats["deadline_skipped"] += 1
+                raise DeadlineExceeded(name, remaining, state.latency or 0.0) from e
+            raise
+        except BaseException:
+            state.breaker.abandon()
+            raise
+
+        started = time.monotonic()
+        try:
+            response = await send(time_remaining())
+        except httpx.TimeoutException as e:
+            remaining = time_remaining()
+            if remaining is not None and remaining <= 0:
+                # Cut short by our own deadline, not a sign of trouble upstream
+                self._stats["deadline_timeouts"] += 1
+                self._finish(state, started, None)
+                raise DeadlineExceeded(name, remaining, state.latency or 0.0) from e
+            self._finish(state, started, False)
+            raise
+        except httpx.TransportError:
+            self._finish(state, started, False)
+            raise
+        except BaseException:
+            self._finish(state, started, None)
+            raise
+        if response.status_code == 429:
+            # GitHub is shedding our load; the endpoint itself is healthy
+            state.calls["throttled"] += 1
+            state.breaker.abandon()
+            self.limiter.release(True, started)
+        else:
+            self._finish(state, started, response.status_code < 500)
+        return response
+
+    def _finish(self, state: _EndpointClass, started: float, success: Optional[bool]) -> None:
+        if success is None:
+            state.breaker.abandon()
+            self.limiter.release(None, started)
+            return
+        overloaded = not success
+        if success:
+            overloaded = state.observe(time.monotonic() - started, self.latency_tolerance)
+            state.calls["succeeded"] += 1
+        else:
+            state.calls["failed"] += 1
+        state.breaker.record(success)
+        self.limiter.release(overloaded, started)
+
+    def stats(self) -> Dict[str, object]:
+        """Return limiter state, deadline counters and per-class health."""
+        return {
+            "limiter": self.limiter.stats(),
+            **self._stats,
+            "endpoints": {
+                name: {
+                    **state.breaker.stats(),
+                    **state.calls,
+                    "latency_ms": None if state.latency is None else round(state.latency * 1000, 1),
+                    "baseline_ms": None if state.baseline is None else round(state.baseline * 1000, 1),
+                }
+                for name, state in sorted(self._endpoints.items())
+            },
+        }
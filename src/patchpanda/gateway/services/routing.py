@@ -0,0 +1,101 @@
+"""Routing table and cheap pre-parse filters for GitHub webhooks.
+
+Most deliveries are events or actions the gateway only acknowledges. These
+helpers decide that from the ``X-GitHub-Event`` header and a prefix scan of
+the raw body, so ignored deliveries never pay for JSON decoding or service
+construction.
+"""
+
+import re
+from typing import Dict, FrozenSet, Optional
+
+from ..models.config import CONFIG_PATH
+from ..models.events import IssueCommentEvent, PushEvent, WebhookEvent
+from ..settings import get_settings
+
+# Event -> actions the gateway acts on, None for events without actions.
+# Anything else is acknowledged.
+ROUTES: Dict[str, Optional[FrozenSet[str]]] = {
+    "issue_comment": frozenset({"created"}),
+    "pull_request": frozenset({"opened", "reopened", "synchronize"}),
+    # Only to invalidate cached config files
+    "push": None,
+}
+
+# GitHub serialises "action" as the first key of the payload
+_ACTION_PREFIX = re.compile(rb'\A\s*\{\s*"action"\s*:\s*"([a-z_]+)"')
+_SCAN_BYTES = 128
+
+# Pushes that rewrite or delete a branch may change the config without listing it
+_REWRITE = re.compile(rb'"(?:forced|deleted)"\s*:\s*true')
+
+
+def scan_action(body: bytes) -> Optional[str]:
+    """Read the payload ``action`` from the start of the raw body.
+
+    Returns None when the body does not start with an ``action`` key; callers
+    must then fall back to full decoding rather than reject the delivery.
+    """
+    match = _ACTION_PREFIX.match(body[:_SCAN_BYTES])
+    return match.group(1).decode("ascii") if match else None
+
+
+def is_bot_command(comment_body: Optional[str]) -> bool:
+    """Check whether a comment starts with the bot command prefix."""
+    if not comment_body:
+        return False
+    return comment_body.lstrip().startswith(get_settings().bot_command_prefix)
+
+
+def _may_contain_command(body: bytes) -> bool:
+    prefix = get_settings().bot_command_prefix
+    # JSON encoders may escape "/" as "\/"
+    return (
+        prefix.encode("utf-8") in body
+        or prefix.replace("/", "\\/").encode("utf-8") in body
+    )
+
+
+def _may_change_config(body: bytes) -> bool:
+    return CONFIG_PATH.encode("utf-8") in body or _REWRITE.search(body) is not None
+
+
+def ignore_reason(event: Optional[str], body: bytes) -> Optional[str]:
+    """Return why a delivery can be acknowledged without processing.
+
+    Returns None when the delivery has to be decoded and handled.
+    """
+    if event not in ROUTES:
+        return "event"
+    actions = ROUTES[event]
+    if actions is None:
+        if event == "push" and not _may_change_config(body):
+            return "not_a_config_change"
+        return None
+
+    action = scan_action(body)
+    if action is None:
+        return None
+    if action not in actions:
+        return "action"
+
+    if event == "issue_comment" and not _may_contain_command(body):
+        return "not_a_command"
+    return None
+
+
+def should_handle(event: Optional[WebhookEvent]) -> bool:
+    """Check a decoded event against the routing table.
+
+    Catches deliveries the prefix scan could not classify.
+    """
+    if event is None or event.event_name not in ROUTES:
+        return False
+    actions = ROUTES[event.event_name]
+    if actions is not None and event.action not in actions:
+        return False
+    if isinstance(event, IssueCommentEvent):
+        return is_bot_command(event.comment_body)
+    if isinstance(event, PushEvent):
+        return event.config_changed
+    return True
@@ -0,0 +1,78 @@
+"""Share identical in-flight calls.
+
+Callers asking for the same key while a call is running wait for that call
+instead of starting their own. The call runs in its own task, so a caller
+that is cancelled or gives up does not cancel it for the others; it is
+only cancelled once nobody is waiting any more. Each call is bounded by a
+timeout so a stuck upstream request cannot hold its key forever.
+
+The call runs without the first caller's deadline, which would otherwise
+cut it short for callers with more time. Each caller stops waiting at its
+own deadline instead.
+"""
+
+import asyncio
+import contextvars
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from .resilience import time_remaining
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key."""
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"calls": 0, "shared": 0, "timeouts": 0, "abandoned": 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Run ``func`` for the key, or join the call already running."""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(
+                task=asyncio.create_task(
+                    asyncio.wait_for(func(), self.timeout if timeout is None else timeout),
+                    context=contextvars.Context(),
+                )
+            )
+            call.task.add_done_callback(lambda _: self._finish(key, call))
+            self._stats["calls"] += 1
+        else:
+            self._stats["shared"] += 1
+
+        call.waiters += 1
+        try:
+            # Shielded so one caller's cancellation leaves the call running for the rest
+            return await asyncio.wait_for(asyncio.shield(call.task), time_remaining())
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last caller went away: stop the upstream call
+                self._stats["abandoned"] += 1
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # Retrieved here in case every caller was cancelled first
+            call.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters."""
+        return {"in_flight": len(self._calls), **self._stats}
@@ -0,0 +1,241 @@
+"""Installation access token cache.
+
+Installation tokens are valid for an hour. They are cached per installation
+in process, for at most ``max_entries`` installations and until they expire,
+and in Redis, so replicas share them, encrypted at rest with a key derived
+from ``SECRET_KEY``. A token within ``refresh_margin`` seconds of expiry is
+still served while a background refresh replaces it. Concurrent misses for
+one installation share a single exchange in process, and a short Redis lock
+keeps replicas from exchanging in parallel; a replica only releases the
+lock it still holds. Exchanges run without the deadline of the caller that
+started them.
+"""
+
+import asyncio
+import base64
+import contextvars
+import hashlib
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+from cryptography.fernet import Fernet, InvalidToken
+
+from .resilience import time_remaining
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only while it still holds our token: once it expired,
+# another replica may have taken it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class InstallationToken:
+    """An installation access token and its expiry (epoch seconds)."""
+    token: str
+    expires_at: float
+
+
+def fernet_from_secret(secret: str) -> Fernet:
+    """Derive a Fernet cipher from an application secret."""
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest()))
+
+
+class InstallationTokenCache:
+    """Per-installation token cache with proactive refresh and single-flight exchange."""
+
+    def __init__(
+        self,
+        exchange: Callable[[int], Awaitable[InstallationToken]],
+        cipher: Fernet,
+        redis_client: Optional[redis.Redis] = None,
+        refresh_margin: int = 300,
+        lock_timeout: float = 10.0,
+        key_prefix: str = "patchpanda:installation-token:",
+        max_entries: int = 10000,
+    ):
+        self.exchange = exchange
+        self.cipher = cipher
+        self.redis_client = redis_client
+        self.refresh_margin = refresh_margin
+        self.lock_timeout = lock_timeout
+        self.key_prefix = key_prefix
+        self.max_entries = max_entries
+        self._tokens: "OrderedDict[int, InstallationToken]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0, "misses": 0, "redis_hits": 0, "exchanges": 0, "refreshes": 0, "invalidations": 0, "errors": 0,
+        }
+
+    async def get(self, installation_id: int) -> str:
+        """Return a valid token for the installation."""
+        now = time.time()
+        cached = self._tokens.get(installation_id)
+        if cached is not None and cached.expires_at <= now:
+            del self._tokens[installation_id]
+            cached = None
+        if cached is not None:
+            self._tokens.move_to_end(installation_id)
+            self._stats["hits"] += 1
+            if cached.expires_at - now <= self.refresh_margin and installation_id not in self._inflight:
+                self._stats["refreshes"] += 1
+                self._start_fetch(installation_id, refresh=True).add_done_callback(_consume_exception)
+            return cached.token
+
+        self._stats["misses"] += 1
+        future = self._inflight.get(installation_id) or self._start_fetch(installation_id)
+        # Shielded so one cancelled caller does not cancel the shared exchange;
+        # each caller waits until its own deadline at most
+        return (await asyncio.wait_for(asyncio.shield(future), time_remaining())).token
+
+    async def invalidate(self, installation_id: int, rejected: Optional[str] = None) -> None:
+        """Forget a token GitHub rejected, in process and in Redis.
+
+        With ``rejected``, a newer token another replica already stored is
+        kept.
+        """
+        self._stats["invalidations"] += 1
+        cached = self._tokens.get(installation_id)
+        if cached is not None and (rejected is None or cached.token == rejected):
+            del self._tokens[installation_id]
+        if self.redis_client is None:
+            return
+        if rejected is not None:
+            stored = await self._load(installation_id, min_ttl=0)
+            if stored is not None and stored.token != rejected:
+                return
+        try:
+            await self.redis_client.delete(f"{self.key_prefix}{installation_id}")
+        except Exception:
+            logger.warning("Installation token cache unavailable", exc_info=True)
+
+    def _start_fetch(self, installation_id: int, refresh: bool = False) -> asyncio.Future:
+        # Fresh context: the exchange is shared and must not inherit one caller's deadline
+        future = asyncio.create_task(self._fetch(installation_id, refresh), context=contextvars.Context())
+        self._inflight[installation_id] = future
+        future.add_done_callback(lambda _: self._inflight.pop(installation_id, None))
+        future.add_done_callback(_mark_retrieved)
+        return future
+
+    async def _fetch(self, installation_id: int, refresh: bool) -> InstallationToken:
+        try:
+            token = None if refresh else await self._load(installation_id)
+            if token is None:
+                token = await self._exchange_locked(installation_id, refresh)
+            self._remember(installation_id, token)
+            return token
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    def _remember(self, installation_id: int, token: InstallationToken) -> None:
+        self._tokens[installation_id] = token
+        self._tokens.move_to_end(installation_id)
+        now = time.time()
+        # Least recently used first: drop expired tokens there, then any over the bound
+        while self._tokens and (
+            len(self._tokens) > self.max_entries or next(iter(self._tokens.values())).expires_at <= now
+        ):
+            self._tokens.popitem(last=False)
+
+    async def _exchange_locked(self, installation_id: int, refresh: bool) -> InstallationToken:
+        """Exchange a token, letting only one replica do so at a time."""
+        if self.redis_client is None:
+            return await self._exchange(installation_id)
+
+        lock_key = f"{self.key_prefix}{installation_id}:lock"
+        lock_token = secrets.token_hex(16)
+        try:
+            locked = await self.redis_client.set(lock_key, lock_token, nx=True, px=int(self.lock_timeout * 1000))
+        except Exception:
+            logger.warning("Installation token lock unavailable", exc_info=True)
+            return await self._exchange(installation_id)
+
+        if not locked:
+            # Another replica is exchanging; pick up its token
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                token = await self._load(installation_id, min_ttl=0 if refresh else self.refresh_margin)
+                if token is not None and (not refresh or token != self._tokens.get(installation_id)):
+                    return token
+            return await self._exchange(installation_id)
+
+        try:
+            return await self._exchange(installation_id)
+        finally:
+            try:
+                await self.redis_client.eval(_RELEASE_LOCK, 1, lock_key, lock_token)
+            except Exception:
+                logger.warning("Failed to release installation token lock", exc_info=True)
+
+    async def _exchange(self, installation_id: int) -> InstallationToken:
+        self._stats["exchanges"] += 1
+        token = await self.exchange(installation_id)
+        await self._store(installation_id, token)
+        return token
+
+    async def _load(self, installation_id: int, min_ttl: Optional[int] = None) -> Optional[InstallationToken]:
+        if self.redis_client is None:
+            return None
+        try:
+            value = await self.redis_client.get(f"{self.key_prefix}{installation_id}")
+        except Exception:
+            logger.warning("Installation token cache unavailable", exc_info=True)
+            return None
+        if value is None:
+            return None
+        try:
+            data = json.loads(self.cipher.decrypt(value))
+            token = InstallationToken(token=data["token"], expires_at=float(data["expires_at"]))
+        except (InvalidToken, ValueError, KeyError, TypeError):
+            # Written with another key (e.g. rotated SECRET_KEY) or corrupt
+            return None
+        if token.expires_at - time.time() <= (self.refresh_margin if min_ttl is None else min_ttl):
+            return None
+        self._stats["redis_hits"] += 1
+        return token
+
+    async def _store(self, installation_id: int, token: InstallationToken) -> None:
+        if self.redis_client is None:
+            return
+        ttl = int(token.expires_at - time.time())
+        if ttl <= 0:
+            return
+        value = self.cipher.encrypt(json.dumps({"token": token.token, "expires_at": token.expires_at}).encode("utf-8"))
+        try:
+            await self.redis_client.set(f"{self.key_prefix}{installation_id}", value, ex=ttl)
+        except Exception:
+            logger.warning("Installation token cache unavailable", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters."""
+        return {
+            "installations": len(self._tokens),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._inflight),
+            **self._stats,
+        }
+
+
+def _mark_retrieved(future: asyncio.Future) -> None:
+    # Callers that were cancelled while waiting never see the exception
+    if not future.cancelled():
+        future.exception()
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Background refresh failures are counted; the current token stays in use
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Installation token refresh failed", exc_info=future.exception())
@@ -47,6 +47,10 @@ class Settings(BaseSettings):
     # GitHub App
     github_app_id: str = Field(default="", json_schema_extra={"env": "GITHUB_APP_ID"})
     github_app_private_key: str = Field(default="", json_schema_extra={"env": "GITHUB_APP_PRIVATE_KEY"})
+    github_api_url: str = Field(default="https://api.github.com", json_schema_extra={"env": "GITHUB_API_URL"})
+    app_jwt_refresh_margin: int = Field(default=60, json_schema_extra={"env": "APP_JWT_REFRESH_MARGIN"})
+    installation_token_refresh_margin: int = Field(default=300, json_schema_extra={"env": "INSTALLATION_TOKEN_REFRESH_MARGIN"})
+    installation_token_cache_max_entries: int = Field(default=10000, json_schema_extra={"env": "INSTALLATION_TOKEN_CACHE_MAX_ENTRIES"})
     github_webhook_secret: str = Field(default="", json_schema_extra={"env": "GITHUB_WEBHOOK_SECRET"})
 
     # Development
@@ -56,10 +60,112 @@ class Settings(BaseSettings):
     queue_backend: str = Field(default="redis", json_schema_extra={"env": "QUEUE_BACKEND"})
     sqs_queue_url: str = Field(default="", json_schema_extra={"env": "SQS_QUEUE_URL"})
 
+    # Bot commands (issue comments starting with this prefix)
+    bot_command_prefix: str = Field(default="/patchpanda", json_schema_extra={"env": "BOT_COMMAND_PREFIX"})
+
+    # Webhook body size limit (GitHub caps deliveries at 25 MB)
+    webhook_max_body_bytes: int = Field(default=25 * 1024 * 1024, json_schema_extra={"env": "WEBHOOK_MAX_BODY_BYTES"})
+
+    # Webhook GitHub API deadline in seconds (GitHub gives up after 10, 0 disables)
+    webhook_deadline: float = Field(default=9.0, json_schema_extra={"env": "WEBHOOK_DEADLINE"})
+
+    # Webhook payload decoding (auto, orjson, msgspec or json)
+    json_decoder: str = Field(default="auto", json_schema_extra={"env": "JSON_DECODER"})
+
+    # Webhook inbox
+    webhook_inbox_enabled: bool = Field(default=False, json_schema_extra={"env": "WEBHOOK_INBOX_ENABLED"})
+    webhook_inbox_workers: int = Field(default=4, json_schema_extra={"env": "WEBHOOK_INBOX_WORKERS"})
+    webhook_inbox_poll_interval: float = Field(default=1.0, json_schema_extra={"env": "WEBHOOK_INBOX_POLL_INTERVAL"})
+    webhook_inbox_max_attempts: int = Field(default=5, json_schema_extra={"env": "WEBHOOK_INBOX_MAX_ATTEMPTS"})
+    webhook_inbox_retry_backoff: float = Field(default=5.0, json_schema_extra={"env": "WEBHOOK_INBOX_RETRY_BACKOFF"})
+    webhook_inbox_retry_backoff_max: float = Field(default=300.0, json_schema_extra={"env": "WEBHOOK_INBOX_RETRY_BACKOFF_MAX"})
+    webhook_inbox_visibility_timeout: int = Field(default=300, json_schema_extra={"env": "WEBHOOK_INBOX_VISIBILITY_TIMEOUT"})
+
+    # Webhook delivery deduplication
+    webhook_dedup_enabled: bool = Field(default=True, json_schema_extra={"env": "WEBHOOK_DEDUP_ENABLED"})
+    webhook_dedup_max_entries: int = Field(default=10000, json_schema_extra={"env": "WEBHOOK_DEDUP_MAX_ENTRIES"})
+    webhook_dedup_ttl: int = Field(default=86400, json_schema_extra={"env": "WEBHOOK_DEDUP_TTL"})
+
+    # Webhook admission control
+    webhook_admission_enabled: bool = Field(default=True, json_schema_extra={"env": "WEBHOOK_ADMISSION_ENABLED"})
+    webhook_max_in_flight: int = Field(default=64, json_schema_extra={"env": "WEBHOOK_MAX_IN_FLIGHT"})
+    webhook_low_priority_share: float = Field(default=0.75, json_schema_extra={"env": "WEBHOOK_LOW_PRIORITY_SHARE"})
+    webhook_admission_queue_timeout: float = Field(default=2.0, json_schema_extra={"env": "WEBHOOK_ADMISSION_QUEUE_TIMEOUT"})
+    webhook_shed_retry_after: int = Field(default=5, json_schema_extra={"env": "WEBHOOK_SHED_RETRY_AFTER"})
+    webhook_installation_rate: float = Field(default=10.0, json_schema_extra={"env": "WEBHOOK_INSTALLATION_RATE"})
+    webhook_installation_burst: int = Field(default=50, json_schema_extra={"env": "WEBHOOK_INSTALLATION_BURST"})
+
+    # Pull request push coalescing (seconds, 0 disables)
+    pr_coalesce_window: float = Field(default=5.0, json_schema_extra={"env": "PR_COALESCE_WINDOW"})
+    pr_coalesce_max_delay: float = Field(default=30.0, json_schema_extra={"env": "PR_COALESCE_MAX_DELAY"})
+
+    # Pull request change filter: skip test generation when no changed file matches the config patterns
+    pr_change_filter_enabled: bool = Field(default=True, json_schema_extra={"env": "PR_CHANGE_FILTER_ENABLED"})
+    pr_change_filter_neutral_check: bool = Field(default=True, json_schema_extra={"env": "PR_CHANGE_FILTER_NEUTRAL_CHECK"})
+    pr_changed_files_max_entries: int = Field(default=1000, json_schema_extra={"env": "PR_CHANGED_FILES_MAX_ENTRIES"})
+    pr_changed_files_max_files: int = Field(default=3000, json_schema_extra={"env": "PR_CHANGED_FILES_MAX_FILES"})
+
+    # Pull request prefetch: warm token, head and effective config for bot commands (seconds)
+    pr_prefetch_enabled: bool = Field(default=True, json_schema_extra={"env": "PR_PREFETCH_ENABLED"})
+    pr_prefetch_concurrency: int = Field(default=4, json_schema_extra={"env": "PR_PREFETCH_CONCURRENCY"})
+    pr_prefetch_max_pending: int = Field(default=100, json_schema_extra={"env": "PR_PREFETCH_MAX_PENDING"})
+    pr_prefetch_timeout: float = Field(default=10.0, json_schema_extra={"env": "PR_PREFETCH_TIMEOUT"})
+    pr_prefetch_head_ttl: float = Field(default=3600.0, json_schema_extra={"env": "PR_PREFETCH_HEAD_TTL"})
+
+    # GitHub API HTTP client (shared connection pool, seconds for timeouts)
+    github_http2: bool = Field(default=True, json_schema_extra={"env": "GITHUB_HTTP2"})
+    github_http_max_connections: int = Field(default=100, json_schema_extra={"env": "GITHUB_HTTP_MAX_CONNECTIONS"})
+    github_http_max_keepalive: int = Field(default=20, json_schema_extra={"env": "GITHUB_HTTP_MAX_KEEPALIVE"})
+    github_http_keepalive_expiry: float = Field(default=30.0, json_schema_extra={"env": "GITHUB_HTTP_KEEPALIVE_EXPIRY"})
+    github_http_timeout: float = Field(default=10.0, json_schema_extra={"env": "GITHUB_HTTP_TIMEOUT"})
+    github_http_connect_timeout: float = Field(default=5.0, json_schema_extra={"env": "GITHUB_HTTP_CONNECT_TIMEOUT"})
+    github_http_pool_timeout: float = Field(default=5.0, json_schema_extra={"env": "GITHUB_HTTP_POOL_TIMEOUT"})
+
+    # GitHub API rate limits (share of each budget kept for higher priorities, seconds)
+    github_rate_limit_normal_reserve: float = Field(default=0.05, json_schema_extra={"env": "GITHUB_RATE_LIMIT_NORMAL_RESERVE"})
+    github_rate_limit_background_reserve: float = Field(default=0.2, json_schema_extra={"env": "GITHUB_RATE_LIMIT_BACKGROUND_RESERVE"})
+    github_rate_limit_max_wait: float = Field(default=60.0, json_schema_extra={"env": "GITHUB_RATE_LIMIT_MAX_WAIT"})
+    github_rate_limit_retries: int = Field(default=2, json_schema_extra={"env": "GITHUB_RATE_LIMIT_RETRIES"})
+
+    # GitHub API conditional-request (ETag) cache
+    github_etag_cache_enabled: bool = Field(default=True, json_schema_extra={"env": "GITHUB_ETAG_CACHE_ENABLED"})
+    github_etag_cache_max_bytes: int = Field(default=32 * 1024 * 1024, json_schema_extra={"env": "GITHUB_ETAG_CACHE_MAX_BYTES"})
+    github_etag_cache_redis: bool = Field(default=False, json_schema_extra={"env": "GITHUB_ETAG_CACHE_REDIS"})
+    github_etag_cache_ttl: int = Field(default=86400, json_schema_extra={"env": "GITHUB_ETAG_CACHE_TTL"})
+
+    # GitHub API in-flight GET sharing (seconds before a shared call times out)
+    github_singleflight_enabled: bool = Field(default=True, json_schema_extra={"env": "GITHUB_SINGLEFLIGHT_ENABLED"})
+    github_singleflight_timeout: float = Field(default=30.0, json_schema_extra={"env": "GITHUB_SINGLEFLIGHT_TIMEOUT"})
+
+    # GitHub API adaptive concurrency limit and per-endpoint circuit breakers
+    github_call_guard_enabled: bool = Field(default=True, json_schema_extra={"env": "GITHUB_CALL_GUARD_ENABLED"})
+    github_concurrency_initial: int = Field(default=20, json_schema_extra={"env": "GITHUB_CONCURRENCY_INITIAL"})
+    github_concurrency_min: int = Field(default=2, json_schema_extra={"env": "GITHUB_CONCURRENCY_MIN"})
+    github_concurrency_max: int = Field(default=200, json_schema_extra={"env": "GITHUB_CONCURRENCY_MAX"})
+    github_concurrency_backoff: float = Field(default=0.75, json_schema_extra={"env": "GITHUB_CONCURRENCY_BACKOFF"})
+    github_concurrency_latency_tolerance: float = Field(default=2.0, json_schema_extra={"env": "GITHUB_CONCURRENCY_LATENCY_TOLERANCE"})
+    github_concurrency_max_wait: float = Field(default=10.0, json_schema_extra={"env": "GITHUB_CONCURRENCY_MAX_WAIT"})
+    github_circuit_failure_threshold: int = Field(default=5, json_schema_extra={"env": "GITHUB_CIRCUIT_FAILURE_THRESHOLD"})
+    github_circuit_reset_timeout: float = Field(default=30.0, json_schema_extra={"env": "GITHUB_CIRCUIT_RESET_TIMEOUT"})
+
+    # .testbot.yml cache: parsed configs by blob SHA, refs resolved to blob SHAs (shared through Redis)
+    config_cache_enabled: bool = Field(default=True, json_schema_extra={"env": "CONFIG_CACHE_ENABLED"})
+    config_cache_max_entries: int = Field(default=10000, json_schema_extra={"env": "CONFIG_CACHE_MAX_ENTRIES"})
+    config_cache_redis: bool = Field(default=True, json_schema_extra={"env": "CONFIG_CACHE_REDIS"})
+    config_cache_ttl: int = Field(default=86400, json_schema_extra={"env": "CONFIG_CACHE_TTL"})
+    config_cache_ref_ttl: int = Field(default=3600, json_schema_extra={"env": "CONFIG_CACHE_REF_TTL"})
+    config_cache_negative_ttl: int = Field(default=600, json_schema_extra={"env": "CONFIG_CACHE_NEGATIVE_TTL"})
+
+    # Effective config: defaults, billing project, binding and .testbot.yml merged per ref
+    effective_config_max_entries: int = Field(default=10000, json_schema_extra={"env": "EFFECTIVE_CONFIG_MAX_ENTRIES"})
+    effective_config_ttl: float = Field(default=300.0, json_schema_extra={"env": "EFFECTIVE_CONFIG_TTL"})
+
     # Security
     secret_key: str = Field(default="dev-secret-key-change-in-production", json_schema_extra={"env": "SECRET_KEY"})
     algorithm: str = Field(default="HS256", json_schema_extra={"env": "ALGORITHM"})
     access_token_expire_minutes: int = Field(default=30, json_schema_extra={"env": "ACCESS_TOKEN_EXPIRE_MINUTES"})
+    # Bearer token for the internal metrics endpoints; unset disables them
+    metrics_token: str = Field(default="", json_schema_extra={"env": "METRICS_TOKEN"})
 
     # OIDC
     oidc_issuer_url: str = Field(default="", json_schema_extra={"env": "OIDC_ISSUER_URL"})
@@ -0,0 +1,139 @@
+"""Test webhook admission control."""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+
+from patchpanda.gateway.services.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Priority,
+    TokenBucket,
+    classify,
+    scan_installation_id,
+)
+
+
+def _body(payload):
+    return json.dumps(payload).encode()
+
+
+class TestClassify:
+    """Test priority classification from raw bodies."""
+
+    def test_bot_command(self):
+        """Test comments carrying a command get the top priority."""
+        body = _body({"action": "created", "comment": {"body": "/patchpanda generate"}})
+        assert classify("issue_comment", body) == Priority.COMMAND
+
+    def test_pull_request_updates(self):
+        """Test opened and synchronize come before other actions."""
+        assert classify("pull_request", _body({"action": "opened"})) == Priority.PULL_REQUEST
+        assert classify("pull_request", _body({"action": "synchronize"})) == Priority.PULL_REQUEST
+        assert classify("pull_request", _body({"action": "closed"})) == Priority.OTHER
+        assert classify("issue_comment", _body({"action": "created", "comment": {"body": "LGTM"}})) == Priority.OTHER
+
+    def test_installation_id(self):
+        """Test the installation id is found anywhere in the body."""
+        body = _body({"action": "opened", "repository": {"id": 1}, "installation": {"id": 12345, "node_id": "x"}})
+        assert scan_installation_id(body) == 12345
+        assert scan_installation_id(_body({"action": "opened"})) is None
+
+
+class TestTokenBucket:
+    """Test the per-installation token bucket."""
+
+    def test_burst_then_refill(self):
+        """Test the burst is spent and refilled at the configured rate."""
+        with patch("patchpanda.gateway.services.admission.time.monotonic", return_value=100.0) as clock:
+            bucket = TokenBucket(rate=2.0, burst=2)
+            assert bucket.try_take()
+            assert bucket.try_take()
+            assert not bucket.try_take()
+            assert bucket.retry_after() == 1
+
+            clock.return_value = 100.5
+            assert bucket.try_take()
+            assert not bucket.try_take()
+
+
+class TestAdmissionController:
+    """Test in-flight limits, priorities and shedding."""
+
+    @pytest.mark.asyncio
+    async def test_low_priority_shed_when_saturated(self):
+        """Test low-priority deliveries are shed once their share is used."""
+        controller = AdmissionController(max_in_flight=4, low_priority_share=0.5, retry_after=7)
+
+        await controller.acquire(Priority.OTHER)
+        await controller.acquire(Priority.OTHER)
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(Priority.OTHER)
+        assert exc.value.reason == "saturated"
+        assert exc.value.retry_after == 7
+
+        # Headroom is left for higher priorities
+        await controller.acquire(Priority.PULL_REQUEST)
+        await controller.acquire(Priority.COMMAND)
+        assert controller.stats()["in_flight"] == 4
+        assert controller.stats()["shed"]["saturated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_by_priority(self):
+        """Test a freed slot goes to the highest-priority waiter."""
+        controller = AdmissionController(max_in_flight=1, queue_timeout=1.0)
+        await controller.acquire(Priority.COMMAND)
+        order = []
+
+        async def wait(priority):
+            async with controller.admit(priority):
+                order.append(priority)
+
+        waiters = [
+            asyncio.create_task(wait(Priority.PULL_REQUEST)),
+            asyncio.create_task(wait(Priority.COMMAND)),
+        ]
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 2
+
+        controller.release()
+        await asyncio.gather(*waiters)
+
+        assert order == [Priority.COMMAND, Priority.PULL_REQUEST]
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Test waiting deliveries are shed after the queue timeout."""
+        controller = AdmissionController(max_in_flight=1, queue_timeout=0.01)
+        await controller.acquire(Priority.COMMAND)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(Priority.PULL_REQUEST)
+        assert exc.value.reason == "queue_timeout"
+
+        # The expired waiter does not consume the released slot
+        controller.release()
+        assert controller.stats()["in_flight"] == 0
+        assert controller.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_noisy_installation_rate_limited(self):
+        """Test one installation's burst does not block others."""
+        controller = AdmissionController(installation_rate=0.5, installation_burst=2)
+
+        for _ in range(2):
+            async with controller.admit(Priority.OTHER, installation_id=1):
+                pass
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(Priority.OTHER, installation_id=1)
+        assert exc.value.reason == "rate_limited"
+        assert exc.value.retry_after == 2
+
+        async with controller.admit(Priority.OTHER, installation_id=2):
+            pass
+        stats = controller.stats()
+        assert stats["admitted"]["other"] == 3
+        assert stats["shed"]["rate_limited"] == 1
+        assert stats["installations"] == 2
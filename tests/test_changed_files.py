@@ -0,0 +1,111 @@
+"""Test the pull request changed-file cache and relevance check."""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from patchpanda.gateway.services.changed_files import ChangedFiles, ChangedFilesCache, is_relevant
+from patchpanda.gateway.services.effective_config import EffectiveConfig
+from patchpanda.gateway.services.graphql import ChangedFile
+
+HEAD = "a" * 40
+BASE = "b" * 40
+
+
+def github_app(paths, delay=0.0):
+    """GitHub App service streaming the given changed files."""
+    calls = []
+
+    async def iter_pull_request_files(owner, repo, pr_number, installation_id, priority=None, head_sha=None):
+        calls.append((owner, repo, pr_number, head_sha))
+        for path in paths:
+            await asyncio.sleep(delay)
+            yield ChangedFile(path=path, additions=1, deletions=0, change_type="MODIFIED")
+
+    return Mock(iter_pull_request_files=iter_pull_request_files, calls=calls)
+
+
+def config(**patterns):
+    """An effective config with the given patterns."""
+    return EffectiveConfig(**patterns, version="-|-")
+
+
+class TestChangedFilesCache:
+    """Test streaming and caching by head SHA."""
+
+    @pytest.mark.asyncio
+    async def test_cached_per_head_sha(self):
+        """Test a head SHA is fetched once and a new one is fetched again."""
+        service = github_app(["src/app.py", "README.md"])
+        cache = ChangedFilesCache(service)
+
+        first = await cache.get("Octo", "repo", 7, HEAD, BASE, 1)
+        again = await cache.get("octo", "repo", 7, HEAD, BASE, 1)
+        await cache.get("octo", "repo", 7, "c" * 40, BASE, 1)
+
+        assert first == ChangedFiles(("src/app.py", "README.md"))
+        assert again is first
+        assert [call[3] for call in service.calls] == [HEAD, "c" * 40]
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_fetch(self):
+        """Test deliveries for the same push share one stream."""
+        service = github_app(["src/app.py"], delay=0.01)
+        cache = ChangedFilesCache(service)
+
+        results = await asyncio.gather(*(cache.get("octo", "repo", 7, HEAD, BASE, 1) for _ in range(3)))
+
+        assert results[0] == results[1] == results[2]
+        assert len(service.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_truncated(self):
+        """Test large pull requests stop at max_files and are marked incomplete."""
+        cache = ChangedFilesCache(github_app([f"f{i}.py" for i in range(5)]), max_files=3)
+
+        changed = await cache.get("octo", "repo", 7, HEAD, BASE, 1)
+
+        assert changed.paths == ("f0.py", "f1.py", "f2.py")
+        assert not changed.complete
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self):
+        """Test a failed fetch is retried on the next lookup."""
+        files = github_app(["a.py"]).iter_pull_request_files("octo", "repo", 7, 1)
+        service = Mock(iter_pull_request_files=Mock(side_effect=[RuntimeError("boom"), files]))
+        cache = ChangedFilesCache(service)
+
+        with pytest.raises(RuntimeError):
+            await cache.get("octo", "repo", 7, HEAD, BASE, 1)
+        changed = await cache.get("octo", "repo", 7, HEAD, BASE, 1)
+
+        assert changed.paths == ("a.py",)
+        assert cache.stats()["errors"] == 1
+
+
+class TestIsRelevant:
+    """Test the relevance check."""
+
+    def test_excluded_files_not_relevant(self):
+        """Test a change touching only excluded paths is not relevant."""
+        effective = config(exclude_patterns=("docs/*", "*.md", "*.lock"))
+
+        assert not is_relevant(ChangedFiles(("docs/index.md", "README.md", "poetry.lock")), effective)
+        assert is_relevant(ChangedFiles(("README.md", "src/app.py")), effective)
+
+    def test_include_patterns(self):
+        """Test only included paths are relevant."""
+        effective = config(include_patterns=("src/*",))
+
+        assert not is_relevant(ChangedFiles(("tests/test_app.py",)), effective)
+        assert is_relevant(ChangedFiles(("src/app.py",)), effective)
+
+    def test_config_change_relevant(self):
+        """Test changing the config file counts as a relevant change."""
+        assert is_relevant(ChangedFiles((".testbot.yml",)), config(include_patterns=("src/*",)))
+
+    def test_incomplete_list_relevant(self):
+        """Test a truncated list always counts as relevant."""
+        assert is_relevant(ChangedFiles(("docs/a.md",), complete=False), config(exclude_patterns=("docs/*",)))
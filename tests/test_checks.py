@@ -0,0 +1,80 @@
+"""Test Check Run and comment calls."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from patchpanda.gateway.services.checks import CheckConclusion, CheckStatus, ChecksService
+from patchpanda.gateway.services.rate_limit import RequestPriority
+
+
+@pytest.fixture
+def github_app():
+    """GitHub App service with a mocked API request."""
+    return Mock(make_github_request=AsyncMock(return_value={"id": 42}))
+
+
+class TestChecksService:
+    """Test the GitHub API calls made by ChecksService."""
+
+    @pytest.mark.asyncio
+    async def test_create_check_run(self, github_app):
+        """Test check runs are created for the head SHA."""
+        check_run_id = await ChecksService(github_app).create_test_generation_check("octo", "repo", "abc123", 1)
+
+        assert check_run_id == "42"
+        method, endpoint, installation_id = github_app.make_github_request.call_args.args
+        payload = github_app.make_github_request.call_args.kwargs["json"]
+        assert (method, endpoint, installation_id) == ("POST", "/repos/octo/repo/check-runs", 1)
+        assert payload["head_sha"] == "abc123"
+        assert payload["status"] == "queued"
+        assert payload["external_id"] == "test_generation"
+        assert "priority" not in payload
+
+    @pytest.mark.asyncio
+    async def test_command_check_run_priority(self, github_app):
+        """Test check runs for user commands are sent as interactive requests."""
+        await ChecksService(github_app).create_test_generation_check(
+            "octo", "repo", "abc123", 1, priority=RequestPriority.INTERACTIVE
+        )
+
+        assert github_app.make_github_request.call_args.kwargs["priority"] == RequestPriority.INTERACTIVE
+
+    @pytest.mark.asyncio
+    async def test_skipped_check_run(self, github_app):
+        """Test skipped pushes get a completed, neutral check run."""
+        await ChecksService(github_app).create_skipped_test_generation_check("octo", "repo", "abc123", 1, "Docs only")
+
+        payload = github_app.make_github_request.call_args.kwargs["json"]
+        assert payload["status"] == "completed"
+        assert payload["conclusion"] == "neutral"
+        assert payload["output"] == {"title": "No relevant changes", "summary": "Docs only"}
+
+    @pytest.mark.asyncio
+    async def test_update_check_run(self, github_app):
+        """Test updates send only the fields that are set."""
+        await ChecksService(github_app).update_test_generation_check(
+            "octo", "repo", "42", 1, status=CheckStatus.COMPLETED, conclusion=CheckConclusion.SUCCESS
+        )
+
+        github_app.make_github_request.assert_awaited_once_with(
+            "PATCH",
+            "/repos/octo/repo/check-runs/42",
+            1,
+            priority=RequestPriority.NORMAL,
+            json={"status": "completed", "conclusion": "success"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_comments(self, github_app):
+        """Test PR comments are created and edited."""
+        service = ChecksService(github_app)
+
+        assert await service.create_comment("octo", "repo", 7, "Queued", 1) == "42"
+        assert await service.update_comment("octo", "repo", "42", "Done", 1) is True
+
+        github_app.make_github_request.assert_any_await(
+            "POST", "/repos/octo/repo/issues/7/comments", 1, priority=RequestPriority.NORMAL, json={"body": "Queued"}
+        )
+        github_app.make_github_request.assert_any_await(
+            "PATCH", "/repos/octo/repo/issues/comments/42", 1, json={"body": "Done"}
+        )
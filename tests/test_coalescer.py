@@ -0,0 +1,201 @@
+"""Test pull request push coalescing."""
+
+import asyncio
+import uuid
+import pytest
+from unittest.mock import AsyncMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from patchpanda.gateway.db.tables import Job
+from patchpanda.gateway.models.events import PullRequestEvent
+from patchpanda.gateway.models.jobs import JobStatus, JobType
+from patchpanda.gateway.services.coalescer import PullRequestCoalescer
+from patchpanda.gateway.services.effective_config import ConfigUnavailable
+
+
+def push(head_sha, number=42, installation_id=1, head_repo="test-user/test-repo"):
+    """A synchronize event for test-user/test-repo."""
+    return PullRequestEvent(
+        action="synchronize",
+        installation_id=installation_id,
+        owner="test-user",
+        repo="test-repo",
+        number=number,
+        head_sha=head_sha,
+        head_ref="feature",
+        head_repo=head_repo,
+    )
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """SQLite session factory with the jobs table."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Job.__table__.create(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def add_job(session_factory, sha, status=JobStatus.QUEUED, number=42, head_repository="test-user/test-repo"):
+    """Insert a test generation job and return its id."""
+    job_id = str(uuid.uuid4())
+    with session_factory() as session:
+        session.add(Job(
+            id=job_id,
+            project_id="project",
+            repository="test-repo",
+            owner="test-user",
+            commit_sha=sha,
+            branch="feature",
+            pr_number=number,
+            head_repository=head_repository,
+            job_type=JobType.TEST_GENERATION.value,
+            status=status.value,
+        ))
+        session.commit()
+    return job_id
+
+
+def job_status(session_factory, job_id):
+    """Current status of a job."""
+    with session_factory() as session:
+        return session.get(Job, job_id).status
+
+
+class TestPullRequestCoalescer:
+    """Test the per-PR debounce window."""
+
+    @pytest.mark.asyncio
+    async def test_burst_submits_latest_sha(self):
+        """Test a burst of pushes is submitted once with the last head SHA."""
+        submit = AsyncMock()
+        coalescer = PullRequestCoalescer(submit, window=0.05)
+
+        assert coalescer.offer(push("a" * 40)) is False
+        assert coalescer.offer(push("b" * 40)) is True
+        assert coalescer.offer(push("c" * 40)) is True
+        submit.assert_not_called()
+
+        await asyncio.sleep(0.15)
+
+        submit.assert_awaited_once_with(push("c" * 40))
+        assert coalescer.stats() == {
+            "pending": 0, "received": 3, "coalesced": 2, "submitted": 1, "cancelled_jobs": 0, "errors": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_pull_requests_are_independent(self):
+        """Test pushes to different PRs and installations do not coalesce."""
+        submit = AsyncMock()
+        coalescer = PullRequestCoalescer(submit, window=0.05)
+
+        coalescer.offer(push("a" * 40, number=1))
+        coalescer.offer(push("b" * 40, number=2))
+        coalescer.offer(push("c" * 40, number=1, installation_id=2))
+        await asyncio.sleep(0.15)
+
+        assert submit.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_max_delay(self):
+        """Test a PR that keeps receiving pushes is still submitted."""
+        submit = AsyncMock()
+        coalescer = PullRequestCoalescer(submit, window=0.05, max_delay=0.1)
+
+        for i in range(8):
+            coalescer.offer(push(str(i) * 40))
+            await asyncio.sleep(0.03)
+
+        assert submit.await_count >= 1
+
+    @pytest.mark.asyncio
+    async def test_cancels_superseded_jobs(self, session_factory):
+        """Test queued jobs for older SHAs of the PR are cancelled."""
+        old = add_job(session_factory, "a" * 40)
+        running = add_job(session_factory, "b" * 40, status=JobStatus.RUNNING)
+        current = add_job(session_factory, "c" * 40)
+        other_pr = add_job(session_factory, "d" * 40, number=7)
+
+        submit = AsyncMock()
+        coalescer = PullRequestCoalescer(submit, window=0.01, session_factory=session_factory)
+        coalescer.offer(push("c" * 40))
+        await asyncio.sleep(0.1)
+
+        assert job_status(session_factory, old) == JobStatus.CANCELLED.value
+        assert job_status(session_factory, running) == JobStatus.RUNNING.value
+        assert job_status(session_factory, current) == JobStatus.QUEUED.value
+        assert job_status(session_factory, other_pr) == JobStatus.QUEUED.value
+        assert coalescer.stats()["cancelled_jobs"] == 1
+        submit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fork_prs_sharing_branch_name(self, session_factory):
+        """Test a push to one fork PR leaves another PR with the same head branch name alone."""
+        first_fork = add_job(session_factory, "a" * 40, number=1, head_repository="alice/test-repo")
+        second_fork = add_job(session_factory, "b" * 40, number=2, head_repository="bob/test-repo")
+
+        coalescer = PullRequestCoalescer(AsyncMock(), window=0.01, session_factory=session_factory)
+        coalescer.offer(push("c" * 40, number=1, head_repo="alice/test-repo"))
+        await asyncio.sleep(0.1)
+
+        assert job_status(session_factory, first_fork) == JobStatus.CANCELLED.value
+        assert job_status(session_factory, second_fork) == JobStatus.QUEUED.value
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self):
+        """Test shutdown submits pending pushes instead of dropping them."""
+        submit = AsyncMock()
+        coalescer = PullRequestCoalescer(submit, window=60)
+        coalescer.offer(push("a" * 40))
+        coalescer.offer(push("b" * 40))
+
+        await coalescer.stop()
+
+        submit.assert_awaited_once_with(push("b" * 40))
+        assert coalescer.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_error_is_counted(self):
+        """Test a failing submit does not break the coalescer."""
+        submit = AsyncMock(side_effect=RuntimeError("boom"))
+        coalescer = PullRequestCoalescer(submit, window=0.01)
+        coalescer.offer(push("a" * 40))
+        await asyncio.sleep(0.05)
+
+        assert coalescer.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_settled_when_submitted(self):
+        """Test a waiting delivery returns once its push is submitted or superseded."""
+        submit = AsyncMock()
+        coalescer = PullRequestCoalescer(submit, window=0.05)
+
+        results = await asyncio.gather(
+            coalescer.offer_and_wait(push("a" * 40)),
+            coalescer.offer_and_wait(push("b" * 40)),
+        )
+
+        assert results == [False, True]
+        submit.assert_awaited_once_with(push("b" * 40))
+
+    @pytest.mark.asyncio
+    async def test_submit_error_raised_to_waiter(self):
+        """Test a failed flush fails the waiting delivery so it can be retried."""
+        submit = AsyncMock(side_effect=ConfigUnavailable("boom"))
+        coalescer = PullRequestCoalescer(submit, window=0.01)
+
+        with pytest.raises(ConfigUnavailable):
+            await coalescer.offer_and_wait(push("a" * 40))
+
+        assert coalescer.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_settles_waiters(self):
+        """Test shutdown submits pending pushes and releases their deliveries."""
+        coalescer = PullRequestCoalescer(AsyncMock(), window=60)
+        waiting = asyncio.create_task(coalescer.offer_and_wait(push("a" * 40)))
+        await asyncio.sleep(0)
+
+        await coalescer.stop()
+
+        assert await waiting is True
@@ -0,0 +1,44 @@
+"""Test webhook payload decoding."""
+
+import pytest
+
+from patchpanda.gateway.codec import DECODERS, PayloadDecodeError, get_decoder, loads
+
+
+class TestDecoders:
+    """Test the pluggable JSON decoders."""
+
+    @pytest.mark.parametrize("name", sorted(DECODERS))
+    def test_decoders_accept_buffers(self, name):
+        """Test every installed decoder reads bytes, bytearray and memoryview."""
+        _, decode = get_decoder(name)
+        body = b'{"action": "opened", "number": 42}'
+
+        for buffer in (body, bytearray(body), memoryview(body)):
+            assert decode(buffer) == {"action": "opened", "number": 42}
+
+    @pytest.mark.parametrize("name", sorted(DECODERS))
+    def test_decoders_raise_payload_decode_error(self, name):
+        """Test invalid JSON raises a single error type for every decoder."""
+        _, decode = get_decoder(name)
+
+        with pytest.raises(PayloadDecodeError):
+            decode(b"invalid json")
+
+    def test_unknown_decoder_falls_back_to_stdlib(self):
+        """Test an unknown decoder name resolves to the stdlib decoder."""
+        name, _ = get_decoder("simdjson")
+        assert name == "json"
+
+    def test_auto_prefers_fast_decoder(self):
+        """Test auto resolves to an installed fast decoder when available."""
+        name, _ = get_decoder("auto")
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            return
+        assert name == "orjson"
+
+    def test_loads_uses_configured_decoder(self):
+        """Test module-level loads decodes payloads."""
+        assert loads(b'[1, 2, 3]') == [1, 2, 3]
@@ -0,0 +1,96 @@
+"""Test the content-addressed .testbot.yml cache."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from patchpanda.gateway.models import config as config_models
+from patchpanda.gateway.services.config_cache import NO_CONFIG, ConfigCache, is_commit_sha, ref_key
+
+SHA = "a" * 40
+BLOB = "b" * 40
+
+
+class TestConfigCache:
+    """Test the blob and ref tiers."""
+
+    def test_ref_keys(self):
+        """Test refs are keyed case-insensitively by repository and by branch name."""
+        assert ref_key("Octo", "Repo", "refs/heads/main") == ref_key("octo", "repo", "main")
+        assert is_commit_sha(SHA)
+        assert not is_commit_sha("main")
+
+    @pytest.mark.asyncio
+    async def test_blob_round_trip(self):
+        """Test parsed configs are returned by blob SHA."""
+        cache = ConfigCache()
+        config = config_models.TestbotConfig(max_tests=5)
+
+        assert await cache.get_blob(BLOB) is None
+        await cache.set_blob(BLOB, config)
+
+        assert await cache.get_blob(BLOB) is config
+        assert cache.stats()["blob_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_branch_refs_expire(self):
+        """Test branch entries expire after their TTL, negative ones sooner."""
+        cache = ConfigCache(ref_ttl=60, negative_ttl=0)
+        await cache.set_ref("octo", "repo", "main", BLOB)
+        await cache.set_ref("octo", "repo", "docs", NO_CONFIG)
+
+        assert await cache.get_ref("octo", "repo", "main") == BLOB
+        assert await cache.get_ref("octo", "repo", "docs") is None
+
+    @pytest.mark.asyncio
+    async def test_lru_bound(self):
+        """Test the least recently used entries are evicted."""
+        cache = ConfigCache(max_entries=2)
+        for blob in ("1", "2", "3"):
+            await cache.set_blob(blob, config_models.TestbotConfig())
+
+        assert await cache.get_blob("1") is None
+        assert cache.stats()["blobs"] == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_tier(self):
+        """Test branches resolve through Redis and configs are restored from it."""
+        stored = config_models.TestbotConfig(max_tests=9).model_dump_json().encode()
+        redis_client = Mock(
+            get=AsyncMock(side_effect=lambda key: BLOB.encode() if ":ref:" in key else stored),
+            set=AsyncMock(),
+            delete=AsyncMock(),
+        )
+        cache = ConfigCache(redis_client=redis_client, ref_ttl=60, negative_ttl=30)
+
+        assert await cache.get_ref("Octo", "repo", "main") == BLOB
+        assert (await cache.get_blob(BLOB)).max_tests == 9
+        await cache.set_ref("octo", "repo", "docs", NO_CONFIG)
+        await cache.invalidate_ref("octo", "repo", "refs/heads/main")
+
+        redis_client.get.assert_any_await("patchpanda:config:ref:octo/repo@main")
+        redis_client.set.assert_awaited_once_with("patchpanda:config:ref:octo/repo@docs", "", ex=30)
+        redis_client.delete.assert_awaited_once_with("patchpanda:config:ref:octo/repo@main")
+        assert cache.stats()["redis_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_commit_refs_stay_in_process(self):
+        """Test commit SHAs never move, so they are resolved without Redis."""
+        redis_client = Mock(get=AsyncMock(return_value=None), set=AsyncMock())
+        cache = ConfigCache(redis_client=redis_client)
+
+        await cache.set_ref("octo", "repo", SHA, BLOB)
+
+        assert await cache.get_ref("octo", "repo", SHA) == BLOB
+        redis_client.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_ignored(self):
+        """Test an unavailable Redis degrades to misses."""
+        redis_client = Mock(get=AsyncMock(side_effect=ConnectionError), set=AsyncMock(side_effect=ConnectionError))
+        cache = ConfigCache(redis_client=redis_client)
+
+        await cache.set_blob(BLOB, config_models.TestbotConfig())
+        assert await cache.get_ref("octo", "repo", "main") is None
+
+        assert cache.stats()["errors"] == 2
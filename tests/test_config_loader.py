@@ -0,0 +1,130 @@
+"""Test loading .testbot.yml from repositories."""
+
+import base64
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from patchpanda.gateway.services.config_cache import NO_CONFIG, ConfigCache
+from patchpanda.gateway.services.config_loader import ConfigLoaderService
+from patchpanda.gateway.services.rate_limit import RequestPriority
+
+
+SHA = "c" * 40
+
+
+def contents_response(text: str, sha: str = "b" * 40) -> dict:
+    return {"encoding": "base64", "content": base64.b64encode(text.encode()).decode(), "sha": sha}
+
+
+def not_found() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.github.com/repos/octo/repo/contents/.testbot.yml")
+    return httpx.HTTPStatusError("Not Found", request=request, response=httpx.Response(404, request=request))
+
+
+class TestConfigLoaderService:
+    """Test fetching and parsing the config file."""
+
+    @pytest.mark.asyncio
+    async def test_load_config(self):
+        """Test the file is fetched at the ref and parsed."""
+        github_app = Mock(make_github_request=AsyncMock(return_value=contents_response("max_tests: 5\n")))
+
+        config = await ConfigLoaderService(github_app).load_config("octo", "repo", "abc123", 1)
+
+        assert config.max_tests == 5
+        github_app.make_github_request.assert_awaited_once_with(
+            "GET", "/repos/octo/repo/contents/.testbot.yml", 1, priority=RequestPriority.NORMAL, params={"ref": "abc123"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self):
+        """Test a 404 means no config."""
+        github_app = Mock(make_github_request=AsyncMock(side_effect=not_found()))
+
+        assert await ConfigLoaderService(github_app).load_config("octo", "repo", "main", 1) is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_file(self):
+        """Test a file that does not validate gives no config."""
+        github_app = Mock(make_github_request=AsyncMock(return_value=contents_response("max_tests: 0\n")))
+
+        assert await ConfigLoaderService(github_app).load_config("octo", "repo", "main", 1) is None
+
+
+class TestCachedConfigLoader:
+    """Test config loading through the blob SHA cache."""
+
+    @pytest.mark.asyncio
+    async def test_ref_served_from_cache(self):
+        """Test a resolved ref needs no further GitHub calls."""
+        github_app = Mock(make_github_request=AsyncMock(return_value=contents_response("max_tests: 5\n")))
+        loader = ConfigLoaderService(github_app, ConfigCache())
+
+        first = await loader.load_config("octo", "repo", SHA, 1)
+        second = await loader.load_config("Octo", "Repo", SHA, 1)
+
+        assert first is second
+        assert github_app.make_github_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_same_blob_parsed_once(self):
+        """Test refs sharing a config file share the parsed config."""
+        github_app = Mock(make_github_request=AsyncMock(return_value=contents_response("max_tests: 5\n")))
+        loader = ConfigLoaderService(github_app, ConfigCache())
+
+        first = await loader.load_config("octo", "repo", "main", 1)
+        second = await loader.load_config("octo", "repo", "feature", 1)
+
+        assert first is second
+        assert loader.cache.stats()["blob_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_file_is_cached(self):
+        """Test repositories without a config are not asked again."""
+        github_app = Mock(make_github_request=AsyncMock(side_effect=not_found()))
+        loader = ConfigLoaderService(github_app, ConfigCache())
+
+        assert await loader.load_config("octo", "repo", "main", 1) is None
+        assert await loader.load_config("octo", "repo", "main", 1) is None
+
+        assert github_app.make_github_request.await_count == 1
+        assert loader.cache.stats()["negative_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_undecodable_file_is_cached(self):
+        """Test a config file that is not UTF-8 is cached as no config rather than retried."""
+        latin1 = {"encoding": "base64", "content": base64.b64encode("max_tests: 5 # é\n".encode("latin-1")).decode(), "sha": "b" * 40}
+        github_app = Mock(make_github_request=AsyncMock(return_value=latin1))
+        loader = ConfigLoaderService(github_app, ConfigCache())
+
+        assert await loader.load_versioned_config("octo", "repo", "main", 1) == (NO_CONFIG, None)
+        assert await loader.load_config("octo", "repo", "main", 1) is None
+
+        assert github_app.make_github_request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_errors_are_not_cached(self):
+        """Test a failed fetch is retried on the next load."""
+        request = httpx.Request("GET", "https://api.github.com/repos/octo/repo/contents/.testbot.yml")
+        error = httpx.HTTPStatusError("Bad Gateway", request=request, response=httpx.Response(502, request=request))
+        github_app = Mock(make_github_request=AsyncMock(side_effect=[error, contents_response("max_tests: 5\n")]))
+        loader = ConfigLoaderService(github_app, ConfigCache())
+
+        assert await loader.load_config("octo", "repo", "main", 1) is None
+        assert (await loader.load_config("octo", "repo", "main", 1)).max_tests == 5
+
+    @pytest.mark.asyncio
+    async def test_push_invalidates_branch(self):
+        """Test an invalidated branch is resolved again."""
+        github_app = Mock(make_github_request=AsyncMock(side_effect=[
+            contents_response("max_tests: 5\n", sha="1" * 40),
+            contents_response("max_tests: 7\n", sha="2" * 40),
+        ]))
+        loader = ConfigLoaderService(github_app, ConfigCache())
+
+        assert (await loader.load_config("octo", "repo", "main", 1)).max_tests == 5
+        await loader.invalidate("octo", "repo", "refs/heads/main")
+
+        assert (await loader.load_config("octo", "repo", "main", 1)).max_tests == 7
@@ -0,0 +1,74 @@
+"""Test the process-wide service container."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from patchpanda.gateway.main import create_app
+from patchpanda.gateway.services.container import ServiceContainer, get_services
+
+
+class TestServiceContainer:
+    """Test service construction and shutdown."""
+
+    def test_services_share_state(self):
+        """Test services are wired to the same shared instances."""
+        services = ServiceContainer()
+
+        assert services.github_app.secrets_manager is services.secrets_manager
+        assert services.config_loader.github_app_service is services.github_app
+        assert services.effective_config.config_loader is services.config_loader
+        assert services.checks.github_app_service is services.github_app
+        assert services.changed_files.github_app_service is services.github_app
+        assert services.prefetcher.effective_config is services.effective_config
+        assert services.queue.backend._redis_client is services.redis
+        assert services.config_loader.cache.redis_client is services.redis
+        assert services.github_app.http_client is services.http
+
+    @pytest.mark.asyncio
+    async def test_aclose(self):
+        """Test shutdown closes queue, cloud clients, HTTP pool and Redis."""
+        services = ServiceContainer()
+        services.http = Mock(aclose=AsyncMock())
+        services.redis = Mock(aclose=AsyncMock())
+        services.queue = Mock(close=AsyncMock())
+        services.secrets_manager = Mock()
+
+        await services.aclose()
+
+        services.queue.close.assert_awaited_once()
+        services.secrets_manager.close.assert_called_once()
+        services.http.aclose.assert_awaited_once()
+        services.redis.aclose.assert_awaited_once()
+
+
+class TestGetServices:
+    """Test the FastAPI dependency."""
+
+    def test_reused_across_requests(self):
+        """Test every request sees the same container."""
+        app = FastAPI()
+        seen = []
+
+        @app.get("/probe")
+        async def probe(services: ServiceContainer = Depends(get_services)):
+            seen.append(services)
+            return {}
+
+        client = TestClient(app)
+        client.get("/probe")
+        client.get("/probe")
+
+        assert len(seen) == 2
+        assert seen[0] is seen[1]
+        assert app.state.services is seen[0]
+
+    def test_lifespan_builds_and_closes_container(self):
+        """Test the application lifespan owns the container."""
+        app = create_app()
+
+        with patch.object(ServiceContainer, "aclose", new_callable=AsyncMock) as mock_close:
+            with TestClient(app):
+                assert isinstance(app.state.services, ServiceContainer)
+            mock_close.assert_awaited_once()
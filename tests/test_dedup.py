@@ -0,0 +1,86 @@
+"""Test webhook delivery deduplication."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from patchpanda.gateway.services.dedup import DeliveryDeduplicator
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in for SET NX / DELETE."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestDeliveryDeduplicator:
+    """Test the two-tier seen-delivery cache."""
+
+    @pytest.mark.asyncio
+    async def test_local_duplicate(self):
+        """Test repeats are caught by the in-process LRU."""
+        dedup = DeliveryDeduplicator()
+
+        assert await dedup.check_and_mark("d1") is False
+        assert await dedup.check_and_mark("d1") is True
+        assert dedup.stats()["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_delivery_id_is_never_duplicate(self):
+        """Test deliveries without an ID always pass through."""
+        dedup = DeliveryDeduplicator()
+
+        assert await dedup.check_and_mark(None) is False
+        assert await dedup.check_and_mark(None) is False
+
+    @pytest.mark.asyncio
+    async def test_shared_across_replicas(self):
+        """Test a delivery seen by another replica is caught through Redis."""
+        redis_client = FakeRedis()
+        replica_a = DeliveryDeduplicator(redis_client=redis_client)
+        replica_b = DeliveryDeduplicator(redis_client=redis_client)
+
+        assert await replica_a.check_and_mark("d1") is False
+        assert await replica_b.check_and_mark("d1") is True
+        assert replica_b.stats()["redis_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_is_bounded(self):
+        """Test the oldest entries are evicted past max_entries."""
+        dedup = DeliveryDeduplicator(max_entries=2)
+
+        for delivery_id in ("d1", "d2", "d3"):
+            await dedup.check_and_mark(delivery_id)
+
+        assert dedup.stats()["entries"] == 2
+        assert await dedup.check_and_mark("d1") is False
+
+    @pytest.mark.asyncio
+    async def test_forget_allows_redelivery(self):
+        """Test forgotten deliveries are processed again."""
+        redis_client = FakeRedis()
+        dedup = DeliveryDeduplicator(redis_client=redis_client)
+
+        await dedup.check_and_mark("d1")
+        await dedup.forget("d1")
+
+        assert await dedup.check_and_mark("d1") is False
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fail_open(self):
+        """Test a Redis outage does not drop deliveries."""
+        redis_client = Mock(set=AsyncMock(side_effect=ConnectionError("down")))
+        dedup = DeliveryDeduplicator(redis_client=redis_client)
+
+        assert await dedup.check_and_mark("d1") is False
+        assert await dedup.check_and_mark("d1") is True
+        assert dedup.stats()["redis_errors"] == 1
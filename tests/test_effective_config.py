@@ -0,0 +1,202 @@
+"""Test layered effective config resolution."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from patchpanda.gateway.db.tables import BillingProject, RepositoryBinding
+from patchpanda.gateway.models import config as config_models
+from patchpanda.gateway.services.config_cache import NO_CONFIG
+from patchpanda.gateway.services.config_loader import ConfigLoaderService
+from patchpanda.gateway.services.effective_config import (
+    ConfigUnavailable,
+    EffectiveConfigResolver,
+    merge_layers,
+)
+
+SHA = "a" * 40
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """SQLite session factory with a project bound to octo/repo."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'bindings.db'}")
+    BillingProject.__table__.create(bind=engine)
+    RepositoryBinding.__table__.create(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add(BillingProject(
+            id="project", name="Project", default_config={"max_tests": 20, "timeout_minutes": 60},
+            updated_at=datetime(2026, 1, 1),
+        ))
+        session.add(RepositoryBinding(
+            id="binding", project_id="project", owner="octo", repository="repo", installation_id=1,
+            config={"max_tests": 30, "custom_settings": {"runner": "pytest"}}, updated_at=datetime(2026, 1, 2),
+        ))
+        session.commit()
+    return factory
+
+
+def loader(file_config=None, blob_sha=SHA):
+    """A config loader returning a fixed .testbot.yml."""
+    config_loader = ConfigLoaderService(Mock())
+    config_loader.load_versioned_config = AsyncMock(
+        return_value=(blob_sha if file_config is not None else NO_CONFIG, file_config)
+    )
+    config_loader.invalidate = AsyncMock()
+    return config_loader
+
+
+class TestEffectiveConfigResolver:
+    """Test merging and memoisation."""
+
+    def test_merge_layers(self):
+        """Test later layers win and custom settings merge."""
+        merged = merge_layers(
+            {"max_tests": 1, "custom_settings": {"a": 1, "b": 1}},
+            None,
+            {"custom_settings": {"b": 2}, "enabled": False},
+        )
+
+        assert merged == {"max_tests": 1, "custom_settings": {"a": 1, "b": 2}, "enabled": False}
+
+    @pytest.mark.asyncio
+    async def test_layers_merge_in_order(self, session_factory):
+        """Test defaults, project, binding and file are layered."""
+        file_config = config_models.TestbotConfig(timeout_minutes=10, custom_settings={"workers": 4})
+        resolver = EffectiveConfigResolver(loader(file_config), session_factory)
+
+        config = await resolver.resolve("Octo", "repo", "main", 1)
+
+        assert config.max_tests == 30
+        assert config.timeout_minutes == 10
+        assert config.custom_settings == {"runner": "pytest", "workers": 4}
+        # Left at the built-in default
+        assert config.test_directory == "tests"
+        assert config.version.endswith(f"|{SHA}")
+
+    @pytest.mark.asyncio
+    async def test_frozen(self):
+        """Test the effective config cannot be modified."""
+        resolver = EffectiveConfigResolver(loader(config_models.TestbotConfig(exclude_patterns=["docs/**"])))
+
+        config = await resolver.resolve("octo", "repo", "main", 1)
+
+        assert config.exclude_patterns == ("docs/**",)
+        with pytest.raises(ValidationError):
+            config.max_tests = 1
+
+    @pytest.mark.asyncio
+    async def test_memoised_by_ref_and_version(self, session_factory):
+        """Test repeated lookups hit the memo and refs sharing a version share the object."""
+        config_loader = loader(config_models.TestbotConfig(max_tests=5))
+        resolver = EffectiveConfigResolver(config_loader, session_factory)
+
+        first = await resolver.resolve("octo", "repo", "main", 1)
+        again = await resolver.resolve("octo", "repo", "main", 1)
+        other = await resolver.resolve("octo", "repo", SHA, 1)
+
+        assert first is again is other
+        assert config_loader.load_versioned_config.await_count == 2
+        assert resolver.stats()["hits"] == 1
+        assert resolver.stats()["merges"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_resolution(self):
+        """Test lookups of a ref arriving together load its config once."""
+        config_loader = loader(config_models.TestbotConfig(max_tests=5))
+        resolver = EffectiveConfigResolver(config_loader)
+
+        first, second = await asyncio.gather(
+            resolver.resolve("octo", "repo", "main", 1), resolver.resolve("octo", "repo", "main", 1)
+        )
+
+        assert first is second
+        assert config_loader.load_versioned_config.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_binding_wins(self, session_factory):
+        """Test a disabled binding turns the bot off whatever the file says."""
+        with session_factory() as session:
+            session.get(RepositoryBinding, "binding").enabled = False
+            session.commit()
+        resolver = EffectiveConfigResolver(loader(config_models.TestbotConfig(enabled=True)), session_factory)
+
+        assert (await resolver.resolve("octo", "repo", "main", 1)).enabled is False
+
+    @pytest.mark.asyncio
+    async def test_binding_failure_not_remembered(self, session_factory):
+        """Test an unreadable binding fails the lookup instead of resolving to defaults."""
+        with session_factory() as session:
+            session.get(RepositoryBinding, "binding").enabled = False
+            session.commit()
+        database = Mock(side_effect=[RuntimeError("database down"), session_factory()])
+        resolver = EffectiveConfigResolver(loader(config_models.TestbotConfig()), database)
+
+        with pytest.raises(ConfigUnavailable):
+            await resolver.resolve("octo", "repo", "main", 1)
+
+        assert (await resolver.resolve("octo", "repo", "main", 1)).enabled is False
+        assert resolver.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_binding_update_invalidation(self, session_factory):
+        """Test a binding change is picked up after invalidating the repository."""
+        resolver = EffectiveConfigResolver(loader(), session_factory)
+        before = await resolver.resolve("octo", "repo", "main", 1)
+        with session_factory() as session:
+            binding = session.get(RepositoryBinding, "binding")
+            binding.config = {"max_tests": 40}
+            binding.updated_at = datetime(2026, 2, 1)
+            session.commit()
+
+        assert (await resolver.resolve("octo", "repo", "main", 1)) is before
+        resolver.invalidate_repository("Octo", "Repo")
+        after = await resolver.resolve("octo", "repo", "main", 1)
+
+        assert before.max_tests == 30
+        assert after.max_tests == 40
+        assert after.version != before.version
+
+    @pytest.mark.asyncio
+    async def test_push_invalidation(self):
+        """Test invalidating a branch reloads its file."""
+        config_loader = loader(config_models.TestbotConfig(max_tests=5))
+        resolver = EffectiveConfigResolver(config_loader)
+        await resolver.resolve("octo", "repo", "main", 1)
+
+        await resolver.invalidate_ref("octo", "repo", "refs/heads/main")
+        await resolver.resolve("octo", "repo", "main", 1)
+
+        config_loader.invalidate.assert_awaited_once_with("octo", "repo", "refs/heads/main")
+        assert config_loader.load_versioned_config.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_failure_not_remembered(self):
+        """Test a failed config fetch fails the lookup and the ref is resolved again."""
+        config_loader = loader()
+        config_loader.load_versioned_config.side_effect = [(None, None), (NO_CONFIG, None)]
+        resolver = EffectiveConfigResolver(config_loader)
+
+        with pytest.raises(ConfigUnavailable):
+            await resolver.resolve("octo", "repo", "main", 1)
+        config = await resolver.resolve("octo", "repo", "main", 1)
+
+        # A missing file is not a failure
+        assert config.max_tests == 100
+        assert config_loader.load_versioned_config.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_binding_config_ignored(self, session_factory):
+        """Test an invalid server-side layer is skipped."""
+        with session_factory() as session:
+            session.get(RepositoryBinding, "binding").config = {"max_tests": 0}
+            session.commit()
+        resolver = EffectiveConfigResolver(loader(), session_factory)
+
+        assert (await resolver.resolve("octo", "repo", "main", 1)).max_tests == 20
@@ -0,0 +1,80 @@
+"""Test the GitHub API ETag cache."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from patchpanda.gateway.services.etag_cache import ETagCache, cache_key
+
+
+class TestCacheKey:
+    """Test cache keys."""
+
+    def test_key_includes_installation_and_query(self):
+        """Test the same URL is cached separately per installation and ref."""
+        assert cache_key(1, "/repos/a/b") != cache_key(2, "/repos/a/b")
+        assert cache_key(1, "/repos/a/b/contents/x", {"ref": "main"}) == "1:/repos/a/b/contents/x?ref=main"
+
+
+class TestETagCache:
+    """Test LRU storage and the Redis tier."""
+
+    @pytest.mark.asyncio
+    async def test_get_and_set(self):
+        """Test a stored response is returned for revalidation."""
+        cache = ETagCache()
+
+        assert await cache.get("k") is None
+        await cache.set("k", '"abc"', b'{"a": 1}')
+        entry = await cache.get("k")
+
+        assert entry.etag == '"abc"'
+        assert entry.body == b'{"a": 1}'
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_by_bytes(self):
+        """Test total size stays within max_bytes, oldest entries first."""
+        cache = ETagCache(max_bytes=25)
+        await cache.set("a", "e", b"x" * 9)
+        await cache.set("b", "e", b"x" * 9)
+        await cache.get("a")
+        await cache.set("c", "e", b"x" * 9)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert cache.stats()["bytes"] <= 25
+        assert cache.stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_oversized_entry_not_cached(self):
+        """Test a body larger than the whole cache is skipped."""
+        cache = ETagCache(max_bytes=10)
+        await cache.set("k", "e", b"x" * 100)
+
+        assert await cache.get("k") is None
+        assert cache.stats()["bytes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_tier(self):
+        """Test entries are shared through Redis and loaded on a local miss."""
+        redis_client = Mock(set=AsyncMock(), get=AsyncMock(return_value=b'"abc"\n{"a": 1}'))
+        cache = ETagCache(redis_client=redis_client, ttl=60)
+
+        entry = await cache.get("k")
+        await cache.set("j", '"def"', b"{}")
+
+        assert entry.etag == '"abc"'
+        assert entry.body == b'{"a": 1}'
+        assert cache.stats()["redis_hits"] == 1
+        redis_client.set.assert_awaited_once_with('patchpanda:etag:j', b'"def"\n{}', ex=60)
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_ignored(self):
+        """Test an unavailable Redis degrades to the local cache."""
+        redis_client = Mock(set=AsyncMock(side_effect=ConnectionError), get=AsyncMock(side_effect=ConnectionError))
+        cache = ETagCache(redis_client=redis_client)
+
+        assert await cache.get("k") is None
+        await cache.set("k", "e", b"{}")
+
+        assert (await cache.get("k")).etag == "e"
+        assert cache.stats()["errors"] == 2
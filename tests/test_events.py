@@ -0,0 +1,159 @@
+"""Test compact webhook event decoding."""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from patchpanda.gateway.codec import PayloadDecodeError
+from patchpanda.gateway.models.events import (
+    IssueCommentEvent,
+    PullRequestEvent,
+    PushEvent,
+    decode_event,
+)
+from patchpanda.gateway.settings import Settings
+
+
+PULL_REQUEST = {
+    "action": "synchronize",
+    "number": 42,
+    "pull_request": {
+        "number": 42,
+        "title": "Test PR",
+        "head": {"ref": "feature", "sha": "a" * 40, "repo": {"name": "fork", "full_name": "forker/fork"}},
+        "base": {"ref": "main", "sha": "b" * 40},
+        "labels": [{"name": "perf"}],
+    },
+    "repository": {"name": "test-repo", "owner": {"login": "test-user", "id": 1}},
+    "installation": {"id": 12345},
+    "sender": {"login": "monalisa", "id": 2},
+}
+
+ISSUE_COMMENT = {
+    "action": "created",
+    "issue": {"number": 7, "pull_request": {"url": "https://api.github.com/..."}},
+    "comment": {"id": 99, "body": "/patchpanda generate"},
+    "repository": {"name": "test-repo", "owner": {"login": "test-user"}},
+    "installation": {"id": 12345},
+    "sender": {"login": "hubot"},
+}
+
+PUSH = {
+    "ref": "refs/heads/main",
+    "after": "c" * 40,
+    "forced": False,
+    "deleted": False,
+    "commits": [
+        {"id": "1", "added": ["src/app.py"], "modified": [], "removed": []},
+        {"id": "2", "added": [], "modified": [".testbot.yml", "README.md"], "removed": []},
+    ],
+    "repository": {"name": "test-repo", "owner": {"login": "test-user"}},
+    "installation": {"id": 12345},
+    "sender": {"login": "monalisa"},
+}
+
+
+@pytest.fixture(params=["auto", "json"])
+def decoder(request):
+    """Run each test through the typed-struct and the dict decoding paths."""
+    with patch('patchpanda.gateway.models.events.get_settings', return_value=Settings(json_decoder=request.param)):
+        yield request.param
+
+
+class TestDecodeEvent:
+    """Test decoding raw bodies into events."""
+
+    def test_pull_request(self, decoder):
+        """Test pull_request fields are extracted."""
+        event = decode_event("pull_request", json.dumps(PULL_REQUEST).encode())
+
+        assert event == PullRequestEvent(
+            action="synchronize",
+            installation_id=12345,
+            owner="test-user",
+            repo="test-repo",
+            sender="monalisa",
+            number=42,
+            head_sha="a" * 40,
+            head_ref="feature",
+            head_repo="forker/fork",
+            base_sha="b" * 40,
+        )
+
+    def test_issue_comment(self, decoder):
+        """Test issue_comment fields are extracted."""
+        event = decode_event("issue_comment", json.dumps(ISSUE_COMMENT).encode())
+
+        assert event == IssueCommentEvent(
+            action="created",
+            installation_id=12345,
+            owner="test-user",
+            repo="test-repo",
+            sender="hubot",
+            number=7,
+            comment_id=99,
+            comment_body="/patchpanda generate",
+            is_pull_request=True,
+        )
+
+    def test_push(self, decoder):
+        """Test push events record whether the config file changed."""
+        event = decode_event("push", json.dumps(PUSH).encode())
+
+        assert event == PushEvent(
+            installation_id=12345,
+            owner="test-user",
+            repo="test-repo",
+            sender="monalisa",
+            ref="refs/heads/main",
+            head_sha="c" * 40,
+            config_changed=True,
+        )
+
+    def test_push_without_config_change(self, decoder):
+        """Test pushes leaving the config alone, unless they rewrite history."""
+        commits = [{"added": ["docs/index.md"], "modified": [], "removed": []}]
+        body = json.dumps({**PUSH, "commits": commits}).encode()
+        forced = json.dumps({**PUSH, "commits": commits, "forced": True}).encode()
+
+        assert decode_event("push", body).config_changed is False
+        assert decode_event("push", forced).config_changed is True
+
+    def test_sparse_payload(self, decoder):
+        """Test missing objects decode to empty fields."""
+        event = decode_event("issue_comment", b'{"action": "created"}')
+
+        assert event == IssueCommentEvent(action="created")
+        assert event.is_pull_request is False
+
+    def test_unhandled_event_is_not_decoded(self, decoder):
+        """Test unhandled events skip decoding entirely."""
+        assert decode_event("release", b"not json") is None
+        assert decode_event(None, b"not json") is None
+
+    def test_invalid_json(self, decoder):
+        """Test invalid bodies raise PayloadDecodeError."""
+        with pytest.raises(PayloadDecodeError):
+            decode_event("pull_request", b"invalid json")
+
+    @pytest.mark.parametrize("event,payload", [
+        ("pull_request", {"number": "42"}),
+        ("pull_request", {"pull_request": {"head": {"sha": 1}}}),
+        ("pull_request", {"pull_request": []}),
+        ("pull_request", {"installation": {"id": True}}),
+        ("issue_comment", {"comment": {"body": ["/patchpanda"]}}),
+        ("issue_comment", {"issue": {"pull_request": "yes"}}),
+        ("issue_comment", {"repository": {"owner": "octo"}}),
+        ("push", {"commits": [{"modified": [1]}]}),
+        ("push", {"commits": ["abc"]}),
+        ("push", {"forced": "true"}),
+    ])
+    def test_wrong_field_types(self, decoder, event, payload):
+        """Test fields of the wrong JSON type raise PayloadDecodeError on every decoding path."""
+        with pytest.raises(PayloadDecodeError):
+            decode_event(event, json.dumps(payload).encode())
+
+    def test_events_use_slots(self):
+        """Test events carry no per-instance __dict__."""
+        assert not hasattr(PullRequestEvent(), "__dict__")
+        assert not hasattr(IssueCommentEvent(), "__dict__")
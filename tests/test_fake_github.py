@@ -0,0 +1,137 @@
+"""Test the GitHub services against the offline GitHub stand-in."""
+
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from patchpanda.gateway.services.checks import CheckConclusion, CheckStatus, ChecksService
+from patchpanda.gateway.services.config_loader import ConfigLoaderService
+from patchpanda.gateway.services.github_app import GitHubAppService
+from patchpanda.gateway.services.http_client import GitHubHTTPClient
+from patchpanda.gateway.services.resilience import CircuitOpenError, DeadlineExceeded, deadline
+from patchpanda.gateway.settings import Settings
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from fake_github import FakeGitHub, FakeGitHubConfig, head_sha  # noqa: E402
+
+
+def make_service(fake: FakeGitHub) -> GitHubAppService:
+    settings = Settings(github_app_id="12345", github_api_url="http://fake-github", github_etag_cache_redis=False)
+    with patch('patchpanda.gateway.services.github_app.get_settings', return_value=settings):
+        service = GitHubAppService(
+            http_client=GitHubHTTPClient(
+                base_url="http://fake-github", transport=httpx.ASGITransport(app=fake.app)
+            )
+        )
+    service.generate_jwt = AsyncMock(return_value="app.jwt")
+    return service
+
+
+class TestFakeGitHub:
+    """Exercise the services end to end without network access."""
+
+    @pytest.mark.asyncio
+    async def test_pull_request_and_etag(self):
+        """Test tokens are exchanged once and repeated GETs are answered with 304."""
+        fake = FakeGitHub()
+        service = make_service(fake)
+
+        first = await service.get_pull_request("octo", "repo", 7, 1)
+        second = await service.get_pull_request("octo", "repo", 7, 1)
+
+        assert first == second
+        assert first["head"]["sha"] == head_sha("octo", "repo", 7)
+        assert fake.requests["POST /app/installations/{installation_id}/access_tokens"] == 1
+        assert fake.counters["not_modified"] == 1
+        assert service.etag_cache.stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_config_checks_and_comments(self):
+        """Test the config loader and ChecksService round trip."""
+        fake = FakeGitHub()
+        service = make_service(fake)
+        checks = ChecksService(service)
+
+        config = await ConfigLoaderService(service).load_config("octo", "repo", "main", 1)
+        check_run_id = await checks.create_test_generation_check("octo", "repo", "abc123", 1)
+        await checks.update_test_generation_check(
+            "octo", "repo", check_run_id, 1, status=CheckStatus.COMPLETED, conclusion=CheckConclusion.SUCCESS
+        )
+        comment_id = await checks.create_comment("octo", "repo", 7, "Queued", 1)
+
+        assert config.max_tests == 50
+        assert fake.check_runs[int(check_run_id)]["conclusion"] == "success"
+        assert fake.comments[int(comment_id)]["body"] == "Queued"
+
+    @pytest.mark.asyncio
+    async def test_graphql_and_pagination(self):
+        """Test the GraphQL context and REST pagination over many files."""
+        fake = FakeGitHub(FakeGitHubConfig(files_per_pr=250))
+        service = make_service(fake)
+
+        context = await service.get_pull_request_context("octo", "repo", 7, 1)
+        graphql_files = [f.path async for f in service.iter_pull_request_files("octo", "repo", 7, 1, context)]
+        rest_files = [f["filename"] async for f in service.paginate("/repos/octo/repo/pulls/7/files", 1)]
+
+        assert context.config.text.startswith("enabled: true")
+        assert len(graphql_files) == len(rest_files) == 250
+        assert fake.requests["GET /repos/{owner}/{repo}/pulls/{number}/files"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_headers(self):
+        """Test budgets from the stand-in reach the scheduler."""
+        fake = FakeGitHub(FakeGitHubConfig(rate_limit=100))
+        service = make_service(fake)
+
+        await service.get_repository_info("octo", "repo", 1)
+
+        budgets = {entry["scope"]: entry for entry in service.rate_limits.stats()["lowest"]}
+        assert budgets["installation"]["installation_id"] == 1
+        assert budgets["installation"]["remaining"] == 99
+        assert budgets["installation"]["limit"] == 100
+        # The token exchange is metered against the app budget
+        assert budgets["app"]["remaining"] == 99
+
+    @pytest.mark.asyncio
+    async def test_error_injection(self):
+        """Test injected errors surface as HTTP errors."""
+        fake = FakeGitHub(FakeGitHubConfig(error_rate=1.0, error_paths="/pulls/", error_status=502))
+        service = make_service(fake)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.get_pull_request("octo", "repo", 7, 1)
+
+        assert fake.counters["injected_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_endpoint_opens_circuit(self):
+        """Test repeated 5xx stop calls to that endpoint class only."""
+        fake = FakeGitHub(FakeGitHubConfig(error_rate=1.0, error_paths="/pulls/", error_status=502))
+        service = make_service(fake)
+
+        for _ in range(service.settings.github_circuit_failure_threshold):
+            with pytest.raises(httpx.HTTPStatusError):
+                await service.get_pull_request("octo", "repo", 7, 1)
+        with pytest.raises(CircuitOpenError):
+            await service.get_pull_request("octo", "repo", 7, 1)
+        await service.get_repository_info("octo", "repo", 1)
+
+        assert fake.counters["injected_errors"] == service.settings.github_circuit_failure_threshold
+
+    @pytest.mark.asyncio
+    async def test_slow_endpoint_skipped_near_deadline(self):
+        """Test a call slower than the time left is not sent."""
+        fake = FakeGitHub(FakeGitHubConfig(latency=0.1))
+        service = make_service(fake)
+        await service.get_repository_info("octo", "repo", 1)
+
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await service.get_repository_info("octo", "repo", 1)
+
+        assert fake.requests["GET /repos/{owner}/{repo}"] == 1
+        assert service.call_guard.stats()["deadline_skipped"] == 1
@@ -0,0 +1,66 @@
+"""Test GraphQL pull request context parsing."""
+
+from patchpanda.gateway.services.graphql import (
+    ChangedFile,
+    GraphQLError,
+    next_cursor,
+    parse_blob,
+    parse_pull_request_context,
+)
+
+
+def files_page(paths, cursor=None):
+    return {
+        "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+        "nodes": [{"path": path, "additions": 1, "deletions": 0, "changeType": "MODIFIED"} for path in paths],
+    }
+
+
+def context_data(files, config=None):
+    return {
+        "repository": {
+            "pullRequest": {
+                "number": 7,
+                "headRefName": "feature",
+                "headRefOid": "abc123",
+                "baseRefName": "main",
+                "baseRefOid": "def456",
+                "changedFiles": 3,
+                "files": files,
+            },
+            "config": config,
+        }
+    }
+
+
+class TestParsing:
+    """Test query result parsing."""
+
+    def test_pull_request_context(self):
+        """Test refs, files, cursor and config are read from one result."""
+        context = parse_pull_request_context(
+            context_data(files_page(["a.py", "b.py"], cursor="c1"), {"oid": "b10b", "text": "enabled: true\n", "isBinary": False})
+        )
+
+        assert (context.head_ref, context.head_sha, context.base_ref, context.base_sha) == ("feature", "abc123", "main", "def456")
+        assert context.files == [ChangedFile("a.py", 1, 0, "MODIFIED"), ChangedFile("b.py", 1, 0, "MODIFIED")]
+        assert context.files_cursor == "c1"
+        assert context.config.oid == "b10b"
+        assert context.config.text == "enabled: true\n"
+
+    def test_last_page_has_no_cursor(self):
+        """Test the last page gives no cursor."""
+        assert next_cursor(files_page(["a.py"])) is None
+
+    def test_missing_or_binary_blob(self):
+        """Test absent, tree and binary objects have no config."""
+        assert parse_blob(None) is None
+        assert parse_blob({}) is None
+        assert parse_blob({"oid": "x", "text": None, "isBinary": True}) is None
+
+    def test_graphql_error_message(self):
+        """Test error messages are joined."""
+        error = GraphQLError([{"message": "Not found"}, {"message": "Denied"}])
+
+        assert str(error) == "Not found; Denied"
+        assert len(error.errors) == 2
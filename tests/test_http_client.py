@@ -0,0 +1,88 @@
+"""Test the shared GitHub HTTP client."""
+
+import httpx
+import pytest
+
+from patchpanda.gateway.services.http_client import GitHubHTTPClient
+
+
+def make_client(handler, **kwargs) -> GitHubHTTPClient:
+    return GitHubHTTPClient(transport=httpx.MockTransport(handler), **kwargs)
+
+
+class TestGitHubHTTPClient:
+    """Test request handling and pool metrics."""
+
+    @pytest.mark.asyncio
+    async def test_default_headers_and_base_url(self):
+        """Test requests go to the API base URL with GitHub headers."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={})
+
+        client = make_client(handler, base_url="https://github.example.com/api/v3")
+        await client.request("GET", "/repos/octo/repo")
+
+        assert str(seen[0].url) == "https://github.example.com/api/v3/repos/octo/repo"
+        assert seen[0].headers["x-github-api-version"] == "2022-11-28"
+        assert seen[0].headers["user-agent"] == "patchpanda-gateway"
+
+    @pytest.mark.asyncio
+    async def test_per_request_timeout(self):
+        """Test a per-request timeout overrides the client default."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.extensions["timeout"])
+            return httpx.Response(200)
+
+        client = make_client(handler, timeout=10.0)
+        await client.request("GET", "/a")
+        await client.request("GET", "/b", timeout=2.0)
+
+        assert seen[0]["read"] == 10.0
+        assert seen[1]["read"] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_stats(self):
+        """Test request, error and utilisation counters."""
+        def handler(request):
+            if request.url.path == "/fail":
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200)
+
+        client = make_client(handler, max_connections=10)
+        await client.request("GET", "/ok")
+        with pytest.raises(httpx.ConnectError):
+            await client.request("GET", "/fail")
+
+        stats = client.stats()
+        assert stats["requests"] == 2
+        assert stats["errors"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["peak_pool_utilization"] == 0.1
+        # The mock transport opens no sockets, so every request counts as reused
+        assert stats["connection_reuse_ratio"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_trace_counts_connections(self):
+        """Test connection setup events from the pool are counted."""
+        client = make_client(lambda request: httpx.Response(200))
+
+        await client._trace("connection.connect_tcp.complete", {})
+        await client._trace("connection.start_tls.complete", {})
+        await client._trace("http11.send_request_headers.complete", {})
+
+        assert client.stats()["connections_opened"] == 1
+        assert client.stats()["tls_handshakes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self, monkeypatch):
+        """Test HTTP/2 is only enabled when h2 is installed."""
+        monkeypatch.setattr("patchpanda.gateway.services.http_client.HTTP2_AVAILABLE", False)
+        client = make_client(lambda request: httpx.Response(200), http2=True)
+
+        assert client.http2 is False
+        await client.aclose()
@@ -0,0 +1,196 @@
+"""Test webhook inbox and worker pool."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from patchpanda.gateway import codec
+from patchpanda.gateway.db.tables import WebhookDelivery
+from patchpanda.gateway.services.inbox import (
+    DatabaseInboxBackend,
+    InboxItem,
+    InboxStatus,
+    InboxWorkerPool,
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """SQLite session factory with the inbox table."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'inbox.db'}")
+    WebhookDelivery.__table__.create(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def backend(session_factory):
+    """Database inbox backend."""
+    return DatabaseInboxBackend(session_factory)
+
+
+async def wait_for(condition, timeout=2.0):
+    """Poll until condition() is true."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+class TestDatabaseInboxBackend:
+    """Test database inbox storage."""
+
+    @pytest.mark.asyncio
+    async def test_put_and_claim(self, backend):
+        """Test deliveries are claimed once, oldest first."""
+        first = await backend.put(InboxItem(event="pull_request", body=b"{}", delivery_id="d1"))
+        await backend.put(InboxItem(event="issue_comment", body=b"{}", delivery_id="d2"))
+        assert await backend.depth() == 2
+
+        claimed = await backend.claim(1)
+        assert [item.id for item in claimed] == [first]
+        assert claimed[0].attempts == 1
+        assert claimed[0].body == b"{}"
+
+        claimed = await backend.claim(10)
+        assert [item.delivery_id for item in claimed] == ["d2"]
+        assert await backend.claim(10) == []
+
+    @pytest.mark.asyncio
+    async def test_complete_and_fail(self, backend, session_factory):
+        """Test processed and failed deliveries leave the inbox."""
+        done = await backend.put(InboxItem(event="push", body=b"{}"))
+        failed = await backend.put(InboxItem(event="push", body=b"{}"))
+        await backend.claim(10)
+
+        await backend.complete(done)
+        await backend.fail(failed, "boom", retry=False)
+
+        assert await backend.depth() == 0
+        with session_factory() as session:
+            assert session.get(WebhookDelivery, done).status == InboxStatus.DONE.value
+            row = session.get(WebhookDelivery, failed)
+            assert row.status == InboxStatus.FAILED.value
+            assert row.error_message == "boom"
+
+    @pytest.mark.asyncio
+    async def test_stale_processing_is_reclaimed(self, session_factory):
+        """Test deliveries abandoned by a dead worker are claimed again."""
+        backend = DatabaseInboxBackend(session_factory, visibility_timeout=-1)
+        item_id = await backend.put(InboxItem(event="push", body=b"{}"))
+
+        assert len(await backend.claim(1)) == 1
+        reclaimed = await backend.claim(1)
+        assert [item.id for item in reclaimed] == [item_id]
+        assert reclaimed[0].attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_retry_waits_for_backoff(self, backend):
+        """Test a delivery released for retry is not claimed before its delay passes."""
+        later = await backend.put(InboxItem(event="push", body=b"{}"))
+        now = await backend.put(InboxItem(event="push", body=b"{}"))
+        await backend.claim(10)
+
+        await backend.fail(later, "boom", retry=True, delay=60)
+        await backend.fail(now, "boom", retry=True)
+
+        assert [item.id for item in await backend.claim(10)] == [now]
+        assert await backend.depth() == 2
+
+
+class TestInboxWorkerPool:
+    """Test inbox draining."""
+
+    @pytest.mark.asyncio
+    async def test_pool_dispatches_deliveries(self, backend):
+        """Test queued deliveries are dispatched and counted."""
+        dispatch = AsyncMock()
+        pool = InboxWorkerPool(backend, dispatch, workers=2, poll_interval=0.05)
+        await pool.start()
+        try:
+            await pool.put("pull_request", b'{"action": "opened"}', "d1")
+            await pool.put("issue_comment", b'{"action": "created"}', "d2")
+            await wait_for(lambda: dispatch.await_count == 2)
+            await wait_for(lambda: pool._processed == 2)
+        finally:
+            await pool.stop()
+
+        events = sorted(call.args[0].event for call in dispatch.await_args_list)
+        assert events == ["issue_comment", "pull_request"]
+
+        stats = await pool.stats()
+        assert stats["depth"] == 0
+        assert stats["processed"] == 2
+        assert stats["drain_latency_seconds"]["max"] is not None
+
+    @pytest.mark.asyncio
+    async def test_pool_retries_then_fails(self, backend):
+        """Test failing deliveries are retried up to max_attempts."""
+        dispatch = AsyncMock(side_effect=RuntimeError("handler failed"))
+        pool = InboxWorkerPool(
+            backend, dispatch, workers=1, poll_interval=0.01, max_attempts=2, retry_backoff=0.0
+        )
+        await pool.start()
+        try:
+            await pool.put("pull_request", b"{}")
+            await wait_for(lambda: pool._failed == 1)
+        finally:
+            await pool.stop()
+
+        assert dispatch.await_count == 2
+        stats = await pool.stats()
+        assert stats["retried"] == 1
+        assert stats["depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_backoff(self):
+        """Test retries back off exponentially up to the maximum."""
+        backend = AsyncMock()
+        pool = InboxWorkerPool(
+            backend, AsyncMock(side_effect=RuntimeError("boom")), max_attempts=10, retry_backoff=5.0,
+            retry_backoff_max=30.0,
+        )
+
+        for attempts in (1, 2, 4):
+            await pool._process(InboxItem(id="i", event="push", body=b"{}", attempts=attempts))
+
+        delays = [call.kwargs["delay"] for call in backend.fail.await_args_list]
+        assert delays == [5.0, 10.0, 30.0]
+
+    @pytest.mark.asyncio
+    async def test_undecodable_delivery_not_retried(self, backend, session_factory):
+        """Test a body that cannot be decoded fails on the first attempt."""
+        dispatch = AsyncMock(side_effect=codec.PayloadDecodeError("not JSON"))
+        pool = InboxWorkerPool(backend, dispatch, workers=1, poll_interval=0.01, retry_backoff=0.0)
+        await pool.start()
+        try:
+            item_id = await pool.put("push", b"{")
+            await wait_for(lambda: pool._failed == 1)
+        finally:
+            await pool.stop()
+
+        assert dispatch.await_count == 1
+        assert (await pool.stats())["retried"] == 0
+        with session_factory() as session:
+            assert session.get(WebhookDelivery, item_id).status == InboxStatus.FAILED.value
+
+    @pytest.mark.asyncio
+    async def test_reclaims_count_as_attempts(self, session_factory):
+        """Test a delivery whose worker died on every attempt is failed, not dispatched again."""
+        backend = DatabaseInboxBackend(session_factory, visibility_timeout=-1)
+        dispatch = AsyncMock()
+        pool = InboxWorkerPool(backend, dispatch, workers=1, poll_interval=0.01, max_attempts=2)
+        item_id = await backend.put(InboxItem(event="push", body=b"{}"))
+        # Two workers died while processing it
+        await backend.claim(1)
+        await backend.claim(1)
+
+        await pool._process((await backend.claim(1))[0])
+
+        dispatch.assert_not_awaited()
+        assert pool._failed == 1
+        with session_factory() as session:
+            row = session.get(WebhookDelivery, item_id)
+            assert row.status == InboxStatus.FAILED.value
+            assert row.attempts == 3
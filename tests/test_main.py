@@ -1,6 +1,7 @@
 """Test main application."""
 
 import pytest
+from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
 
 from patchpanda.gateway.main import app
@@ -27,3 +28,40 @@ def test_app_title():
 def test_app_description():
     """Test application description."""
     assert "GitHub App and public API" in app.description
+
+
+
+class TestInternalMetrics:
+    """Test the internal metrics endpoints require the metrics token."""
+
+    @pytest.fixture
+    def metrics_token(self):
+        """Configure a metrics token."""
+        settings = Mock(metrics_token="s3cret")
+        with patch("patchpanda.gateway.api.internal.get_settings", return_value=settings):
+            yield "s3cret"
+
+    def test_disabled_without_token(self, client):
+        """Test the endpoints are not served when no token is configured."""
+        with patch("patchpanda.gateway.api.internal.get_settings", return_value=Mock(metrics_token="")):
+            response = client.get("/internal/metrics/effective-config", headers={"Authorization": "Bearer "})
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}])
+    def test_wrong_token_rejected(self, client, metrics_token, headers):
+        """Test callers without the token are rejected."""
+        assert client.get("/internal/metrics/effective-config", headers=headers).status_code == 401
+
+    def test_token_accepted(self, client, metrics_token):
+        """Test the token grants access to the metrics."""
+        response = client.get(
+            "/internal/metrics/effective-config", headers={"Authorization": f"Bearer {metrics_token}"}
+        )
+
+        assert response.status_code == 200
+        assert "enabled" in response.json()
+
+    def test_admin_endpoints_unchanged(self, client):
+        """Test the billing and key endpoints keep their unauthenticated stubs."""
+        assert client.get("/api/admin/billing/projects").json() == []
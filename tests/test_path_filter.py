@@ -0,0 +1,99 @@
+"""Test compiled include/exclude path matching."""
+
+import fnmatch
+
+from patchpanda.gateway.models import config as config_models
+from patchpanda.gateway.services.effective_config import EffectiveConfig
+from patchpanda.gateway.services.path_filter import PathFilter, PathMatcher
+
+PATHS = [
+    "README.md",
+    "setup.py",
+    "docs/index.md",
+    "docs/api/client.rst",
+    "src/app/main.py",
+    "src/app/models/user.py",
+    "src/app/static/app.js",
+    "tests/test_main.py",
+    "tests/unit/test_user.py",
+    "vendor/lib/module.py",
+    "pkg/a.py",
+    "pkg/b.pyc",
+    "a[1].txt",
+]
+
+PATTERNS = [
+    "README.md",
+    "docs/*",
+    "*.js",
+    "src/**/*.py",
+    "tests/test_?ain.py",
+    "**/unit/*",
+    "pkg/[ab].py",
+    "*/lib/*.py",
+    "[!s]*.py",
+    "a[[]1].txt",
+]
+
+
+class TestPathMatcher:
+    """Test the matcher agrees with fnmatch."""
+
+    def test_each_pattern_matches_like_fnmatch(self):
+        """Test every pattern shape on its own."""
+        for pattern in PATTERNS:
+            matcher = PathMatcher([pattern])
+            for path in PATHS:
+                assert matcher(path) == fnmatch.fnmatchcase(path, pattern), (pattern, path)
+
+    def test_combined_patterns_match_like_fnmatch(self):
+        """Test the combined matcher agrees with trying each pattern in turn."""
+        matcher = PathMatcher(PATTERNS)
+
+        for path in PATHS:
+            assert matcher(path) == any(fnmatch.fnmatchcase(path, pattern) for pattern in PATTERNS), path
+
+    def test_empty(self):
+        """Test an empty matcher matches nothing."""
+        matcher = PathMatcher([])
+
+        assert not matcher
+        assert not matcher("src/app/main.py")
+
+    def test_duplicates_removed(self):
+        """Test duplicate patterns are compiled once."""
+        assert PathMatcher(["*.py", "docs/*", "*.py"]).patterns == ("*.py", "docs/*")
+
+
+class TestPathFilter:
+    """Test include and exclude patterns together."""
+
+    def test_include_and_exclude(self):
+        """Test a path must be included and not excluded."""
+        path_filter = PathFilter(include=["src/**", "tests/**"], exclude=["**/models/*"])
+
+        assert list(path_filter.filter(PATHS)) == [
+            "src/app/main.py", "src/app/static/app.js", "tests/test_main.py", "tests/unit/test_user.py",
+        ]
+
+    def test_no_include_patterns(self):
+        """Test everything not excluded passes without include patterns."""
+        path_filter = PathFilter(exclude=["docs/*"])
+
+        assert path_filter("setup.py")
+        assert not path_filter("docs/index.md")
+
+    def test_cached_on_effective_config(self):
+        """Test the filters are compiled once per effective config."""
+        defaults = config_models.TestbotConfig().model_dump(exclude_unset=True)
+        config = EffectiveConfig(
+            **defaults, include_patterns=("src/*",), exclude_patterns=("*.js",), coverage_exclude=("*/models/*",),
+            version="-|-",
+        )
+
+        assert config.path_filter is config.path_filter
+        assert config.path_filter("src/app/models/user.py")
+        assert not config.path_filter("src/app/static/app.js")
+        assert config.coverage_filter("src/app/static/app.js")
+        assert not config.coverage_filter("src/app/models/user.py")
+        assert "path_filter" not in config.model_dump()
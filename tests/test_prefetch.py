@@ -0,0 +1,135 @@
+"""Test the pull request prefetch."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from patchpanda.gateway.models.events import PullRequestEvent
+from patchpanda.gateway.services.prefetch import PullRequestPrefetcher
+from patchpanda.gateway.services.rate_limit import RequestPriority
+from patchpanda.gateway.services.resilience import AdaptiveLimiter, CallGuard, time_remaining
+
+HEAD = "a" * 40
+
+
+def event(number=42, head_sha=HEAD):
+    """A synchronize event for octo/repo."""
+    return PullRequestEvent(
+        action="synchronize", installation_id=1, owner="Octo", repo="repo", number=number,
+        head_sha=head_sha, head_ref="feature", base_sha="b" * 40,
+    )
+
+
+def prefetcher(call_guard=None, **kwargs):
+    """A prefetcher with mocked token and config lookups."""
+    github_app = Mock(call_guard=call_guard, get_installation_token=AsyncMock(return_value="token"))
+    effective_config = Mock(resolve=AsyncMock())
+    return PullRequestPrefetcher(github_app, effective_config, **kwargs)
+
+
+async def drain(prefetch):
+    """Wait for every started prefetch."""
+    await asyncio.gather(*list(prefetch._tasks))
+
+
+class TestPullRequestPrefetcher:
+    """Test warming, bounds and shedding."""
+
+    @pytest.mark.asyncio
+    async def test_warms_token_head_and_config(self):
+        """Test the token and config are fetched in the background and the head is remembered."""
+        prefetch = prefetcher()
+
+        assert prefetch.offer(event())
+        await drain(prefetch)
+
+        prefetch.github_app_service.get_installation_token.assert_awaited_once_with(1)
+        prefetch.effective_config.resolve.assert_awaited_once_with(
+            "Octo", "repo", HEAD, 1, RequestPriority.BACKGROUND
+        )
+        assert prefetch.head("octo", "Repo", 42).head_sha == HEAD
+        assert prefetch.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bounded(self):
+        """Test prefetches beyond the running and pending bounds are dropped."""
+        prefetch = prefetcher(max_concurrency=1, max_pending=1)
+        release = asyncio.Event()
+
+        async def resolve(*args):
+            await release.wait()
+
+        prefetch.effective_config.resolve.side_effect = resolve
+
+        offered = [prefetch.offer(event(number)) for number in (1, 2, 3)]
+        await asyncio.sleep(0.01)
+
+        assert prefetch.effective_config.resolve.await_count == 1
+        release.set()
+        await drain(prefetch)
+        assert prefetch.effective_config.resolve.await_count == 2
+        assert offered == [True, True, False]
+        assert prefetch.stats()["dropped"] == 1
+        # The head of a dropped prefetch is still remembered
+        assert prefetch.head("octo", "repo", 3).head_sha == HEAD
+
+    @pytest.mark.asyncio
+    async def test_dropped_when_github_saturated(self):
+        """Test no prefetch starts while GitHub calls are waiting for a slot."""
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=2)
+        prefetch = prefetcher(call_guard=CallGuard(limiter))
+        await limiter.acquire()
+        await limiter.acquire()
+
+        assert not prefetch.offer(event())
+        limiter.release()
+        assert prefetch.offer(event())
+        await drain(prefetch)
+
+    @pytest.mark.asyncio
+    async def test_runs_under_own_deadline(self):
+        """Test a prefetch gives up after its timeout and failures are swallowed."""
+        prefetch = prefetcher(timeout=5.0)
+        remaining = []
+
+        async def resolve(*args):
+            remaining.append(time_remaining())
+            raise RuntimeError("boom")
+
+        prefetch.effective_config.resolve.side_effect = resolve
+        prefetch.offer(event())
+        await drain(prefetch)
+
+        assert 0 < remaining[0] <= 5.0
+        assert prefetch.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop(self):
+        """Test stop cancels running prefetches."""
+        prefetch = prefetcher()
+        started = asyncio.Event()
+
+        async def resolve(*args):
+            started.set()
+            await asyncio.Event().wait()
+
+        prefetch.effective_config.resolve.side_effect = resolve
+        prefetch.offer(event())
+        await started.wait()
+
+        await prefetch.stop()
+
+        assert prefetch.stats()["pending"] == 0
+
+    def test_head_expires(self):
+        """Test remembered heads expire after the head TTL."""
+        prefetch = prefetcher(head_ttl=0.0, max_concurrency=0, max_pending=0)
+
+        prefetch.offer(event())
+
+        assert prefetch.head("octo", "repo", 42) is None
+
+    def test_incomplete_event_ignored(self):
+        """Test events without the fields a prefetch needs are ignored."""
+        assert not prefetcher().offer(PullRequestEvent(action="opened", number=42))
@@ -0,0 +1,185 @@
+"""Test GitHub API rate-limit scheduling."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from patchpanda.gateway.services.rate_limit import (
+    RateLimitExceeded,
+    RateLimitScheduler,
+    RequestPriority,
+    app_budget,
+    installation_budget,
+    rate_limit_resource,
+)
+
+KEY = installation_budget(1, "/repos/octo/repo")
+
+
+def headers(remaining: int, limit: int = 100, reset_in: float = 3600) -> dict:
+    return {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(time.time() + reset_in),
+    }
+
+
+async def observe(scheduler: RateLimitScheduler, key, status_code: int, response_headers: dict):
+    """Run one request through the scheduler and record its response."""
+    await scheduler.acquire(key, RequestPriority.INTERACTIVE)
+    return scheduler.release(key, status_code, response_headers)
+
+
+class TestBudgetKeys:
+    """Test how endpoints map to budgets."""
+
+    def test_resources(self):
+        """Test GraphQL and search are metered separately from REST."""
+        assert rate_limit_resource("/repos/octo/repo/pulls/1") == "core"
+        assert rate_limit_resource("/graphql") == "graphql"
+        assert rate_limit_resource("/search/code?q=x") == "search"
+        assert rate_limit_resource("https://ghe.example.com/api/v3/search/code?q=x") == "search"
+        assert rate_limit_resource("https://api.github.com/repositories/1/pulls?page=2") == "core"
+
+    def test_installation_and_app_budgets(self):
+        """Test installation and app JWT calls use separate budgets."""
+        assert installation_budget(1, "/repos/a/b") != installation_budget(2, "/repos/a/b")
+        assert app_budget("/app/installations/1/access_tokens") == ("app", None, "core")
+
+
+class TestRateLimitScheduler:
+    """Test budget tracking, priorities and Retry-After."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_budget_starts_immediately(self):
+        """Test requests start at once before any headers are seen."""
+        scheduler = RateLimitScheduler()
+
+        await asyncio.wait_for(scheduler.acquire(KEY, RequestPriority.BACKGROUND), 0.1)
+
+        assert scheduler.stats()["started"]["background"] == 1
+
+    @pytest.mark.asyncio
+    async def test_low_budget_rejects_background_first(self):
+        """Test background calls stop while interactive calls still go through."""
+        scheduler = RateLimitScheduler(normal_reserve=0.05, background_reserve=0.2, max_wait=1.0)
+        await observe(scheduler, KEY, 200, headers(remaining=10))
+
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await scheduler.acquire(KEY, RequestPriority.BACKGROUND)
+        await asyncio.wait_for(scheduler.acquire(KEY, RequestPriority.INTERACTIVE), 0.1)
+
+        assert exc_info.value.retry_after > 3000
+        assert scheduler.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_low_budget_paces_normal_calls(self):
+        """Test normal calls are spread over the time left until the reset."""
+        scheduler = RateLimitScheduler(normal_reserve=0.0, background_reserve=0.5, max_wait=5.0)
+        await observe(scheduler, KEY, 200, headers(remaining=10, reset_in=1.0))
+
+        started = time.monotonic()
+        await scheduler.acquire(KEY, RequestPriority.NORMAL)
+        scheduler.release(KEY)
+        await scheduler.acquire(KEY, RequestPriority.NORMAL)
+
+        # Ten calls left over one second: about 0.1s apart
+        assert time.monotonic() - started >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_retry_after_holds_budget(self):
+        """Test a secondary rate limit holds every request until it lifts."""
+        scheduler = RateLimitScheduler()
+
+        delay = await observe(scheduler, KEY, 403, {"retry-after": "0.2"})
+        started = time.monotonic()
+        await scheduler.acquire(KEY, RequestPriority.INTERACTIVE)
+
+        assert delay == 0.2
+        assert time.monotonic() - started >= 0.15
+        assert scheduler.stats()["secondary_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget(self):
+        """Test a 403 with no remaining budget waits for the reset."""
+        scheduler = RateLimitScheduler(max_wait=1.0)
+
+        delay = await observe(scheduler, KEY, 403, headers(remaining=0, reset_in=600))
+
+        assert delay > 590
+        assert scheduler.stats()["rate_limited"] == 1
+        with pytest.raises(RateLimitExceeded):
+            await scheduler.acquire(KEY, RequestPriority.INTERACTIVE)
+
+    @pytest.mark.asyncio
+    async def test_permission_denied_is_not_rate_limited(self):
+        """Test a plain 403 with budget left does not hold the budget."""
+        scheduler = RateLimitScheduler()
+
+        assert await observe(scheduler, KEY, 403, headers(remaining=50)) is None
+        assert scheduler.stats()["blocked"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiters_start_in_priority_order(self):
+        """Test interactive requests go ahead of queued background work."""
+        scheduler = RateLimitScheduler()
+        await observe(scheduler, KEY, 429, {"retry-after": "0.1"})
+        order = []
+
+        async def request(priority):
+            await scheduler.acquire(KEY, priority)
+            order.append(priority)
+            scheduler.release(KEY)
+
+        background = asyncio.create_task(request(RequestPriority.BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request(RequestPriority.INTERACTIVE))
+        await asyncio.gather(background, interactive)
+
+        assert order == [RequestPriority.INTERACTIVE, RequestPriority.BACKGROUND]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        """Test a cancelled request does not keep its place or a slot."""
+        scheduler = RateLimitScheduler()
+        await observe(scheduler, KEY, 429, {"retry-after": "0.1"})
+
+        waiter = asyncio.create_task(scheduler.acquire(KEY, RequestPriority.NORMAL))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(scheduler.acquire(KEY, RequestPriority.NORMAL), 1.0)
+
+        assert scheduler._budgets[KEY].in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_slot_granted_as_wait_expires_is_released(self):
+        """Test a start handed over just as the wait timed out is given back."""
+        scheduler = RateLimitScheduler()
+        await observe(scheduler, KEY, 429, {"retry-after": "0.1"})
+
+        async def expired(future, timeout):
+            scheduler._start(scheduler._budgets[KEY], RequestPriority.NORMAL, time.time())
+            future.set_result(None)
+            raise asyncio.TimeoutError
+
+        with patch("asyncio.wait_for", expired):
+            with pytest.raises(RateLimitExceeded):
+                await scheduler.acquire(KEY, RequestPriority.NORMAL)
+
+        assert scheduler._budgets[KEY].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_stats_lists_lowest_budgets(self):
+        """Test stats report the budgets closest to exhaustion."""
+        scheduler = RateLimitScheduler()
+        await observe(scheduler, installation_budget(1, "/x"), 200, headers(remaining=90))
+        await observe(scheduler, installation_budget(2, "/x"), 200, headers(remaining=5))
+
+        lowest = scheduler.stats()["lowest"]
+
+        assert [entry["installation_id"] for entry in lowest] == [2, 1]
+        assert lowest[0]["remaining"] == 5
@@ -0,0 +1,329 @@
+"""Test adaptive concurrency, circuit breaking and deadlines."""
+
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from patchpanda.gateway.services.rate_limit import RequestPriority
+from patchpanda.gateway.services.resilience import (
+    AdaptiveLimiter,
+    CallGuard,
+    CircuitBreaker,
+    CircuitOpenError,
+    ConcurrencyLimitExceeded,
+    DeadlineExceeded,
+    deadline,
+    endpoint_class,
+    time_remaining,
+)
+
+
+def response(status_code: int = 200) -> Mock:
+    return Mock(status_code=status_code)
+
+
+class TestDeadline:
+    """Test endpoint classes and the deadline context."""
+
+    def test_endpoint_classes(self):
+        """Test endpoints are grouped by the resource they address."""
+        assert endpoint_class("/repos/octo/repo") == "repos"
+        assert endpoint_class("/repos/octo/repo/pulls/7/files") == "pulls"
+        assert endpoint_class("/repos/octo/repo/contents/.testbot.yml") == "contents"
+        assert endpoint_class("https://api.github.com/repositories/1/check-runs?page=2") == "check-runs"
+        assert endpoint_class("https://ghe.example.com/api/v3/repos/octo/repo/issues/1/comments") == "issues"
+        assert endpoint_class("https://ghe.example.com/api/graphql") == "graphql"
+        assert endpoint_class("/app/installations/1/access_tokens") == "app"
+
+    def test_nested_deadline_only_shortens(self):
+        """Test an inner deadline cannot extend the outer one."""
+        assert time_remaining() is None
+        with deadline(1.0):
+            with deadline(60.0):
+                assert time_remaining() <= 1.0
+            with deadline(0.5):
+                assert time_remaining() <= 0.5
+        assert time_remaining() is None
+
+
+class TestAdaptiveLimiter:
+    """Test the AIMD limit and its queue."""
+
+    @pytest.mark.asyncio
+    async def test_success_raises_limit_in_use(self):
+        """Test fast calls raise the limit only while it is being used."""
+        limiter = AdaptiveLimiter(initial_limit=4)
+
+        await limiter.acquire()
+        limiter.release(False)
+        assert limiter.limit == 4
+
+        for _ in range(3):
+            await limiter.acquire()
+        limiter.release(False)
+
+        assert limiter.limit == 4.25
+        assert limiter.stats()["increases"] == 1
+
+    @pytest.mark.asyncio
+    async def test_overload_cuts_limit_once_per_round(self):
+        """Test failures of calls sent under the old limit do not cut again."""
+        limiter = AdaptiveLimiter(initial_limit=20, backoff=0.5)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+
+        limiter.release(True, started)
+        limiter.release(True, started)
+        limiter.release(True, time.monotonic())
+
+        assert limiter.limit == 5
+        assert limiter.stats()["decreases"] == 2
+
+    @pytest.mark.asyncio
+    async def test_limit_never_drops_below_minimum(self):
+        """Test the limit stops at min_limit."""
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=2, backoff=0.1)
+        await limiter.acquire()
+
+        limiter.release(True, time.monotonic())
+
+        assert limiter.stats()["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_waiters_start_in_priority_order(self):
+        """Test interactive calls go ahead of queued background work."""
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        await limiter.acquire()
+        order = []
+
+        async def call(priority):
+            await limiter.acquire(priority)
+            order.append(priority)
+            limiter.release()
+
+        background = asyncio.create_task(call(RequestPriority.BACKGROUND))
+        interactive = asyncio.create_task(call(RequestPriority.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 2
+        limiter.release()
+        await asyncio.gather(background, interactive)
+
+        assert order == [RequestPriority.INTERACTIVE, RequestPriority.BACKGROUND]
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_is_bounded(self):
+        """Test a call gives up when no slot frees up in time."""
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_wait=5.0)
+        await limiter.acquire()
+
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire(timeout=0.05)
+
+        assert limiter.stats()["rejected"] == 1
+        assert limiter.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_slot_granted_as_wait_expires_is_released(self):
+        """Test a slot handed over just as the wait timed out is given back."""
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        await limiter.acquire()
+
+        async def expired(future, timeout):
+            limiter.release()
+            raise asyncio.TimeoutError
+
+        with patch("asyncio.wait_for", expired):
+            with pytest.raises(ConcurrencyLimitExceeded):
+                await limiter.acquire()
+
+        assert limiter.in_flight == 0
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens at the threshold and fails fast."""
+        breaker = CircuitBreaker("pulls", failure_threshold=3, reset_timeout=30.0)
+        for _ in range(3):
+            breaker.allow()
+            breaker.record(False)
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.allow()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert exc_info.value.retry_after > 29
+        assert breaker.stats()["short_circuited"] == 1
+
+    def test_success_resets_failures(self):
+        """Test failures must be consecutive to open the circuit."""
+        breaker = CircuitBreaker("pulls", failure_threshold=2)
+        for success in (False, True, False):
+            breaker.allow()
+            breaker.record(success)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_one_probe(self):
+        """Test a single probe after the timeout decides the state."""
+        breaker = CircuitBreaker("pulls", failure_threshold=1, reset_timeout=0.0)
+        breaker.allow()
+        breaker.record(False)
+
+        breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+        breaker.record(True)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failing probe opens the circuit again."""
+        breaker = CircuitBreaker("pulls", failure_threshold=1, reset_timeout=0.0)
+        breaker.allow()
+        breaker.record(False)
+        breaker.allow()
+        breaker.record(False)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["opened"] == 2
+
+
+class TestCallGuard:
+    """Test the guards together around a call."""
+
+    @pytest.mark.asyncio
+    async def test_skips_call_that_cannot_meet_deadline(self):
+        """Test a call usually taking 5s is skipped with 2s left."""
+        guard = CallGuard()
+        guard._endpoint("pulls").observe(5.0, guard.latency_tolerance)
+        send = Mock()
+
+        with deadline(2.0):
+            with pytest.raises(DeadlineExceeded) as exc_info:
+                await guard.run("/repos/octo/repo/pulls/7", RequestPriority.NORMAL, send)
+            # Cheaper endpoint classes still go through
+            await guard.run("/repos/octo/repo", RequestPriority.NORMAL, self.respond())
+
+        send.assert_not_called()
+        assert exc_info.value.expected == 5.0
+        assert guard.stats()["deadline_skipped"] == 1
+        assert guard.limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_send_gets_time_left(self):
+        """Test the call is given the remaining budget as its timeout."""
+        guard = CallGuard()
+        timeouts = []
+
+        async def send(remaining):
+            timeouts.append(remaining)
+            return response()
+
+        await guard.run("/repos/octo/repo", RequestPriority.NORMAL, send)
+        with deadline(3.0):
+            await guard.run("/repos/octo/repo", RequestPriority.NORMAL, send)
+
+        assert timeouts[0] is None
+        assert 2.5 < timeouts[1] <= 3.0
+
+    @pytest.mark.asyncio
+    async def test_server_errors_open_circuit_per_class(self):
+        """Test 5xx responses open only their endpoint class's circuit."""
+        guard = CallGuard(AdaptiveLimiter(initial_limit=10, backoff=0.5), failure_threshold=2)
+
+        for _ in range(2):
+            await guard.run("/repos/octo/repo/pulls/7", RequestPriority.NORMAL, self.respond(502))
+        with pytest.raises(CircuitOpenError):
+            await guard.run("/repos/octo/repo/pulls/7", RequestPriority.NORMAL, self.respond())
+        await guard.run("/repos/octo/repo/contents/x", RequestPriority.NORMAL, self.respond())
+
+        stats = guard.stats()
+        assert stats["endpoints"]["pulls"]["state"] == "open"
+        assert stats["endpoints"]["contents"]["state"] == "closed"
+        assert stats["limiter"]["limit"] < 10
+
+    @pytest.mark.asyncio
+    async def test_deadline_timeout_is_not_a_failure(self):
+        """Test a timeout caused by our own deadline leaves the circuit alone."""
+        guard = CallGuard(failure_threshold=1)
+
+        async def send(remaining):
+            await asyncio.sleep(remaining)
+            raise httpx.ReadTimeout("timed out")
+
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await guard.run("/repos/octo/repo", RequestPriority.NORMAL, send)
+
+        stats = guard.stats()
+        assert stats["deadline_timeouts"] == 1
+        assert stats["endpoints"]["repos"]["state"] == "closed"
+        assert stats["limiter"]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_transport_errors_are_failures(self):
+        """Test connection errors count against the circuit."""
+        guard = CallGuard(failure_threshold=1)
+
+        async def send(remaining):
+            raise httpx.ConnectError("refused")
+
+        with pytest.raises(httpx.ConnectError):
+            await guard.run("/graphql", RequestPriority.NORMAL, send)
+
+        assert guard.stats()["endpoints"]["graphql"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_sustained_slow_responses_cut_limit(self):
+        """Test one slow success is tolerated but a slower recent average counts as overload."""
+        guard = CallGuard(AdaptiveLimiter(initial_limit=10, backoff=0.5), latency_tolerance=2.0)
+        for _ in range(30):
+            guard._endpoint("repos").observe(0.001, guard.latency_tolerance)
+
+        async def send(remaining):
+            await asyncio.sleep(0.02)
+            return response()
+
+        await guard.run("/repos/octo/repo", RequestPriority.NORMAL, send)
+        assert guard.limiter.stats()["limit"] == 10
+
+        for _ in range(3):
+            await guard.run("/repos/octo/repo", RequestPriority.NORMAL, send)
+        assert guard.limiter.stats()["limit"] < 10
+        assert guard.stats()["endpoints"]["repos"]["state"] == "closed"
+
+    def test_latency_judged_per_endpoint_class(self):
+        """Test a naturally slow endpoint class is not overloaded at its usual latency."""
+        guard = CallGuard(latency_tolerance=2.0)
+        graphql, repos = guard._endpoint("graphql"), guard._endpoint("repos")
+        for _ in range(30):
+            repos.observe(0.05, guard.latency_tolerance)
+
+        assert not any([graphql.observe(1.0, guard.latency_tolerance) for _ in range(30)])
+        assert not graphql.observe(1.5, guard.latency_tolerance)
+
+    @pytest.mark.asyncio
+    async def test_throttled_response_cuts_limit(self):
+        """Test a 429 cuts the limit without counting against the circuit."""
+        guard = CallGuard(AdaptiveLimiter(initial_limit=10, backoff=0.5), failure_threshold=1)
+
+        await guard.run("/repos/octo/repo", RequestPriority.NORMAL, self.respond(429))
+
+        stats = guard.stats()
+        assert stats["limiter"]["limit"] == 5
+        assert stats["endpoints"]["repos"]["state"] == "closed"
+        assert stats["endpoints"]["repos"]["throttled"] == 1
+
+    @staticmethod
+    def respond(status_code: int = 200):
+        async def send(remaining):
+            return response(status_code)
+        return send
@@ -0,0 +1,91 @@
+"""Test webhook routing and pre-parse filters."""
+
+import json
+
+from patchpanda.gateway.services.routing import (
+    ignore_reason,
+    is_bot_command,
+    scan_action,
+    should_handle,
+)
+from patchpanda.gateway.models.events import IssueCommentEvent, PullRequestEvent, PushEvent
+
+
+def _body(payload):
+    return json.dumps(payload).encode()
+
+
+class TestScanAction:
+    """Test reading the action from the raw body."""
+
+    def test_action_first_key(self):
+        """Test the action is read from the body prefix."""
+        assert scan_action(_body({"action": "opened", "number": 1})) == "opened"
+        assert scan_action(b'  {\n  "action" : "synchronize"}') == "synchronize"
+
+    def test_action_not_first_key(self):
+        """Test bodies without a leading action are left to the decoder."""
+        assert scan_action(_body({"number": 1, "action": "opened"})) is None
+        assert scan_action(b"invalid json") is None
+        assert scan_action(b"") is None
+
+
+class TestIgnoreReason:
+    """Test early rejection from the event header and body prefix."""
+
+    def test_unhandled_event(self):
+        """Test events outside the routing table are ignored."""
+        assert ignore_reason("release", b"{}") == "event"
+        assert ignore_reason(None, b"{}") == "event"
+
+    def test_unhandled_action(self):
+        """Test actions outside the routing table are ignored."""
+        assert ignore_reason("pull_request", _body({"action": "labeled"})) == "action"
+        assert ignore_reason("pull_request", _body({"action": "closed"})) == "action"
+        assert ignore_reason("issue_comment", _body({"action": "deleted"})) == "action"
+
+    def test_handled_action(self):
+        """Test routed actions are processed."""
+        assert ignore_reason("pull_request", _body({"action": "synchronize"})) is None
+
+    def test_comment_without_command(self):
+        """Test comments that cannot hold a command are ignored."""
+        body = _body({"action": "created", "comment": {"body": "LGTM"}})
+        assert ignore_reason("issue_comment", body) == "not_a_command"
+
+    def test_comment_with_command(self):
+        """Test comments mentioning the command are decoded, including escaped slashes."""
+        body = _body({"action": "created", "comment": {"body": "/patchpanda generate"}})
+        assert ignore_reason("issue_comment", body) is None
+        escaped = b'{"action": "created", "comment": {"body": "\\/patchpanda generate"}}'
+        assert ignore_reason("issue_comment", escaped) is None
+
+    def test_push_without_config_change(self):
+        """Test pushes are only decoded when they may touch the config file."""
+        assert ignore_reason("push", _body({"ref": "refs/heads/main", "commits": []})) == "not_a_config_change"
+        assert ignore_reason("push", _body({"ref": "refs/heads/main", "commits": [{"modified": [".testbot.yml"]}]})) is None
+        assert ignore_reason("push", b'{"ref": "refs/heads/main", "forced": true}') is None
+
+    def test_unknown_action_is_processed(self):
+        """Test bodies without a leading action are never rejected early."""
+        assert ignore_reason("pull_request", _body({"number": 1})) is None
+
+
+class TestShouldHandle:
+    """Test filtering of decoded events."""
+
+    def test_bot_command(self):
+        """Test the command must start the comment."""
+        assert is_bot_command("  /patchpanda generate")
+        assert not is_bot_command("please run /patchpanda")
+        assert not is_bot_command(None)
+
+    def test_events(self):
+        """Test decoded events are checked against the routing table."""
+        assert should_handle(PullRequestEvent(action="opened"))
+        assert not should_handle(PullRequestEvent(action="labeled"))
+        assert should_handle(IssueCommentEvent(action="created", comment_body="/patchpanda generate"))
+        assert not should_handle(IssueCommentEvent(action="created", comment_body="LGTM"))
+        assert should_handle(PushEvent(config_changed=True))
+        assert not should_handle(PushEvent())
+        assert not should_handle(None)
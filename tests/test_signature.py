@@ -0,0 +1,92 @@
+"""Test webhook signature verification."""
+
+import pytest
+from unittest.mock import patch
+
+from patchpanda.gateway.security import signature
+from patchpanda.gateway.security.signature import (
+    PayloadTooLargeError,
+    generate_webhook_signature,
+    new_webhook_hmac,
+    read_signed_body,
+    verify_webhook_signature,
+)
+from patchpanda.gateway.settings import Settings
+
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def webhook_secret():
+    """Configure a webhook secret."""
+    with patch.object(signature, "get_settings", return_value=Settings(github_webhook_secret=SECRET)):
+        yield SECRET
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+class TestVerifyWebhookSignature:
+    """Test signature checks on buffered payloads."""
+
+    def test_valid_signature(self, webhook_secret):
+        """Test a correct signature is accepted for bytes and str payloads."""
+        header = generate_webhook_signature(b'{"a": 1}', webhook_secret)
+
+        assert verify_webhook_signature(b'{"a": 1}', header)
+        assert verify_webhook_signature('{"a": 1}', header)
+
+    def test_invalid_signature(self, webhook_secret):
+        """Test wrong, malformed and missing signatures are rejected."""
+        assert not verify_webhook_signature(b"{}", generate_webhook_signature(b"{}", "other"))
+        assert not verify_webhook_signature(b"{}", "sha1=abc")
+        assert not verify_webhook_signature(b"{}", None)
+
+    def test_missing_secret(self):
+        """Test nothing verifies without a configured secret."""
+        with patch.object(signature, "get_settings", return_value=Settings(github_webhook_secret="")):
+            assert new_webhook_hmac() is None
+            assert not verify_webhook_signature(b"{}", generate_webhook_signature(b"{}", ""))
+
+    def test_keyed_context_is_reused(self, webhook_secret):
+        """Test the keyed HMAC is built once and copied per call."""
+        signature._keyed_hmac.cache_clear()
+
+        first = new_webhook_hmac()
+        second = new_webhook_hmac()
+
+        assert first is not second
+        assert signature._keyed_hmac.cache_info().misses == 1
+        assert signature._keyed_hmac.cache_info().hits == 1
+
+    def test_secret_rotation(self, webhook_secret):
+        """Test a changed secret gets its own keyed context."""
+        header = generate_webhook_signature(b"{}", "rotated")
+        assert not verify_webhook_signature(b"{}", header)
+
+        with patch.object(signature, "get_settings", return_value=Settings(github_webhook_secret="rotated")):
+            assert verify_webhook_signature(b"{}", header)
+
+
+class TestReadSignedBody:
+    """Test streaming verification."""
+
+    @pytest.mark.asyncio
+    async def test_streamed_digest_matches(self, webhook_secret):
+        """Test the incremental digest equals the buffered one."""
+        body, mac = await read_signed_body(_chunks(b'{"action": ', b'"opened"}'), max_bytes=1024)
+
+        assert body == b'{"action": "opened"}'
+        assert verify_webhook_signature(body, generate_webhook_signature(bytes(body), webhook_secret), mac=mac)
+
+    @pytest.mark.asyncio
+    async def test_size_limit(self, webhook_secret):
+        """Test reading stops once the limit is exceeded."""
+        with pytest.raises(PayloadTooLargeError):
+            await read_signed_body(_chunks(b"x" * 600, b"x" * 600), max_bytes=1024)
+
+        body, _ = await read_signed_body(_chunks(b"x" * 512, b"x" * 512), max_bytes=1024)
+        assert len(body) == 1024
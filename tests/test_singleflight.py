@@ -0,0 +1,129 @@
+"""Test in-flight call sharing."""
+
+import asyncio
+
+import pytest
+
+from patchpanda.gateway.services.resilience import deadline, time_remaining
+from patchpanda.gateway.services.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test sharing, timeouts and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_call(self):
+        """Test callers with the same key share one call."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(10)))
+
+        assert results == [1] * 10
+        assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 9, "timeouts": 0, "abandoned": 0}
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_not_shared(self):
+        """Test a finished call is not reused, so results never go stale."""
+        flight = SingleFlight()
+        fetch = iter([1, 2])
+
+        async def call():
+            return next(fetch)
+
+        assert await flight.do("k", call) == 1
+        assert await flight.do("k", call) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failed call raises for all callers."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test a stuck call times out and frees its key."""
+        flight = SingleFlight(timeout=0.01)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("k", lambda: asyncio.sleep(1))
+
+        assert flight.stats()["timeouts"] == 1
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_call_runs_without_caller_deadline(self):
+        """Test the first caller's deadline neither bounds the call nor the other callers."""
+        flight = SingleFlight()
+        seen = []
+
+        async def fetch():
+            seen.append(time_remaining())
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def hurried():
+            with deadline(0.01):
+                return await flight.do("k", fetch)
+
+        results = await asyncio.gather(hurried(), flight.do("k", fetch), return_exceptions=True)
+
+        assert seen == [None]
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_leaves_call_running(self):
+        """Test cancelling one caller does not cancel the call for the others."""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "ok"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_last_caller_cancelled_stops_call(self):
+        """Test the call is cancelled once nobody waits for it."""
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(flight.do("k", fetch))
+        await started.wait()
+        caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        assert flight.stats()["abandoned"] == 1
+        assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,244 @@
+"""Test the installation access token cache."""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+
+from patchpanda.gateway.services.resilience import deadline, time_remaining
+from patchpanda.gateway.services.token_cache import (
+    InstallationToken,
+    InstallationTokenCache,
+    fernet_from_secret,
+)
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in for GET/SET NX/DEL and the lock release script."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, value):
+        # Compare-and-delete, the only script the cache runs
+        if self.data.get(key) == value.encode():
+            del self.data[key]
+            return 1
+        return 0
+
+
+def token(name="ghs_token", ttl=3600):
+    """A token expiring in ``ttl`` seconds."""
+    return InstallationToken(name, time.time() + ttl)
+
+
+@pytest.fixture
+def cipher():
+    """Token encryption cipher."""
+    return fernet_from_secret("test-secret-key")
+
+
+class TestInstallationTokenCache:
+    """Test caching, refresh and single-flight exchange."""
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self, cipher):
+        """Test 200 concurrent misses trigger exactly one exchange."""
+        async def exchange(installation_id):
+            await asyncio.sleep(0.01)
+            return token()
+
+        exchange = AsyncMock(side_effect=exchange)
+        cache = InstallationTokenCache(exchange, cipher)
+
+        tokens = await asyncio.gather(*(cache.get(1) for _ in range(200)))
+
+        assert set(tokens) == {"ghs_token"}
+        exchange.assert_awaited_once_with(1)
+        assert cache.stats()["exchanges"] == 1
+
+    @pytest.mark.asyncio
+    async def test_proactive_refresh(self, cipher):
+        """Test a token near expiry is served while a refresh runs in the background."""
+        exchange = AsyncMock(side_effect=[token("old", ttl=120), token("new")])
+        cache = InstallationTokenCache(exchange, cipher, refresh_margin=300)
+
+        assert await cache.get(1) == "old"
+        # Within the refresh margin: still served, refresh started once
+        assert await cache.get(1) == "old"
+        assert await cache.get(1) == "old"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert await cache.get(1) == "new"
+        assert exchange.await_count == 2
+        assert cache.stats()["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_token_is_exchanged(self, cipher):
+        """Test expired tokens are never served."""
+        exchange = AsyncMock(side_effect=[token("old", ttl=-1), token("new")])
+        cache = InstallationTokenCache(exchange, cipher)
+
+        assert await cache.get(1) == "old"
+        assert await cache.get(1) == "new"
+
+    @pytest.mark.asyncio
+    async def test_shared_through_redis_encrypted(self, cipher):
+        """Test replicas share tokens through Redis without storing them in plaintext."""
+        redis = FakeRedis()
+        first = InstallationTokenCache(AsyncMock(return_value=token("ghs_secret")), cipher, redis_client=redis)
+        second_exchange = AsyncMock()
+        second = InstallationTokenCache(second_exchange, cipher, redis_client=redis)
+
+        assert await first.get(1) == "ghs_secret"
+        assert await second.get(1) == "ghs_secret"
+
+        second_exchange.assert_not_called()
+        assert second.stats()["redis_hits"] == 1
+        stored = redis.data["patchpanda:installation-token:1"]
+        assert b"ghs_secret" not in stored
+        assert "patchpanda:installation-token:1:lock" not in redis.data
+
+    @pytest.mark.asyncio
+    async def test_foreign_key_is_ignored(self, cipher):
+        """Test entries encrypted with another key are treated as misses."""
+        redis = FakeRedis()
+        other = InstallationTokenCache(AsyncMock(return_value=token("a")), fernet_from_secret("old"), redis_client=redis)
+        await other.get(1)
+
+        exchange = AsyncMock(return_value=token("b"))
+        cache = InstallationTokenCache(exchange, cipher, redis_client=redis)
+
+        assert await cache.get(1) == "b"
+        exchange.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_replica(self, cipher):
+        """Test a replica that loses the lock picks up the winner's token."""
+        redis = FakeRedis()
+        redis.data["patchpanda:installation-token:1:lock"] = b"1"
+        exchange = AsyncMock()
+        cache = InstallationTokenCache(exchange, cipher, redis_client=redis, lock_timeout=1.0)
+
+        async def other_replica():
+            await asyncio.sleep(0.1)
+            await InstallationTokenCache(AsyncMock(), cipher, redis_client=redis)._store(1, token("theirs"))
+
+        result, _ = await asyncio.gather(cache.get(1), other_replica())
+
+        assert result == "theirs"
+        exchange.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lock_taken_over_is_not_released(self, cipher):
+        """Test a replica whose lock expired mid-exchange leaves the new holder's lock alone."""
+        redis = FakeRedis()
+        lock_key = "patchpanda:installation-token:1:lock"
+
+        async def slow_exchange(installation_id):
+            # The lock expires and another replica takes it
+            redis.data[lock_key] = b"theirs"
+            return token()
+
+        cache = InstallationTokenCache(slow_exchange, cipher, redis_client=redis)
+
+        assert await cache.get(1) == "ghs_token"
+        assert redis.data[lock_key] == b"theirs"
+
+    @pytest.mark.asyncio
+    async def test_bounded_in_process(self, cipher):
+        """Test the least recently used installations are dropped beyond max_entries."""
+        cache = InstallationTokenCache(AsyncMock(return_value=token()), cipher, max_entries=2)
+
+        await cache.get(1)
+        await cache.get(2)
+        await cache.get(1)
+        await cache.get(3)
+
+        assert list(cache._tokens) == [1, 3]
+        assert cache.stats()["installations"] == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_tokens_evicted(self, cipher):
+        """Test expired tokens do not stay in process."""
+        cache = InstallationTokenCache(AsyncMock(side_effect=[token(ttl=-1), token()]), cipher)
+
+        await cache.get(1)
+        await cache.get(2)
+
+        assert list(cache._tokens) == [2]
+
+    @pytest.mark.asyncio
+    async def test_exchange_runs_without_caller_deadline(self, cipher):
+        """Test a shared exchange does not inherit the deadline of the caller that started it."""
+        seen = []
+
+        async def exchange(installation_id):
+            seen.append(time_remaining())
+            await asyncio.sleep(0.05)
+            return token()
+
+        cache = InstallationTokenCache(exchange, cipher)
+
+        async def hurried():
+            with deadline(0.01):
+                return await cache.get(1)
+
+        results = await asyncio.gather(hurried(), cache.get(1), return_exceptions=True)
+
+        assert seen == [None]
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1] == "ghs_token"
+
+    @pytest.mark.asyncio
+    async def test_exchange_error(self, cipher):
+        """Test exchange failures reach every waiter and are retried next time."""
+        exchange = AsyncMock(side_effect=[RuntimeError("boom"), token()])
+        cache = InstallationTokenCache(exchange, cipher)
+
+        results = await asyncio.gather(cache.get(1), cache.get(1), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        assert await cache.get(1) == "ghs_token"
+        assert cache.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_shared_token(self, cipher):
+        """Test a rejected token is dropped from Redis so no replica reloads it."""
+        redis = FakeRedis()
+        cache = InstallationTokenCache(AsyncMock(side_effect=[token("stale"), token("fresh")]), cipher, redis_client=redis)
+        other = InstallationTokenCache(AsyncMock(), cipher, redis_client=redis)
+        assert await cache.get(1) == "stale"
+
+        await cache.invalidate(1, "stale")
+
+        assert "patchpanda:installation-token:1" not in redis.data
+        assert await cache.get(1) == "fresh"
+        assert await other.get(1) == "fresh"
+        other.exchange.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_keeps_newer_token(self, cipher):
+        """Test a late invalidation does not drop a token another replica already replaced."""
+        redis = FakeRedis()
+        cache = InstallationTokenCache(AsyncMock(return_value=token("stale")), cipher, redis_client=redis)
+        await cache.get(1)
+        await InstallationTokenCache(AsyncMock(), cipher, redis_client=redis)._store(1, token("fresh"))
+
+        await cache.invalidate(1, "stale")
+
+        assert await cache.get(1) == "fresh"
+        cache.exchange.assert_awaited_once()
@@ -1,11 +1,29 @@
 """Test webhook endpoints."""
 
+import json
+
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 
-from patchpanda.gateway.api.webhooks import router, handle_issue_comment, handle_pull_request
+from patchpanda.gateway.api.webhooks import (
+    handle_issue_comment,
+    handle_pull_request,
+    process_inbox_item,
+    router,
+)
+from patchpanda.gateway.models.events import IssueCommentEvent, PullRequestEvent
+from patchpanda.gateway.security.signature import generate_webhook_signature
+from patchpanda.gateway.services.admission import AdmissionController
+from patchpanda.gateway.services.changed_files import ChangedFiles
+from patchpanda.gateway.services.container import ServiceContainer
+from patchpanda.gateway.services.dedup import DeliveryDeduplicator
+from patchpanda.gateway.services.effective_config import ConfigUnavailable, EffectiveConfig
+from patchpanda.gateway.services.graphql import PullRequestContext, PullRequestHeadMoved
+from patchpanda.gateway.services.inbox import InboxItem
+from patchpanda.gateway.services.prefetch import PullRequestHead
+from patchpanda.gateway.settings import Settings
 
 
 @pytest.fixture
@@ -64,7 +82,7 @@ class TestWebhookEndpoints:
         payload = {
             "action": "created",
             "issue": {"number": 42},
-            "comment": {"body": "test comment"}
+            "comment": {"body": "/patchpanda generate"}
         }
 
         with patch('patchpanda.gateway.api.webhooks.handle_issue_comment', new_callable=AsyncMock) as mock_handler:
@@ -117,6 +135,272 @@ class TestWebhookEndpoints:
         assert response.status_code == 200
         assert response.json() == {"status": "acknowledged"}
 
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_inbox_mode(self, mock_verify, app, client):
+        """Test webhook is persisted to the inbox and acknowledged with 202."""
+        mock_verify.return_value = True
+        app.state.webhook_inbox = Mock(put=AsyncMock(return_value="inbox-id"))
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            response = client.post("/webhooks/github", content=b'{"action": "opened"}', headers=headers)
+
+            assert response.status_code == 202
+            assert response.json() == {"status": "accepted"}
+            app.state.webhook_inbox.put.assert_awaited_once_with(
+                "pull_request", b'{"action": "opened"}', "test-delivery"
+            )
+            mock_handler.assert_not_called()
+
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_duplicate_delivery(self, mock_verify, app, client):
+        """Test redelivered webhooks are short-circuited before parsing."""
+        mock_verify.return_value = True
+        app.state.webhook_dedup = DeliveryDeduplicator()
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            mock_handler.return_value = {"status": "pr_processed"}
+
+            first = client.post("/webhooks/github", json={"action": "opened"}, headers=headers)
+            second = client.post("/webhooks/github", content=b"not even json", headers=headers)
+
+            assert first.status_code == 200
+            assert second.status_code == 200
+            assert second.json() == {"status": "duplicate"}
+            mock_handler.assert_called_once()
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_failed_delivery_can_be_redelivered(self, mock_verify, app):
+        """Test a delivery whose handler failed is not treated as a duplicate."""
+        mock_verify.return_value = True
+        app.state.webhook_dedup = DeliveryDeduplicator()
+        client = TestClient(app, raise_server_exceptions=False)
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            mock_handler.side_effect = [RuntimeError("boom"), {"status": "pr_processed"}]
+
+            payload = {"action": "opened"}
+            assert client.post("/webhooks/github", json=payload, headers=headers).status_code == 500
+            assert client.post("/webhooks/github", json=payload, headers=headers).status_code == 200
+            assert mock_handler.call_count == 2
+
+
+    @pytest.mark.parametrize("event,payload", [
+        ("push", {"ref": "refs/heads/main"}),
+        ("pull_request", {"action": "labeled", "pull_request": {"number": 42}}),
+        ("issue_comment", {"action": "deleted", "comment": {"body": "/patchpanda generate"}}),
+        ("issue_comment", {"action": "created", "comment": {"body": "looks good"}}),
+    ])
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_ignored_without_decoding(self, mock_verify, event, payload, client):
+        """Test ignored events, actions and comments are acknowledged before decoding."""
+        mock_verify.return_value = True
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": event,
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.api.webhooks.decode_event') as mock_decode:
+            response = client.post("/webhooks/github", json=payload, headers=headers)
+
+            assert response.status_code == 200
+            assert response.json() == {"status": "acknowledged"}
+            mock_decode.assert_not_called()
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_ignored_after_decoding(self, mock_verify, client):
+        """Test deliveries the prefix scan cannot classify are filtered once decoded."""
+        mock_verify.return_value = True
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "issue_comment",
+            "x-github-delivery": "test-delivery"
+        }
+
+        # "action" is not the first key, so the scan defers to decoding
+        payload = {"comment": {"body": "see /patchpanda docs"}, "action": "created"}
+
+        with patch('patchpanda.gateway.api.webhooks.handle_issue_comment', new_callable=AsyncMock) as mock_handler:
+            response = client.post("/webhooks/github", json=payload, headers=headers)
+
+            assert response.status_code == 200
+            assert response.json() == {"status": "acknowledged"}
+            mock_handler.assert_not_called()
+
+
+    @patch('patchpanda.gateway.api.webhooks.get_settings')
+    def test_github_webhook_payload_too_large(self, mock_settings, client):
+        """Test oversized bodies are rejected with 413 before verification."""
+        mock_settings.return_value = Settings(webhook_max_body_bytes=16)
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.api.webhooks.verify_webhook_signature') as mock_verify:
+            # Known Content-Length
+            response = client.post("/webhooks/github", content=b"x" * 17, headers=headers)
+            assert response.status_code == 413
+
+            # Chunked body without Content-Length
+            response = client.post("/webhooks/github", content=iter([b"x" * 10, b"x" * 10]), headers=headers)
+            assert response.status_code == 413
+
+            mock_verify.assert_not_called()
+
+    def test_github_webhook_streamed_signature(self, client):
+        """Test a correctly signed delivery passes streaming verification."""
+        body = b'{"action": "labeled"}'
+        settings = Settings(github_webhook_secret="test-secret")
+        headers = {
+            "x-hub-signature-256": generate_webhook_signature(body, "test-secret"),
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.security.signature.get_settings', return_value=settings):
+            response = client.post("/webhooks/github", content=body, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "acknowledged"}
+
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_shed_when_saturated(self, mock_verify, app, client):
+        """Test low-priority deliveries get 503 with Retry-After when saturated."""
+        mock_verify.return_value = True
+        app.state.webhook_admission = AdmissionController(max_in_flight=1, low_priority_share=0.0, retry_after=9)
+        app.state.webhook_admission._in_flight = 1
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            response = client.post("/webhooks/github", json={"action": "reopened"}, headers=headers)
+
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "9"
+            mock_handler.assert_not_called()
+
+        app.state.webhook_admission._in_flight = 0
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            mock_handler.return_value = {"status": "pr_processed"}
+            response = client.post("/webhooks/github", json={"action": "reopened"}, headers=headers)
+
+            assert response.status_code == 200
+            assert app.state.webhook_admission.stats()["in_flight"] == 0
+
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_synchronize_coalesced(self, mock_verify, app, client):
+        """Test synchronize pushes are handed to the coalescing window."""
+        mock_verify.return_value = True
+        services = ServiceContainer()
+        services.coalescer = Mock()
+        app.state.services = services
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+        payload = {"action": "synchronize", "pull_request": {"number": 42, "head": {"sha": "a" * 40}}}
+
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            response = client.post("/webhooks/github", json=payload, headers=headers)
+
+            assert response.status_code == 202
+            assert response.json() == {"status": "debounced"}
+            services.coalescer.offer.assert_called_once()
+            assert services.coalescer.offer.call_args.args[0].head_sha == "a" * 40
+            mock_handler.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_inbox_synchronize_waits_for_flush(self):
+        """Test an inbox delivery of a debounced push fails when submitting the push fails."""
+        services = ServiceContainer()
+        services.coalescer = Mock(offer_and_wait=AsyncMock(side_effect=ConfigUnavailable("boom")))
+        payload = {"action": "synchronize", "pull_request": {"number": 42, "head": {"sha": "a" * 40}}}
+        item = InboxItem(event="pull_request", body=json.dumps(payload).encode())
+
+        with pytest.raises(ConfigUnavailable):
+            await process_inbox_item(item, services)
+
+        services.coalescer.offer.assert_not_called()
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_pull_request_prefetched(self, mock_verify, app, client):
+        """Test opened pull requests are prefetched and closed ones are not."""
+        mock_verify.return_value = True
+        services = ServiceContainer()
+        services.prefetcher = Mock()
+        app.state.services = services
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "pull_request",
+            "x-github-delivery": "test-delivery"
+        }
+        repository = {"name": "repo", "owner": {"login": "octo"}}
+
+        with patch('patchpanda.gateway.api.webhooks.handle_pull_request', new_callable=AsyncMock) as mock_handler:
+            mock_handler.return_value = {"status": "pr_processed"}
+            client.post("/webhooks/github", json={"action": "opened", "number": 42, "repository": repository}, headers=headers)
+            headers["x-github-delivery"] = "closed-delivery"
+            client.post("/webhooks/github", json={"action": "closed", "number": 42, "repository": repository}, headers=headers)
+
+        services.prefetcher.offer.assert_called_once()
+        assert services.prefetcher.offer.call_args.args[0].number == 42
+
+    @patch('patchpanda.gateway.api.webhooks.verify_webhook_signature')
+    def test_github_webhook_push_invalidates_config(self, mock_verify, app, client):
+        """Test a push touching the config file drops the branch's cached config."""
+        mock_verify.return_value = True
+        services = ServiceContainer()
+        services.effective_config = Mock(invalidate_ref=AsyncMock())
+        app.state.services = services
+
+        headers = {
+            "x-hub-signature-256": "sha256=valid",
+            "x-github-event": "push",
+            "x-github-delivery": "test-delivery"
+        }
+        payload = {
+            "ref": "refs/heads/main",
+            "commits": [{"added": [], "modified": [".testbot.yml"], "removed": []}],
+            "repository": {"name": "repo", "owner": {"login": "octo"}},
+        }
+
+        response = client.post("/webhooks/github", json=payload, headers=headers)
+
+        assert response.status_code == 200
+        services.effective_config.invalidate_ref.assert_awaited_once_with("octo", "repo", "refs/heads/main")
+
 
 class TestWebhookHandlers:
     """Test webhook event handlers."""
@@ -124,14 +408,14 @@ class TestWebhookHandlers:
     @pytest.mark.asyncio
     async def test_handle_issue_comment(self, mock_services):
         """Test issue comment handler."""
-        payload = {
-            "action": "created",
-            "issue": {"number": 42},
-            "comment": {"body": "test comment"}
-        }
+        event = IssueCommentEvent(
+            action="created",
+            number=42,
+            comment_body="test comment"
+        )
 
         result = await handle_issue_comment(
-            payload,
+            event,
             mock_services['github_app_service'],
             mock_services['auth_service'],
             mock_services['config_loader'],
@@ -147,13 +431,10 @@ class TestWebhookHandlers:
     @pytest.mark.asyncio
     async def test_handle_pull_request(self, mock_services):
         """Test pull request handler."""
-        payload = {
-            "action": "opened",
-            "pull_request": {"number": 42, "title": "Test PR"}
-        }
+        event = PullRequestEvent(action="opened", number=42)
 
         result = await handle_pull_request(
-            payload,
+            event,
             mock_services['github_app_service'],
             mock_services['auth_service'],
             mock_services['config_loader'],
@@ -167,6 +448,192 @@ class TestWebhookHandlers:
         assert '"status":"pr_processed"' in result_content.replace(' ', '')
 
 
+class TestPullRequestChangeFilter:
+    """Test test generation is skipped for pushes without relevant changes."""
+
+    @pytest.fixture
+    def event(self):
+        """A synchronize event with every field the handler needs."""
+        return PullRequestEvent(
+            action="synchronize", installation_id=1, owner="octo", repo="repo", number=42,
+            head_sha="a" * 40, head_ref="feature", base_sha="b" * 40,
+        )
+
+    @pytest.fixture
+    def effective_config(self):
+        """Resolver returning a config excluding docs."""
+        config = EffectiveConfig(exclude_patterns=("docs/*", "*.md"), version="-|-")
+        return Mock(resolve=AsyncMock(return_value=config))
+
+    async def handle(self, event, mock_services, effective_config, paths):
+        """Run the handler with the PR changing the given paths, or failing to list them."""
+        mock_services['queue_service'].enqueue_job = AsyncMock(return_value="job-id")
+        mock_services['checks_service'].create_skipped_test_generation_check = AsyncMock()
+        if isinstance(paths, Exception):
+            changed_files = Mock(get=AsyncMock(side_effect=paths))
+        else:
+            changed_files = Mock(get=AsyncMock(return_value=ChangedFiles(tuple(paths))))
+        result = await handle_pull_request(
+            event, *mock_services.values(), effective_config=effective_config, changed_files=changed_files
+        )
+        return json.loads(result.body)
+
+    @pytest.mark.asyncio
+    async def test_irrelevant_push_skipped(self, event, mock_services, effective_config):
+        """Test a docs-only push posts a neutral check instead of enqueueing."""
+        result = await self.handle(event, mock_services, effective_config, ["docs/index.md", "README.md"])
+
+        assert result == {"status": "skipped", "reason": "no_relevant_changes"}
+        mock_services['queue_service'].enqueue_job.assert_not_awaited()
+        check = mock_services['checks_service'].create_skipped_test_generation_check
+        assert check.await_args.args[:4] == ("octo", "repo", "a" * 40, 1)
+
+    @pytest.mark.asyncio
+    async def test_relevant_push_enqueued(self, event, mock_services, effective_config):
+        """Test a push touching source files enqueues a test generation job."""
+        result = await self.handle(event, mock_services, effective_config, ["README.md", "src/app.py"])
+
+        assert result == {"status": "pr_processed"}
+        job = mock_services['queue_service'].enqueue_job.await_args.args[0]
+        assert job["job_type"] == "test_generation"
+        assert job["commit_sha"] == "a" * 40
+        assert job["config"]["exclude_patterns"] == ["docs/*", "*.md"]
+        mock_services['checks_service'].create_skipped_test_generation_check.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_file_list_failure_enqueues(self, event, mock_services, effective_config):
+        """Test a failed file listing does not drop the push."""
+        result = await self.handle(event, mock_services, effective_config, RuntimeError("boom"))
+
+        assert result == {"status": "pr_processed"}
+        mock_services['queue_service'].enqueue_job.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_moved_head_enqueues(self, event, mock_services, effective_config):
+        """Test a push is not skipped on the file list of a newer head."""
+        result = await self.handle(event, mock_services, effective_config, PullRequestHeadMoved("a" * 40, "c" * 40))
+
+        assert result == {"status": "pr_processed"}
+        mock_services['queue_service'].enqueue_job.assert_awaited_once()
+        mock_services['checks_service'].create_skipped_test_generation_check.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_disabled_repository(self, event, mock_services):
+        """Test nothing is enqueued when the effective config disables the bot."""
+        disabled = Mock(resolve=AsyncMock(return_value=EffectiveConfig(enabled=False, version="-|-")))
+
+        result = await self.handle(event, mock_services, disabled, ["src/app.py"])
+
+        assert result == {"status": "disabled"}
+        mock_services['queue_service'].enqueue_job.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_test_generation_disabled(self, event, mock_services):
+        """Test nothing is enqueued when the effective config turns test generation off."""
+        disabled = Mock(resolve=AsyncMock(return_value=EffectiveConfig(test_generation=False, version="-|-")))
+
+        result = await self.handle(event, mock_services, disabled, ["src/app.py"])
+
+        assert result == {"status": "disabled"}
+        mock_services['queue_service'].enqueue_job.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_skipped_check_failure_still_skips(self, event, mock_services, effective_config):
+        """Test a failure posting the neutral check does not fail the skip."""
+        mock_services['checks_service'].create_skipped_test_generation_check = AsyncMock(
+            side_effect=RuntimeError("boom")
+        )
+
+        result = await handle_pull_request(
+            event, *mock_services.values(), effective_config=effective_config,
+            changed_files=Mock(get=AsyncMock(return_value=ChangedFiles(("README.md",)))),
+        )
+
+        assert json.loads(result.body) == {"status": "skipped", "reason": "no_relevant_changes"}
+        mock_services['queue_service'].enqueue_job.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unavailable_config_not_enqueued(self, event, mock_services):
+        """Test a push is not enqueued with defaults when its config could not be loaded."""
+        unavailable = Mock(resolve=AsyncMock(side_effect=ConfigUnavailable("boom")))
+
+        with pytest.raises(ConfigUnavailable):
+            await self.handle(event, mock_services, unavailable, ["src/app.py"])
+
+        mock_services['queue_service'].enqueue_job.assert_not_awaited()
+
+
+class TestBotCommand:
+    """Test bot commands on pull requests use the prefetched state."""
+
+    @pytest.fixture
+    def event(self):
+        """A command comment on pull request 42."""
+        return IssueCommentEvent(
+            action="created", installation_id=1, owner="octo", repo="repo", number=42,
+            comment_body="/patchpanda generate", is_pull_request=True,
+        )
+
+    @pytest.fixture
+    def effective_config(self):
+        """Resolver returning the default config."""
+        return Mock(resolve=AsyncMock(return_value=EffectiveConfig(version="-|-")))
+
+    async def handle(self, event, mock_services, effective_config, prefetcher):
+        """Run the comment handler."""
+        mock_services['queue_service'].enqueue_job = AsyncMock(return_value="job-id")
+        mock_services['github_app_service'].get_pull_request_context = AsyncMock(
+            return_value=PullRequestContext(
+                number=42, head_ref="feature", head_sha="c" * 40, base_ref="main", base_sha="b" * 40,
+                changed_files=1, head_repo="octo/repo",
+            )
+        )
+        result = await handle_issue_comment(
+            event, *mock_services.values(), effective_config=effective_config, prefetcher=prefetcher
+        )
+        return json.loads(result.body)
+
+    @pytest.mark.asyncio
+    async def test_prefetched_head(self, event, mock_services, effective_config):
+        """Test a command on a prefetched pull request enqueues without looking up the head."""
+        head = PullRequestHead(1, "a" * 40, "feature", "fork/repo", "b" * 40)
+        prefetcher = Mock(head=Mock(return_value=head))
+
+        result = await self.handle(event, mock_services, effective_config, prefetcher)
+
+        assert result == {"status": "comment_processed"}
+        prefetcher.head.assert_called_once_with("octo", "repo", 42)
+        mock_services['github_app_service'].get_pull_request_context.assert_not_awaited()
+        assert effective_config.resolve.await_args.args[:4] == ("octo", "repo", "a" * 40, 1)
+        job = mock_services['queue_service'].enqueue_job.await_args.args[0]
+        assert (job["commit_sha"], job["branch"], job["head_repository"]) == ("a" * 40, "feature", "fork/repo")
+        assert job["source"] == "comment"
+
+    @pytest.mark.asyncio
+    async def test_unknown_head_looked_up(self, event, mock_services, effective_config):
+        """Test the head is fetched when nothing was prefetched for the pull request."""
+        result = await self.handle(event, mock_services, effective_config, Mock(head=Mock(return_value=None)))
+
+        assert result == {"status": "comment_processed"}
+        lookup = mock_services['github_app_service'].get_pull_request_context
+        assert lookup.await_args.kwargs["config_path"] is None
+        job = mock_services['queue_service'].enqueue_job.await_args.args[0]
+        assert (job["commit_sha"], job["head_repository"]) == ("c" * 40, "octo/repo")
+
+    @pytest.mark.asyncio
+    async def test_issue_comment_ignored(self, event, mock_services, effective_config):
+        """Test commands on issues enqueue nothing."""
+        event = IssueCommentEvent(
+            action="created", installation_id=1, owner="octo", repo="repo", number=42,
+            comment_body="/patchpanda generate",
+        )
+
+        await self.handle(event, mock_services, effective_config, None)
+
+        effective_config.resolve.assert_not_awaited()
+        mock_services['queue_service'].enqueue_job.assert_not_awaited()
+
+
 class TestWebhookSecurity:
     """Test webhook security features."""
 